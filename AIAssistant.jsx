@@ -21,6 +21,9 @@ const AIAssistant = () => {
   // Store lead name to know their name
   const [leadName, setLeadName] = useState("");
 
+  // Server-side chat session, so follow-up questions keep their context
+  const [conversationId, setConversationId] = useState(null);
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
@@ -51,7 +54,7 @@ const AIAssistant = () => {
     setMessages((prev) => [...prev, loadingMsg]);
 
     try {
-      const BACKEND_URL = 'https://web-production-c9b7.up.railway.app/ai/ask';
+      const BACKEND_URL = 'https://web-production-c9b7.up.railway.app/ai/ask/stream';
       
       // Check if this message contains contact information
       const hasContactInfo = checkForContactInfo(userMessage);
@@ -63,14 +66,23 @@ const AIAssistant = () => {
         requestBody.lead_id = leadId;
       }
 
-      const response = await fetch(BACKEND_URL, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(requestBody)
-      });
+      // Continue the current conversation
+      if (conversationId) {
+        requestBody.conversation_id = conversationId;
+      }
 
-      const data = await response.json();
+      // Show the answer text as soon as the first tokens arrive
+      let streamedText = "";
+      const data = await streamAnswer(BACKEND_URL, requestBody, (text) => {
+        streamedText += text;
+        setMessages(prev => prev.map(msg =>
+          msg.id === baseId + 1 ? { ...msg, text: streamedText } : msg
+        ));
+      });
       const aiResponse = data.answer || data.response || data.message || "";
+      if (data.conversation_id) {
+        setConversationId(data.conversation_id);
+      }
       
       // Check if backend suggests lead capture
       const shouldShowLeadForm = data.should_capture_lead || false;
@@ -118,6 +130,53 @@ const AIAssistant = () => {
     }
   };
 
+  // POST the question and read the Server-Sent Events stream.
+  // Calls onToken for each text chunk and resolves with the final payload.
+  const streamAnswer = async (url, body, onToken) => {
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+      body: JSON.stringify(body)
+    });
+
+    // Validation errors are returned as plain JSON
+    if (!response.ok || !response.body) {
+      return await response.json();
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let finalData = {};
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventName = "message";
+        const dataLines = [];
+        rawEvent.split("\n").forEach((line) => {
+          if (line.startsWith("event: ")) eventName = line.slice(7);
+          else if (line.startsWith("data: ")) dataLines.push(line.slice(6));
+        });
+        const payload = dataLines.length ? JSON.parse(dataLines.join("\n")) : {};
+
+        if (eventName === "token") onToken(payload.text || "");
+        else if (eventName === "done") finalData = payload;
+        else if (eventName === "error") throw new Error(payload.message);
+      }
+    }
+
+    return finalData;
+  };
+
   // Simple function to check if message contains contact information
   const checkForContactInfo = (message) => {
     const lowerMessage = message.toLowerCase();
@@ -2,13 +2,17 @@ import os
 from flask import Flask, jsonify, send_from_directory
 from flasgger import Swagger
 from flask_cors import CORS
+from config.settings import CORS_ORIGINS
 
 # Création de l'application Flask
 app = Flask(__name__)
+# Dates of MongoDB documents are sent as ISO 8601 UTC
+from utils.json_provider import AppJSONProvider
+app.json = AppJSONProvider(app)
 
 # Configuration CORS -
 CORS(app,
-     origins=['https://frontend-ai-agent.vercel.app'],
+     origins=CORS_ORIGINS,
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
      allow_headers=['Content-Type', 'Authorization', 'Access-Control-Allow-Credentials'],
      supports_credentials=True
@@ -38,6 +42,25 @@ try:
 except Exception as e:
     print(f"Database initialization error: {e}")
 
+# Create the missing indexes of every collection (see config/indexes.py)
+from config.settings import MONGO_ENSURE_INDEXES
+if MONGO_ENSURE_INDEXES:
+    try:
+        from config.indexes import ensure_indexes
+        ensure_indexes()
+    except Exception as e:
+        print(f"Index creation error: {e}")
+
+# Dates stored as strings by earlier versions must be migrated (see README)
+try:
+    from migrations.migrate_dates import unmigrated_fields
+    unmigrated = unmigrated_fields(db) if db is not None else []
+    if unmigrated:
+        print(f"Warning: {', '.join(unmigrated)} still hold ISO string dates, "
+              f"run python migrations/migrate_dates.py")
+except Exception as e:
+    print(f"Date migration check error: {e}")
+
 # Initialize Swagger documentation
 swagger = Swagger(app)
 
@@ -52,6 +75,10 @@ app.register_blueprint(ai_bp, url_prefix='/ai')
 app.register_blueprint(message_bp, url_prefix='/messages')
 app.register_blueprint(lead_bp, url_prefix='/leads')
 
+# Resume background jobs (answer bookkeeping) left in the outbox by a previous run
+from services.job_queue import get_job_queue
+get_job_queue().start()
+
 # Root endpoint for basic API information
 @app.route('/')
 def home():
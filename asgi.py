@@ -0,0 +1,93 @@
+"""
+ASGI entry point (see Procfile):
+
+    uvicorn asgi:app --workers 2
+
+POST /ai/ask runs natively on the event loop (AiController.askchat_async):
+while the model answers, the worker holds no thread for the request, so
+one process can keep hundreds of chats in flight. Every other route,
+including the /ai/ask/stream SSE answers, is served by the Flask app on a
+pool of WSGI_THREADS threads (a2wsgi's WSGIMiddleware), so a long stream
+only holds one of them. asgiref's WsgiToAsgi is not used: it runs every
+request of a process on a single thread.
+The plain WSGI deployment (gunicorn app:app) keeps working unchanged.
+"""
+import json
+from a2wsgi import WSGIMiddleware
+from app import app as flask_app
+from config.settings import CORS_ORIGINS, WSGI_THREADS
+from config.async_db import close_async_db
+from controllers.ai_controller import AiController
+
+# Routes served by coroutines: (method, path) -> handler(json_body) -> (payload, status[, headers])
+ASYNC_ROUTES = {
+    ("POST", "/ai/ask"): AiController.askchat_async,
+}
+
+wsgi_app = WSGIMiddleware(flask_app, workers=WSGI_THREADS)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+
+    handler = None
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"].rstrip("/")))
+    if handler is None:
+        await wsgi_app(scope, receive, send)
+        return
+
+    body = await _read_body(receive)
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+
+    payload, status, *extra_headers = await handler(data)
+    await _send_json(scope, send, payload, status, *extra_headers)
+
+
+async def _read_body(receive) -> bytes:
+    # Collect the request body sent in one or more messages
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _send_json(scope, send, payload, status: int, extra_headers: dict = None):
+    # Same body as Flask's jsonify, with the CORS headers Flask-CORS would add
+    body = (flask_app.json.dumps(payload) + "\n").encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"vary", b"Origin"),
+    ]
+    origin = dict(scope["headers"]).get(b"origin", b"").decode("latin-1")
+    if origin in CORS_ORIGINS:
+        headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+        headers.append((b"access-control-allow-credentials", b"true"))
+    for name, value in (extra_headers or {}).items():
+        headers.append((name.lower().encode("latin-1"), str(value).encode("latin-1")))
+
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    # Close the asyncio MongoDB client when the server stops
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_db()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
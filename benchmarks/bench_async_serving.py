@@ -0,0 +1,132 @@
+"""
+Benchmark: sync WSGI workers vs the ASGI app for POST /ai/ask
+(or POST /ai/ask/stream with --route, served by the Flask app's threads
+under ASGI).
+
+Starts each deployment with the same number of worker processes and the
+local LLM stub (fixed model latency), sends distinct questions from many
+concurrent clients, and reports requests/sec, latency percentiles and the
+resident memory of the server processes:
+
+    sync  gunicorn app:app (sync workers, one request per worker at a time)
+    asgi  uvicorn asgi:app (/ai/ask on the event loop)
+
+Needs the same environment as the backend (MONGODB_URI, ...); GEMINI_API_KEY
+is not used. Memory is read from /proc (Linux) or psutil when installed.
+
+Usage:
+    python benchmarks/bench_async_serving.py [--workers 2] [--concurrency 100]
+        [--requests 200] [--latency fixed:0.5] [--route /ai/ask/stream]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.load_ask import run_load, percentile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def deployments(workers: int, port: int) -> dict:
+    # Server command of each deployment
+    return {
+        "sync": ["gunicorn", "app:app", "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--timeout", "120"],
+        "asgi": ["uvicorn", "asgi:app", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+                 "--log-level", "warning"],
+    }
+
+
+def wait_for_port(port: int, timeout: float = 60.0):
+    # Block until the server accepts connections
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    # Resident memory of a process and its children (workers)
+    try:
+        import psutil
+        parent = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [parent] + parent.children(recursive=True)) / 2 ** 20
+    except ImportError:
+        pass
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+
+    total_kb, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def run(name: str, command: list, port: int, args) -> None:
+    env = dict(os.environ, LLM_PROVIDER="local", LOCAL_LLM_LATENCY=args.latency, PYTHONUNBUFFERED="1")
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        # Warm up every worker (catalog snapshot, imports) before measuring
+        run_load(f"http://127.0.0.1:{port}{args.route}", args.workers * 2, args.workers * 4, unique=True)
+        idle_mb = process_tree_rss_mb(server.pid)
+
+        report = run_load(f"http://127.0.0.1:{port}{args.route}", args.concurrency, args.requests,
+                          timeout=args.timeout, unique=True)
+        loaded_mb = process_tree_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = report["latencies_ms"]
+    errors = args.requests - report["statuses"].get(200, 0)
+    print(f"{name:>5} | {report['throughput']:>8.1f} | {percentile(latencies, 50):>7.0f} | "
+          f"{percentile(latencies, 99):>7.0f} | {errors:>6} | {idle_mb:>8.0f} | {loaded_mb:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", default="fixed:0.5", help="local LLM latency distribution")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--only", choices=["sync", "asgi"], default=None)
+    parser.add_argument("--route", default="/ai/ask", help="/ai/ask or /ai/ask/stream")
+    args = parser.parse_args()
+
+    print(f"route={args.route} workers={args.workers} concurrency={args.concurrency} requests={args.requests} "
+          f"latency={args.latency}")
+    print(" mode |    req/s | p50 ms  | p99 ms  | errors | idle MB  | loaded MB")
+    print("-" * 70)
+    for name, command in deployments(args.workers, args.port).items():
+        if args.only in (None, name):
+            run(name, command, args.port, args)
+
+
+if __name__ == "__main__":
+    main()
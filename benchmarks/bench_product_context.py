@@ -0,0 +1,64 @@
+"""
+Benchmark: full-catalog prompt context vs BM25 top-k retrieval.
+
+Measures prompt size (estimated tokens) and build latency for catalogs of
+1k, 10k and 50k products, with the top-k products encoded as prose lines
+and as the compact table. Runs fully offline (no MongoDB, no Gemini).
+
+Usage:
+    python benchmarks/bench_product_context.py [--top-k 15] [--sizes 1000,10000,50000]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.catalog_fixtures import make_catalog, QUESTIONS
+from services.product_formatter import format_product_line, build_context, build_table_context
+from services.product_retriever import ProductRetriever
+from services.token_budget import estimate_tokens
+
+
+def run(size: int, top_k: int):
+    products = make_catalog(size)
+
+    start = time.perf_counter()
+    full_context = build_context([format_product_line(p) for p in products])
+    full_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    retriever = ProductRetriever(products)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    query_ms = []
+    topk_tokens = []
+    table_tokens = []
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        selected = retriever.top_k(question, top_k)
+        context = build_context([format_product_line(p) for p in selected])
+        query_ms.append((time.perf_counter() - start) * 1000)
+        topk_tokens.append(estimate_tokens(context))
+        table_tokens.append(estimate_tokens(build_table_context(selected)))
+
+    print(f"{size:>7} | {estimate_tokens(full_context):>12,} | {full_ms:>10.1f} | "
+          f"{sum(topk_tokens) / len(topk_tokens):>12,.0f} | {sum(table_tokens) / len(table_tokens):>12,.0f} | "
+          f"{index_ms:>9.1f} | {sum(query_ms) / len(query_ms):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=15)
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    args = parser.parse_args()
+
+    print(f"top_k={args.top_k}")
+    print("   size | full tokens  | full ms    | top-k tokens | table tokens | index ms  | query ms")
+    print("-" * 91)
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: resolving the product names of an AI answer.
+
+Compares the former `$or` of case-insensitive `$regex` clauses against the
+in-memory ProductNameIndex of the catalog snapshot: latency per answer and
+number of products returned (the regex over-matches, e.g. "... Gen 1" also
+returns "... Gen 10" to "... Gen 19"). Each answer names 3 products: one
+exact name, one lowercased and one with a typo.
+
+The regex side needs a MongoDB: pass --mongo-uri (a throwaway database is
+created and dropped) or install mongomock to run it in memory.
+
+Usage:
+    python benchmarks/bench_product_lookup.py [--sizes 1000,10000,50000] [--mongo-uri mongodb://localhost:27017]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.catalog_fixtures import make_catalog
+from services.product_name_index import ProductNameIndex
+
+ANSWERS = 50
+
+
+def open_collection(mongo_uri: str):
+    # Collection used for the regex query, or None if no MongoDB is available
+    if mongo_uri:
+        from pymongo import MongoClient
+        return MongoClient(mongo_uri)["aigent_benchmark"]["products"]
+    try:
+        import mongomock
+    except ImportError:
+        return None
+    return mongomock.MongoClient()["aigent_benchmark"]["products"]
+
+
+def make_answers(products: list, seed: int = 7) -> list:
+    # Product name lists as the model would write them
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(ANSWERS):
+        exact, lower, typo = (p["name"] for p in rng.sample(products, 3))
+        position = rng.randrange(len(typo) - 1)
+        typo = typo[:position] + typo[position + 1] + typo[position] + typo[position + 2:]
+        answers.append([exact, lower.lower(), typo])
+    return answers
+
+
+def regex_lookup(collection, names: list) -> list:
+    # The query get_products_by_names used to run
+    patterns = [{"name": {"$regex": name, "$options": "i"}} for name in names if name]
+    return list(collection.find({"$or": patterns}))
+
+
+def timed(fn, answers: list) -> tuple:
+    # (average ms per answer, average products returned per answer)
+    found = 0
+    start = time.perf_counter()
+    for names in answers:
+        found += len(fn(names))
+    return (time.perf_counter() - start) * 1000 / len(answers), found / len(answers)
+
+
+def run(size: int, collection):
+    products = make_catalog(size)
+    answers = make_answers(products)
+
+    start = time.perf_counter()
+    index = ProductNameIndex(products)
+    build_ms = (time.perf_counter() - start) * 1000
+    index_ms, index_found = timed(index.find, answers)
+
+    regex = "n/a"
+    if collection is not None:
+        collection.delete_many({})
+        collection.insert_many([dict(p) for p in products])
+        regex_ms, regex_found = timed(lambda names: regex_lookup(collection, names), answers)
+        regex = f"{regex_ms:>9.2f} | {regex_found:>9.1f}"
+
+    print(f"{size:>7} | {regex:>21} | {build_ms:>9.1f} | {index_ms:>9.3f} | {index_found:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+
+    collection = open_collection(args.mongo_uri)
+    if collection is None:
+        print("No MongoDB (--mongo-uri) and mongomock not installed: regex side skipped")
+
+    print("   size | regex ms  | found     | build ms  | index ms  | found")
+    print("-" * 68)
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            run(size, collection)
+    finally:
+        if collection is not None:
+            collection.database.client.drop_database("aigent_benchmark")
+
+
+if __name__ == "__main__":
+    main()
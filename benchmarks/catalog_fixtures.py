@@ -0,0 +1,59 @@
+"""
+Synthetic product catalogs for the benchmarks.
+Products follow the documented `products` schema (see README).
+"""
+import random
+
+BRANDS = ["Apple", "Dell", "Lenovo", "HP", "Asus", "Acer", "MSI", "Samsung", "Microsoft", "Razer"]
+LINES = ["Air", "Pro", "XPS", "ThinkPad", "IdeaPad", "Spectre", "Envy", "ZenBook", "ROG", "Swift",
+         "Predator", "Galaxy Book", "Surface", "Blade", "Inspiron", "Yoga", "Pavilion", "Vivobook"]
+CATEGORIES = ["Laptops", "Monitors", "Accessories", "Tablets", "Desktops"]
+TAGS = ["programming", "gaming", "business", "student", "portable", "creative", "budget", "premium",
+        "office", "travel", "video editing", "design"]
+CPUS = ["Apple M2", "Apple M3", "Intel Core i5", "Intel Core i7", "Intel Core i9", "AMD Ryzen 5", "AMD Ryzen 7"]
+RAM = ["8GB", "16GB", "32GB", "64GB"]
+STORAGE = ["256GB SSD", "512GB SSD", "1TB SSD", "2TB SSD"]
+
+QUESTIONS = [
+    "Show me laptops under $1000",
+    "What is the best gaming laptop with 32GB RAM?",
+    "I need a portable laptop for programming",
+    "Which Dell models are good for business?",
+    "Do you have a Lenovo ThinkPad with Ryzen 7?",
+    "Bonjour, je cherche un ordinateur pour étudiant",
+]
+
+
+def make_catalog(size: int, seed: int = 42) -> list:
+    """Build a deterministic catalog of `size` products"""
+    rng = random.Random(seed)
+    products = []
+    for i in range(size):
+        brand = rng.choice(BRANDS)
+        line = rng.choice(LINES)
+        category = rng.choice(CATEGORIES)
+        tags = rng.sample(TAGS, 3)
+        products.append({
+            "_id": f"{i:024x}",
+            "name": f"{brand} {line} {rng.randint(13, 17)} Gen {i}",
+            "description": f"{category[:-1]} for {tags[0]} and {tags[1]} with a {rng.choice(['bright', 'compact', 'fast', 'quiet'])} design",
+            "price": rng.randint(199, 3499),
+            "tags": tags,
+            "category": category,
+            "brand": brand,
+            "warranty": rng.choice(["1 year", "2 years", "3 years"]),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "reviews_count": rng.randint(0, 2000),
+            "available": rng.random() > 0.1,
+            "release_date": f"202{rng.randint(0, 5)}-0{rng.randint(1, 9)}-01",
+            "specs": {
+                "processor": rng.choice(CPUS),
+                "ram": rng.choice(RAM),
+                "storage": rng.choice(STORAGE),
+                "screen_size": f"{rng.choice([13.3, 14, 15.6, 16, 17.3])} inch",
+                "battery_life": f"{rng.randint(5, 20)} hours",
+                "weight": f"{round(rng.uniform(0.9, 3.2), 2)} kg",
+                "os": rng.choice(["Windows 11", "macOS Sonoma", "ChromeOS"])
+            }
+        })
+    return products
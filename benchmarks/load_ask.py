@@ -0,0 +1,115 @@
+"""
+Load generator for POST /ai/ask (or /ai/ask/stream: the payload of the
+final 'done' event is used, latency is the time to the full answer).
+
+Sends questions from a pool of concurrent clients and reports throughput,
+latency percentiles and how answers were produced (cached, coalesced,
+degraded). Start the backend with the local LLM stub to measure the
+pipeline without network or quota, e.g. with zero model latency to see
+only our own overhead:
+
+    LLM_PROVIDER=local LOCAL_LLM_LATENCY=fixed:0 python app.py
+
+Usage:
+    python benchmarks/load_ask.py [--url http://localhost:5000/ai/ask]
+        [--concurrency 16] [--requests 500] [--unique] [--no-cache]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.catalog_fixtures import QUESTIONS
+
+
+def percentile(values: list, pct: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def stream_payload(body: bytes) -> bytes:
+    # Data of the last 'done' event of a Server-Sent Events body
+    payload = b""
+    for block in body.split(b"\n\n"):
+        lines = block.split(b"\n")
+        if lines and lines[0] == b"event: done":
+            payload = b"\n".join(line[len(b"data: "):] for line in lines[1:] if line.startswith(b"data: "))
+    return payload
+
+
+def post(url: str, body: dict, timeout: float) -> tuple:
+    # Send one question, return (status, payload, seconds)
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            if response.headers.get_content_type() == "text/event-stream":
+                body = stream_payload(body)
+            payload = json.loads(body or b"{}")
+            return response.status, payload, time.perf_counter() - start
+    except urllib.error.HTTPError as e:
+        return e.code, {}, time.perf_counter() - start
+    except Exception:
+        return 0, {}, time.perf_counter() - start
+
+
+def run_load(url: str, concurrency: int, requests: int, timeout: float = 60.0,
+             unique: bool = False, use_cache: bool = True) -> dict:
+    """Send the questions and summarize the results"""
+    def body(i: int) -> dict:
+        question = QUESTIONS[i % len(QUESTIONS)]
+        if unique:
+            question = f"{question} (#{i})"
+        return {"question": question, "cache": use_cache}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: post(url, body(i), timeout), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        "elapsed": elapsed,
+        "throughput": requests / elapsed,
+        "statuses": statuses,
+        "latencies_ms": sorted(seconds * 1000 for status, _, seconds in results if status == 200),
+        "flags": {flag: sum(1 for _, payload, _ in results if payload.get(flag)) for flag in ("cached", "coalesced", "degraded")}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000/ai/ask")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--unique", action="store_true", help="make every question distinct (no cache hits)")
+    parser.add_argument("--no-cache", action="store_true", help="ask the server to bypass the answer cache")
+    args = parser.parse_args()
+
+    report = run_load(args.url, args.concurrency, args.requests, args.timeout, args.unique, not args.no_cache)
+    latencies = report["latencies_ms"]
+
+    print(f"requests={args.requests} concurrency={args.concurrency} elapsed={report['elapsed']:.2f}s "
+          f"throughput={report['throughput']:.1f} req/s")
+    print("status:", ", ".join(f"{status or 'error'}={count}" for status, count in sorted(report["statuses"].items())))
+    print("answers:", ", ".join(f"{flag}={count}" for flag, count in report["flags"].items()))
+    if latencies:
+        print(f"latency ms: p50={percentile(latencies, 50):.0f} p90={percentile(latencies, 90):.0f} "
+              f"p99={percentile(latencies, 99):.0f} max={latencies[-1]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# config/async_db.py
+import os
+from pymongo import AsyncMongoClient
+from config.db import MONGODB_URI, DATABASE_NAME
+
+# asyncio MongoDB client of this worker process, created on first use so it
+# binds to the event loop that serves requests (and never crosses a fork)
+_client = None
+_client_pid = None
+
+
+def get_async_db():
+    """Return the database handle of the asyncio path (ASGI deployment)"""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = AsyncMongoClient(MONGODB_URI)
+        _client_pid = os.getpid()
+    return _client[DATABASE_NAME]
+
+
+async def close_async_db():
+    """Close the asyncio client (ASGI lifespan shutdown)"""
+    global _client
+    if _client is not None and _client_pid == os.getpid():
+        await _client.close()
+    _client = None
@@ -0,0 +1,139 @@
+"""
+Indexes of every collection the application queries.
+
+INDEXES is the single declaration: ensure_indexes() creates what is
+missing (creating an index that already exists with the same keys and
+options is a no-op, so it runs at every startup) and check_indexes()
+reports indexes that are missing, not declared here, or never used since
+the server started ($indexStats).
+
+Usage:
+    python -m config.indexes apply           # create the missing indexes
+    python -m config.indexes check           # report missing / undeclared / unused indexes
+"""
+import sys
+import json
+import logging
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from config.settings import JOB_OUTBOX_COLLECTION
+
+INDEXES = {
+    "messages": [
+        # GET /messages pages (keyset on timestamp + _id)
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_desc"),
+        # get_messages_by_product_ids: product_ids $in, sorted by timestamp
+        IndexModel([("product_ids", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+                   name="product_ids_timestamp"),
+    ],
+    "leads": [
+        # get_lead_by_email, on every POST /leads and contact update
+        IndexModel([("email", ASCENDING)], name="email"),
+        # get_all_leads pages (keyset on created_at + _id)
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_desc"),
+        # get_leads_by_status pages
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_created_at"),
+        # get_leads_by_message_id
+        IndexModel([("source_message_id", ASCENDING), ("created_at", DESCENDING)], name="source_message_id"),
+    ],
+    "conversations": [
+        # find_all_by_customer and find_active_by_customer
+        IndexModel([("customer_id", ASCENDING), ("status", ASCENDING)], name="customer_id_status"),
+    ],
+    "images": [
+        # Image.find_by_product_id
+        IndexModel([("product_id", ASCENDING)], name="product_id"),
+    ],
+    "salesteam": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "customers": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    JOB_OUTBOX_COLLECTION: [
+        # Claims of due jobs and of expired leases, outbox counters
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+    ],
+}
+
+
+def _declared(collection_name: str) -> dict:
+    # Index name -> declared key list
+    return {index.document["name"]: list(index.document["key"].items()) for index in INDEXES[collection_name]}
+
+
+def ensure_indexes(database=None) -> dict:
+    """
+    Create the declared indexes that do not exist yet and return
+    {collection: [index names] or "error: ..."}. An index that conflicts
+    with an existing one (same name, other keys or options) is reported,
+    never dropped: that is left to check_indexes() and the operator.
+    """
+    if database is None:
+        from config.db import db as database
+
+    report = {}
+    for collection_name, indexes in INDEXES.items():
+        try:
+            report[collection_name] = database[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicate emails preventing a unique index, or a conflicting definition
+            logging.error(f"Indexes of {collection_name} not created: {e}")
+            report[collection_name] = f"error: {e}"
+    return report
+
+
+def check_indexes(database=None) -> dict:
+    """
+    Compare the declared indexes with the database:
+    {collection: {"missing": [...], "undeclared": [...], "unused": [...] or None}}.
+    "unused" lists the indexes with no access since the server started, or
+    is None when $indexStats is not available.
+    """
+    if database is None:
+        from config.db import db as database
+
+    report = {}
+    for collection_name in INDEXES:
+        collection = database[collection_name]
+        declared = _declared(collection_name)
+        existing = {
+            name: list(info["key"]) for name, info in collection.index_information().items() if name != "_id_"
+        }
+
+        try:
+            unused = sorted(
+                stats["name"] for stats in collection.aggregate([{"$indexStats": {}}])
+                if stats["name"] != "_id_" and not stats.get("accesses", {}).get("ops")
+            )
+        except (OperationFailure, NotImplementedError):
+            unused = None
+
+        report[collection_name] = {
+            # Also missing: an index with the declared name but other keys
+            "missing": sorted(name for name, keys in declared.items() if existing.get(name) != keys),
+            "undeclared": sorted(name for name in existing if name not in declared),
+            "unused": unused
+        }
+    return report
+
+
+def main(argv: list) -> int:
+    command = argv[0] if argv else "check"
+    if command == "apply":
+        report = ensure_indexes()
+        failed = any(isinstance(result, str) for result in report.values())
+    elif command == "check":
+        report = check_indexes()
+        failed = any(result["missing"] for result in report.values())
+    else:
+        print(__doc__)
+        return 2
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
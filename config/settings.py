@@ -0,0 +1,193 @@
+# config/settings.py
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    # Read an integer setting, falling back to the default on bad values
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    # Read a float setting, falling back to the default on bad values
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    # Read a boolean setting ("1", "true", "yes", "on" are truthy)
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# === HTTP ===
+# Origins allowed to call the API from a browser (comma separated)
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "https://frontend-ai-agent.vercel.app").split(",") if origin.strip()]
+# Threads serving the Flask routes (SSE streams included) in each ASGI worker
+WSGI_THREADS = _env_int("WSGI_THREADS", 32)
+
+# === Gemini model pool ===
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "models/gemini-1.5-flash")
+# Maximum number of warm model handles kept per worker process
+GEMINI_POOL_SIZE = _env_int("GEMINI_POOL_SIZE", 4)
+# Seconds a caller waits for a free handle before giving up
+GEMINI_POOL_TIMEOUT = _env_float("GEMINI_POOL_TIMEOUT", 10.0)
+# Concurrent Gemini calls per worker on the asyncio path (ASGI deployment)
+GEMINI_ASYNC_CONCURRENCY = _env_int("GEMINI_ASYNC_CONCURRENCY", 256)
+
+# === Chat pipeline ===
+# Ask Gemini for the answer and the interest signals in one structured call.
+# When disabled, interest analysis makes its own generate_ai_keywords call.
+AI_COMBINED_ANALYSIS = _env_bool("AI_COMBINED_ANALYSIS", True)
+
+# === Product context retrieval ===
+# Number of products sent to the AI for a question
+PRODUCT_CONTEXT_TOP_K = _env_int("PRODUCT_CONTEXT_TOP_K", 15)
+# Catalogs up to this size are always sent in full
+PRODUCT_CONTEXT_FULL_THRESHOLD = _env_int("PRODUCT_CONTEXT_FULL_THRESHOLD", 40)
+# Minimum similarity (0-1) for a fuzzy match of a product name mentioned by the model
+PRODUCT_NAME_MATCH_THRESHOLD = _env_float("PRODUCT_NAME_MATCH_THRESHOLD", 0.75)
+# Only send the products within the price and stock constraints of the question (named categories and brands first)
+PRODUCT_CONSTRAINT_FILTER = _env_bool("PRODUCT_CONSTRAINT_FILTER", True)
+
+# === MongoDB indexes ===
+# Create the indexes declared in config/indexes.py at startup (no-op when they exist)
+MONGO_ENSURE_INDEXES = _env_bool("MONGO_ENSURE_INDEXES", True)
+
+# === Pagination ===
+# Page size of GET /messages and /leads lists (?limit=), and its upper bound
+PAGE_SIZE_DEFAULT = _env_int("PAGE_SIZE_DEFAULT", 50)
+PAGE_SIZE_MAX = _env_int("PAGE_SIZE_MAX", 500)
+# Filtered lists report their total up to this count ("at least" beyond it)
+PAGE_COUNT_LIMIT = _env_int("PAGE_COUNT_LIMIT", 10000)
+
+# === Exports ===
+# Documents read per database batch and written per chunk by /messages/export and /leads/export
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 500)
+# Times an export reopens a server cursor that expired while the client was reading
+EXPORT_MAX_REOPENS = _env_int("EXPORT_MAX_REOPENS", 3)
+
+# === Catalog snapshot ===
+# Seconds between two checks of the shared catalog version marker
+CATALOG_POLL_INTERVAL = _env_float("CATALOG_POLL_INTERVAL", 5.0)
+# Snapshots older than this are reloaded even if the version did not change
+CATALOG_MAX_AGE = _env_float("CATALOG_MAX_AGE", 300.0)
+# Also listen to a MongoDB change stream on products (replica sets only)
+CATALOG_CHANGE_STREAM = _env_bool("CATALOG_CHANGE_STREAM", False)
+
+# === Answer cache ===
+ANSWER_CACHE_ENABLED = _env_bool("ANSWER_CACHE_ENABLED", True)
+# Maximum number of cached answers per worker (LRU eviction)
+ANSWER_CACHE_SIZE = _env_int("ANSWER_CACHE_SIZE", 512)
+# Seconds a cached answer stays valid
+ANSWER_CACHE_TTL = _env_float("ANSWER_CACHE_TTL", 300.0)
+
+# === Request coalescing ===
+# Concurrent identical questions share one in-flight Gemini call
+SINGLE_FLIGHT_ENABLED = _env_bool("SINGLE_FLIGHT_ENABLED", True)
+
+# === Gemini deadlines, retries and circuit breaker ===
+# Overall time budget of one Gemini call, retries included (seconds)
+GEMINI_DEADLINE = _env_float("GEMINI_DEADLINE", 20.0)
+# Timeout of a single attempt (seconds)
+GEMINI_CALL_TIMEOUT = _env_float("GEMINI_CALL_TIMEOUT", 12.0)
+GEMINI_MAX_ATTEMPTS = _env_int("GEMINI_MAX_ATTEMPTS", 3)
+# Exponential backoff with full jitter between attempts (seconds)
+GEMINI_RETRY_BASE_DELAY = _env_float("GEMINI_RETRY_BASE_DELAY", 0.25)
+GEMINI_RETRY_MAX_DELAY = _env_float("GEMINI_RETRY_MAX_DELAY", 2.0)
+# Consecutive failures (errors or slow calls) that open the circuit
+BREAKER_FAILURE_THRESHOLD = _env_int("BREAKER_FAILURE_THRESHOLD", 5)
+# Calls slower than this count as failures (seconds)
+BREAKER_SLOW_CALL_SECONDS = _env_float("BREAKER_SLOW_CALL_SECONDS", 15.0)
+# Seconds the circuit stays open before a probe call is allowed
+BREAKER_RESET_TIMEOUT = _env_float("BREAKER_RESET_TIMEOUT", 30.0)
+# Answer from the local recommender when Gemini is unavailable
+LOCAL_FALLBACK_ENABLED = _env_bool("LOCAL_FALLBACK_ENABLED", True)
+# Number of products suggested by the local recommender
+LOCAL_FALLBACK_TOP_K = _env_int("LOCAL_FALLBACK_TOP_K", 3)
+
+# === LLM provider ===
+# "gemini" (default) or "local" (deterministic offline stub, for load tests and benchmarks)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+# Latency of the local stub per call, in seconds:
+# "fixed:0.8", "uniform:0.3,1.5", "normal:0.8,0.2" (mean, stddev),
+# "lognormal:0.8,0.5" (median, sigma) or "exponential:0.8" (mean)
+LOCAL_LLM_LATENCY = os.getenv("LOCAL_LLM_LATENCY", "lognormal:0.8,0.5")
+# Share of local stub calls failing with a transient error (0-1)
+LOCAL_LLM_ERROR_RATE = _env_float("LOCAL_LLM_ERROR_RATE", 0.0)
+# Seed of the local stub latency/error sequence
+LOCAL_LLM_SEED = _env_int("LOCAL_LLM_SEED", 42)
+
+# === LLM admission control ===
+# Concurrent LLM calls per worker process; further calls wait in a queue
+LLM_MAX_CONCURRENCY = _env_int("LLM_MAX_CONCURRENCY", 32)
+# Callers allowed to wait; beyond that requests get 429 + Retry-After
+LLM_QUEUE_SIZE = _env_int("LLM_QUEUE_SIZE", 128)
+# Seconds a caller may wait for a slot before getting 429
+LLM_QUEUE_MAX_WAIT = _env_float("LLM_QUEUE_MAX_WAIT", 5.0)
+
+# === Background jobs ===
+# Post-answer bookkeeping (message, lead) runs after the response is sent
+JOBS_ENABLED = _env_bool("JOBS_ENABLED", True)
+# MongoDB collection holding queued jobs until they succeed
+JOB_OUTBOX_COLLECTION = os.getenv("JOB_OUTBOX_COLLECTION", "job_outbox")
+# Threads running jobs in each worker process
+JOB_WORKERS = _env_int("JOB_WORKERS", 4)
+# Attempts before a job is marked failed
+JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 5)
+# Backoff between attempts (exponential with full jitter, seconds)
+JOB_RETRY_BASE_DELAY = _env_float("JOB_RETRY_BASE_DELAY", 1.0)
+JOB_RETRY_MAX_DELAY = _env_float("JOB_RETRY_MAX_DELAY", 60.0)
+# A running job whose lease expired (crashed worker) is picked up again
+JOB_LEASE_SECONDS = _env_float("JOB_LEASE_SECONDS", 60.0)
+# Seconds between scans of the outbox for due retries and expired leases
+JOB_POLL_INTERVAL = _env_float("JOB_POLL_INTERVAL", 5.0)
+
+# === Contact info replies ===
+# "template": local FR/EN acknowledgement; "llm": ask the model to write it
+CONTACT_ACK_MODE = os.getenv("CONTACT_ACK_MODE", "template").strip().lower()
+
+# === Prompt token budget ===
+# "table": compact product table (header once, one row per product); "prose": one sentence per product
+PRODUCT_CONTEXT_FORMAT = os.getenv("PRODUCT_CONTEXT_FORMAT", "table").strip().lower()
+# Estimated tokens allowed for the product context; low-value columns, then
+# the least relevant products, are dropped beyond it
+PROMPT_CONTEXT_TOKEN_BUDGET = _env_int("PROMPT_CONTEXT_TOKEN_BUDGET", 2500)
+
+# === Chat sessions ===
+# Follow-up questions sent with a conversation_id see the previous turns
+CHAT_SESSIONS_ENABLED = _env_bool("CHAT_SESSIONS_ENABLED", True)
+# Live sessions kept in memory per worker (LRU); others are reloaded from MongoDB
+CHAT_SESSION_CACHE_SIZE = _env_int("CHAT_SESSION_CACHE_SIZE", 1024)
+# Estimated tokens of past turns sent with a question; older turns are summarized
+CHAT_HISTORY_MAX_TOKENS = _env_int("CHAT_HISTORY_MAX_TOKENS", 800)
+# Maximum length of the summary of older turns (characters)
+CHAT_SUMMARY_MAX_CHARS = _env_int("CHAT_SUMMARY_MAX_CHARS", 600)
+
+# === Model output format ===
+# "json": schema-constrained JSON answers; "sections": MESSAGE:/PRODUCTS: text
+LLM_OUTPUT_FORMAT = os.getenv("LLM_OUTPUT_FORMAT", "json").strip().lower()
+# Extra model calls asking to resend an answer that cannot be parsed
+LLM_PARSE_RETRIES = _env_int("LLM_PARSE_RETRIES", 1)
+
+# === LLM call telemetry ===
+# Minutes of per-minute model call aggregates kept in memory (GET /ai/metrics/llm)
+LLM_TELEMETRY_MINUTES = _env_int("LLM_TELEMETRY_MINUTES", 60)
+# USD per million tokens of GEMINI_MODEL_NAME (negative: built-in price table)
+LLM_PRICE_INPUT_PER_MILLION = _env_float("LLM_PRICE_INPUT_PER_MILLION", -1.0)
+LLM_PRICE_OUTPUT_PER_MILLION = _env_float("LLM_PRICE_OUTPUT_PER_MILLION", -1.0)
+
+# === Local FAQ answers ===
+# Shipping, returns, warranty, payment and stock questions are answered without the model.
+# Off by default: the policy answers must first be written to the shop's actual terms
+FAQ_FAST_PATH_ENABLED = _env_bool("FAQ_FAST_PATH_ENABLED", False)
+# Policy answers per intent and language (JSON, see config/faq.example.json)
+FAQ_PATH = os.getenv("FAQ_PATH", os.path.join(os.path.dirname(__file__), "faq.json"))
+# Longer questions are left to the model
+FAQ_MAX_QUESTION_WORDS = _env_int("FAQ_MAX_QUESTION_WORDS", 25)
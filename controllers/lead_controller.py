@@ -1,5 +1,7 @@
 from flask import request, jsonify
 from models.lead_model import LeadModel
+from utils.pagination import page_args, page_info, InvalidPageRequest
+from utils.export import InvalidExportRequest
 from config.db import db
 from datetime import datetime
 from pymongo import MongoClient
@@ -56,7 +58,7 @@ class LeadController:
                         'phone': phone,
                         'interested_products': interested_products,
                         'status': 'new',
-                        'created_at': datetime.utcnow().isoformat() + "Z"
+                        'created_at': datetime.utcnow()
                     }
                 }), 201
             else:
@@ -71,20 +73,44 @@ class LeadController:
                 'message': f'Error creating lead: {str(e)}'
             }), 500
     
+    @staticmethod
+    def _page_response(page, limit, filters=None):
+        """
+        JSON response of one page of leads
+        """
+        if page is None:
+            return jsonify({
+                'success': False,
+                'message': 'Error getting leads'
+            }), 500
+
+        response = {
+            'success': True,
+            'data': page['items'],
+            'count': len(page['items']),
+            'pagination': page_info(page, limit)
+        }
+        if filters is not None:
+            response['filters'] = filters
+        return jsonify(response), 200
+
     @staticmethod
     def get_all_leads():
         """
-        Get all leads
+        Get one page of leads, newest first.
+        Query: limit, cursor (next_cursor of the previous page), optional status
         """
         try:
-            leads = LeadModel.get_all_leads()
-            
+            limit, cursor = page_args(request.args)
+            status = request.args.get('status')
+            page = LeadModel.get_all_leads(limit, cursor, status=status)
+            return LeadController._page_response(page, limit, {'status': status} if status else None)
+
+        except InvalidPageRequest as e:
             return jsonify({
-                'success': True,
-                'data': leads,
-                'count': len(leads)
-            }), 200
-            
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -94,7 +120,7 @@ class LeadController:
     @staticmethod
     def get_leads_by_status():
         """
-        Get leads by status
+        Get one page of leads by status
         """
         try:
             status = request.args.get('status')
@@ -105,23 +131,43 @@ class LeadController:
                     'message': 'Status parameter is required'
                 }), 400
             
-            leads = LeadModel.get_leads_by_status(status)
-            
+            limit, cursor = page_args(request.args)
+            page = LeadModel.get_leads_by_status(status, limit, cursor)
+            return LeadController._page_response(page, limit, {
+                'status': status
+            })
+
+        except InvalidPageRequest as e:
             return jsonify({
-                'success': True,
-                'data': leads,
-                'count': len(leads),
-                'filters': {
-                    'status': status
-                }
-            }), 200
-            
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Error getting leads by status: {str(e)}'
             }), 500
     
+    @staticmethod
+    def export_leads():
+        """
+        Stream every lead, oldest first, as NDJSON (default) or CSV.
+        Query: format, after (_id of the last lead received, to resume), optional status
+        """
+        try:
+            return LeadModel.export_leads(request.args, status=request.args.get('status'))
+
+        except InvalidExportRequest as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error exporting leads: {str(e)}'
+            }), 500
+    
     @staticmethod
     def update_lead_status(lead_id):
         """
@@ -227,7 +273,7 @@ class LeadController:
                 "email": email,
                 "phone": phone,
                 "status": "new",  # Change from pending to new
-                "last_contact": datetime.utcnow().isoformat() + "Z"
+                "last_contact": datetime.utcnow()
             }
             
             result = db.leads.update_one(
@@ -287,10 +333,12 @@ class LeadController:
     @staticmethod
     def get_conversation_history(lead_id):
         """
-        Get complete conversation history for a lead
+        Get one page of the conversation history of a lead, oldest first.
+        Query: limit, cursor (next_cursor of the previous page)
         """
         try:
-            conversation = LeadModel.get_conversation_history(lead_id)
+            limit, cursor = page_args(request.args)
+            conversation = LeadModel.get_conversation_history(lead_id, limit, cursor)
             
             if conversation:
                 return jsonify({
@@ -303,6 +351,11 @@ class LeadController:
                     'message': 'Lead not found'
                 }), 404
                 
+        except InvalidPageRequest as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -1,5 +1,7 @@
 from flask import request, jsonify
 from models.message_model import MessageModel
+from utils.pagination import page_args, page_info, InvalidPageRequest
+from utils.dates import parse_datetime
 from datetime import datetime
 
 class MessageController:
@@ -34,7 +36,7 @@ class MessageController:
                         'question': question,
                         'answer': answer,
                         'product_ids': product_ids,
-                        'timestamp': datetime.utcnow().isoformat() + "Z"
+                        'timestamp': datetime.utcnow()
                     }
                 }), 201
             else:
@@ -49,20 +51,72 @@ class MessageController:
                 'message': f'Error creating message: {str(e)}'
             }), 500
     
+    @staticmethod
+    def _page_response(page, limit, filters=None):
+        """
+        JSON response of one page of messages
+        """
+        if page is None:
+            return jsonify({
+                'success': False,
+                'message': 'Error getting messages'
+            }), 500
+
+        response = {
+            'success': True,
+            'data': page['items'],
+            'count': len(page['items']),
+            'pagination': page_info(page, limit)
+        }
+        if filters is not None:
+            response['filters'] = filters
+        return jsonify(response), 200
+
+    @staticmethod
+    def _product_ids(value):
+        # Comma-separated product IDs of the query string
+        return [product_id for product_id in value.split(',') if product_id] if value else []
+
+    @staticmethod
+    def _date_range(start_date, end_date):
+        # Parsed (start, end) of the query string, a date-only end includes its whole day
+        start = parse_datetime(start_date) if start_date else None
+        end = parse_datetime(end_date, end_of_day=True) if end_date else None
+        if start and end and start > end:
+            raise ValueError('start_date must be before end_date')
+        return start, end
+
+    @staticmethod
+    def _list_filters(data):
+        # Optional start_date, end_date and product_ids filters of the query string
+        start, end = MessageController._date_range(data.get('start_date'), data.get('end_date'))
+        filters = {
+            'start_date': start,
+            'end_date': end,
+            'product_ids': MessageController._product_ids(data.get('product_ids'))
+        }
+        return {key: value for key, value in filters.items() if value}
+
     @staticmethod
     def get_all_messages():
         """
-        Get all messages
+        Get one page of messages, newest first.
+        Query: limit, cursor (next_cursor of the previous page) and the
+        optional filters start_date, end_date, product_ids
         """
         try:
-            messages = MessageModel.get_all_messages()
-            
+            data = request.args
+            limit, cursor = page_args(data)
+            filters = MessageController._list_filters(data)
+
+            page = MessageModel.get_all_messages(limit, cursor, **filters)
+            return MessageController._page_response(page, limit, filters)
+
+        except ValueError as e:  # invalid page or filter
             return jsonify({
-                'success': True,
-                'data': messages,
-                'count': len(messages)
-            }), 200
-            
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -72,7 +126,7 @@ class MessageController:
     @staticmethod
     def get_messages_by_date_range():
         """
-        Get messages within a date range
+        Get one page of messages within a date range
         """
         try:
             data = request.args
@@ -86,18 +140,19 @@ class MessageController:
                     'message': 'Start date and end date are required'
                 }), 400
             
-            messages = MessageModel.get_messages_by_date_range(start_date, end_date)
-            
+            start, end = MessageController._date_range(start_date, end_date)
+            limit, cursor = page_args(data)
+            page = MessageModel.get_messages_by_date_range(start, end, limit, cursor)
+            return MessageController._page_response(page, limit, {
+                'start_date': start,
+                'end_date': end
+            })
+
+        except ValueError as e:  # invalid page or dates
             return jsonify({
-                'success': True,
-                'data': messages,
-                'count': len(messages),
-                'filters': {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-            }), 200
-            
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -107,39 +162,56 @@ class MessageController:
     @staticmethod
     def get_messages_by_products():
         """
-        Get messages that mention specific products
+        Get one page of messages that mention specific products
         """
         try:
             data = request.args
             
-            product_ids = data.get('product_ids')
+            product_ids = MessageController._product_ids(data.get('product_ids'))
             if not product_ids:
                 return jsonify({
                     'success': False,
                     'message': 'Product IDs are required'
                 }), 400
             
-            # Convert comma-separated string to list
-            if isinstance(product_ids, str):
-                product_ids = product_ids.split(',')
-            
-            messages = MessageModel.get_messages_by_product_ids(product_ids)
-            
+            limit, cursor = page_args(data)
+            page = MessageModel.get_messages_by_product_ids(product_ids, limit, cursor)
+            return MessageController._page_response(page, limit, {
+                'product_ids': product_ids
+            })
+
+        except InvalidPageRequest as e:
             return jsonify({
-                'success': True,
-                'data': messages,
-                'count': len(messages),
-                'filters': {
-                    'product_ids': product_ids
-                }
-            }), 200
-            
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Error getting messages by products: {str(e)}'
             }), 500
     
+    @staticmethod
+    def export_messages():
+        """
+        Stream every message, oldest first, as NDJSON (default) or CSV.
+        Query: format, after (_id of the last message received, to resume)
+        and the optional filters start_date, end_date, product_ids
+        """
+        try:
+            return MessageModel.export_messages(request.args, **MessageController._list_filters(request.args))
+
+        except ValueError as e:  # invalid format, resume position or filter
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error exporting messages: {str(e)}'
+            }), 500
+    
     @staticmethod
     def delete_message(message_id):
         """
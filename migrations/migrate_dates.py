@@ -0,0 +1,133 @@
+"""
+Migration: store message and lead dates as BSON dates.
+
+Messages and leads used to store timestamp, created_at and last_contact
+as ISO strings ("2024-01-31T09:30:00.123456Z"). This script rewrites the
+string values as BSON dates, in batches, while the application runs:
+
+- documents are read in _id order, BATCH_SIZE at a time, so the scan
+  resumes where it stopped (--after) and never revisits a batch;
+- each update only applies if the field still holds the string that was
+  read, so a value written by the application in the meantime is kept;
+- --pause sleeps between batches to limit the load on the primary.
+
+Values that are not ISO dates are left untouched and reported.
+
+Usage:
+    python migrations/migrate_dates.py [--batch-size 1000] [--pause 0.1] [--dry-run] [--after <_id>]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from utils.dates import parse_datetime
+
+# Collection -> date fields stored as strings by earlier versions
+DATE_FIELDS = {
+    "messages": ["timestamp"],
+    "leads": ["created_at", "last_contact"],
+}
+
+
+# Date fields lists and exports are sorted on (indexed: checked cheaply at startup)
+SORTED_DATE_FIELDS = {
+    "messages": "timestamp",
+    "leads": "created_at",
+}
+
+
+def unmigrated_fields(database) -> list:
+    """
+    Sorted date fields that still hold ISO strings somewhere.
+
+    :param database: the pymongo database
+    :return: list, "collection.field" names (empty once the migration ran)
+    """
+    return [
+        f"{name}.{field}" for name, field in SORTED_DATE_FIELDS.items()
+        if database[name].find_one({field: {"$type": "string"}}, {"_id": 1}) is not None
+    ]
+
+
+def migrate_collection(collection, fields: list, batch_size: int = 1000, pause: float = 0.0,
+                       dry_run: bool = False, after=None) -> dict:
+    """
+    Convert the string date fields of one collection to BSON dates.
+
+    :param collection: the pymongo collection
+    :param fields: list, the date fields to convert
+    :param batch_size: int, documents read and updated per batch
+    :param pause: float, seconds to sleep between batches
+    :param dry_run: bool, count the conversions without writing them
+    :param after: ObjectId or None, resume after this _id
+    :return: dict, {"scanned", "converted", "skipped", "invalid", "last_id"}
+    """
+    string_fields = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    report = {"scanned": 0, "converted": 0, "skipped": 0, "invalid": [], "last_id": after}
+
+    while True:
+        query = {"$and": [string_fields, {"_id": {"$gt": after}}]} if after is not None else string_fields
+        batch = list(collection.find(query, {field: 1 for field in fields}).sort("_id", 1).limit(batch_size))
+        if not batch:
+            return report
+
+        updates = []
+        for document in batch:
+            report["scanned"] += 1
+            for field in fields:
+                value = document.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    converted = parse_datetime(value)
+                except ValueError:
+                    report["invalid"].append({"_id": str(document["_id"]), "field": field, "value": value})
+                    continue
+                # Only if the application did not rewrite the field since it was read
+                updates.append(UpdateOne({"_id": document["_id"], field: value}, {"$set": {field: converted}}))
+
+        if updates and not dry_run:
+            result = collection.bulk_write(updates, ordered=False)
+            report["converted"] += result.modified_count
+            report["skipped"] += len(updates) - result.modified_count
+        elif dry_run:
+            report["converted"] += len(updates)
+
+        after = batch[-1]["_id"]
+        report["last_id"] = after
+        print(f"{collection.name}: {report['scanned']} scanned, {report['converted']} converted (last _id {after})")
+        if pause:
+            time.sleep(pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store message and lead dates as BSON dates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between batches")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--after", help="resume after this _id (last_id of an interrupted run, with --collection)")
+    parser.add_argument("--collection", choices=sorted(DATE_FIELDS), help="only migrate this collection")
+    args = parser.parse_args()
+
+    from config.db import db
+
+    failed = False
+    for name, fields in DATE_FIELDS.items():
+        if args.collection and name != args.collection:
+            continue
+        after = ObjectId(args.after) if args.after and args.collection else None
+        report = migrate_collection(db[name], fields, args.batch_size, args.pause, args.dry_run, after)
+        print(f"{name}: {report['converted']} values converted, {report['skipped']} changed meanwhile, "
+              f"{len(report['invalid'])} not ISO dates")
+        for invalid in report["invalid"][:20]:
+            print(f"  {invalid}")
+        failed = failed or bool(report["invalid"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
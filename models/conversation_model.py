@@ -1,5 +1,6 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from config.db import db
 
 class Conversation:
@@ -47,3 +48,33 @@ class Conversation:
             "customer_id": ObjectId(customer_id),
             "status": "active"
         })
+
+    @classmethod
+    def find_chat_state(cls, _id):
+        """
+        Retourne l'état de la session de chat IA (history, summary, turns).
+        Renvoie None si la conversation n'existe pas.
+        """
+        return cls.collection.find_one({"_id": ObjectId(_id)}, {"history": 1, "summary": 1, "turns": 1})
+
+    @classmethod
+    def save_chat_state(cls, _id, expected_turns, history, summary):
+        """
+        Enregistre l'état de la session de chat si la conversation en est
+        toujours à expected_turns tours (la crée au premier tour).
+        Renvoie False si une autre requête l'a modifiée entre-temps.
+        """
+        now = datetime.utcnow()
+        turns_filter = expected_turns if expected_turns else {"$in": [0, None]}
+        try:
+            result = cls.collection.update_one(
+                {"_id": ObjectId(_id), "turns": turns_filter},
+                {
+                    "$set": {"history": history, "summary": summary, "turns": expected_turns + 1, "updated_at": now},
+                    "$setOnInsert": {"customer_id": None, "started_at": now, "ended_at": None, "status": "active"}
+                },
+                upsert=not expected_turns
+            )
+        except DuplicateKeyError:
+            return False
+        return result.matched_count > 0 or result.upserted_id is not None
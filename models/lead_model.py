@@ -1,46 +1,75 @@
 from datetime import datetime
 from config.db import db
+from utils.pagination import paginate, page_info, InvalidPageRequest
+from utils.export import stream_export
+from utils.dates import as_datetime
+
+# Columns of the CSV export
+LEAD_EXPORT_COLUMNS = [
+    "_id", "created_at", "name", "email", "phone", "status", "interested_products",
+    "source_message_id", "linked_message_ids", "last_contact", "notes"
+]
 
 class LeadModel:
     @staticmethod
-    def create_lead(name, email, phone, interested_products, source_message_id=None):
+    def _lead_document(name, email, phone, interested_products, source_message_id=None):
+        """
+        Build a new leads document
+        """
+        return {
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "interested_products": interested_products,
+            "source_message_id": source_message_id,
+            "status": "new",  # new, contacted, converted, lost
+            "created_at": datetime.utcnow(),
+            "last_contact": datetime.utcnow(),
+            "notes": ""
+        }
+
+    @staticmethod
+    def create_lead(name, email, phone, interested_products, source_message_id=None, lead_id=None):
         """
-        Create a new lead record
+        Create a new lead record.
+        With a pre-generated lead_id the write is idempotent (safe to retry).
         """
         try:
-            lead_data = {
-                "name": name,
-                "email": email,
-                "phone": phone,
-                "interested_products": interested_products,
-                "source_message_id": source_message_id,
-                "status": "new",  # new, contacted, converted, lost
-                "created_at": datetime.utcnow().isoformat() + "Z",
-                "last_contact": datetime.utcnow().isoformat() + "Z",
-                "notes": ""
-            }
-            
+            lead_data = LeadModel._lead_document(name, email, phone, interested_products, source_message_id)
+
+            if lead_id:
+                from bson import ObjectId
+                db.leads.update_one({"_id": ObjectId(lead_id)}, {"$setOnInsert": lead_data}, upsert=True)
+                return lead_id
+
             result = db.leads.insert_one(lead_data)
             return str(result.inserted_id)
             
         except Exception as e:
             print(f"Error creating lead: {e}")
             return None
-    
+
     @staticmethod
-    def get_all_leads():
+    def get_all_leads(limit: int, cursor: str = None, status: str = None):
         """
-        Get all leads
+        Get one page of leads, newest first (optionally with one status)
         """
         try:
-            leads = list(db.leads.find().sort("created_at", -1))
-            for lead in leads:
-                lead["_id"] = str(lead["_id"])
-            return leads
+            return paginate(db.leads, {"status": status} if status else {}, "created_at", limit, cursor)
+        except InvalidPageRequest:
+            raise
         except Exception as e:
             print(f"Error getting leads: {e}")
-            return []
+            return None
     
+    @staticmethod
+    def export_leads(args, status: str = None):
+        """
+        Streamed NDJSON/CSV export of the leads, oldest first (optionally with one status)
+        """
+        return stream_export(db.leads, {"status": status} if status else {}, "created_at",
+                             LEAD_EXPORT_COLUMNS, "leads", args)
+
     @staticmethod
     def get_lead_by_email(email):
         """
@@ -64,7 +93,7 @@ class LeadModel:
             from bson import ObjectId
             update_data = {
                 "status": status,
-                "last_contact": datetime.utcnow().isoformat() + "Z"
+                "last_contact": datetime.utcnow()
             }
             if notes:
                 update_data["notes"] = notes
@@ -79,18 +108,11 @@ class LeadModel:
             return False
     
     @staticmethod
-    def get_leads_by_status(status):
+    def get_leads_by_status(status, limit: int, cursor: str = None):
         """
-        Get leads by status
+        Get one page of leads by status
         """
-        try:
-            leads = list(db.leads.find({"status": status}).sort("created_at", -1))
-            for lead in leads:
-                lead["_id"] = str(lead["_id"])
-            return leads
-        except Exception as e:
-            print(f"Error getting leads by status: {e}")
-            return []
+        return LeadModel.get_all_leads(limit, cursor, status=status)
     
     @staticmethod
     def delete_lead(lead_id):
@@ -166,9 +188,24 @@ class LeadModel:
             return []
     
     @staticmethod
-    def get_conversation_history(lead_id):
+    def _message_ids(lead):
+        """
+        ObjectIds of the lead's messages: its source message and the linked ones
+        """
+        from bson import ObjectId
+        ids = [lead.get("source_message_id")] + list(lead.get("linked_message_ids") or [])
+        return [
+            ObjectId(message_id) for message_id in dict.fromkeys(ids)
+            if message_id and ObjectId.is_valid(message_id)
+        ]
+
+    @staticmethod
+    def get_conversation_history(lead_id, limit: int, cursor: str = None):
         """
-        Get complete conversation history for a lead
+        Get one page of the conversation history of a lead, oldest first.
+        Only the lead's own messages are read (_id $in on the source and
+        linked messages), so the cost does not depend on the size of the
+        messages collection.
         """
         try:
             from bson import ObjectId
@@ -178,24 +215,26 @@ class LeadModel:
             
             lead["_id"] = str(lead["_id"])
             
-            # Get all messages in chronological order
-            all_messages = list(db.messages.find().sort("timestamp", 1))
-            
-            # Convert ObjectIds to strings
-            for message in all_messages:
-                message["_id"] = str(message["_id"])
+            # The lead's messages in chronological order
+            query = {"_id": {"$in": LeadModel._message_ids(lead)}}
+            page = paginate(db.messages, query, "timestamp", limit, cursor, direction=1)
+            first = db.messages.find_one(query, {"timestamp": 1}, sort=[("timestamp", 1), ("_id", 1)])
+            last = db.messages.find_one(query, {"timestamp": 1}, sort=[("timestamp", -1), ("_id", -1)])
             
             # Create conversation timeline
             conversation = {
                 "lead": lead,
-                "messages": all_messages,
-                "total_messages": len(all_messages),
-                "conversation_start": all_messages[0]["timestamp"] if all_messages else None,
-                "conversation_end": all_messages[-1]["timestamp"] if all_messages else None
+                "messages": page["items"],
+                "total_messages": page["total"],
+                "conversation_start": first["timestamp"] if first else None,
+                "conversation_end": last["timestamp"] if last else None,
+                "pagination": page_info(page, limit)
             }
             
             return conversation
             
+        except InvalidPageRequest:
+            raise
         except Exception as e:
             print(f"Error getting conversation history: {e}")
             return None
@@ -203,25 +242,20 @@ class LeadModel:
     @staticmethod
     def link_message_to_lead(lead_id, message_id):
         """
-        Link a message to a lead (for additional messages after lead creation)
+        Link a message to a lead (for additional messages after lead creation).
+        A single atomic update: concurrent links are kept and linking the
+        same message twice is a no-op.
         """
         try:
             from bson import ObjectId
-            update_data = {
-                "linked_message_ids": [message_id],
-                "last_contact": datetime.utcnow().isoformat() + "Z"
-            }
-            
-            # Add to existing linked messages if any
-            lead = db.leads.find_one({"_id": ObjectId(lead_id)})
-            if lead and lead.get("linked_message_ids"):
-                update_data["linked_message_ids"] = lead["linked_message_ids"] + [message_id]
-            
             result = db.leads.update_one(
                 {"_id": ObjectId(lead_id)},
-                {"$set": update_data}
+                {
+                    "$addToSet": {"linked_message_ids": message_id},
+                    "$set": {"last_contact": datetime.utcnow()}
+                }
             )
-            return result.modified_count > 0
+            return result.matched_count > 0
             
         except Exception as e:
             print(f"Error linking message to lead: {e}")
@@ -240,18 +274,11 @@ class LeadModel:
             
             lead["_id"] = str(lead["_id"])
             
-            # Get all related messages
-            related_messages = []
-            if lead.get("source_message_id"):
-                source_message = db.messages.find_one({"_id": ObjectId(lead["source_message_id"])})
-                if source_message:
-                    related_messages.append(source_message)
-            
-            if lead.get("linked_message_ids"):
-                for msg_id in lead["linked_message_ids"]:
-                    message = db.messages.find_one({"_id": ObjectId(msg_id)})
-                    if message:
-                        related_messages.append(message)
+            # Get all related messages (one query on _id)
+            related_messages = list(
+                db.messages.find({"_id": {"$in": LeadModel._message_ids(lead)}}, {"timestamp": 1})
+                .sort([("timestamp", 1), ("_id", 1)])
+            )
             
             # Calculate analytics
             analytics = {
@@ -265,11 +292,9 @@ class LeadModel:
             }
             
             # Calculate lead age
-            if lead.get("created_at"):
-                from datetime import datetime
-                created_date = datetime.fromisoformat(lead["created_at"].replace("Z", "+00:00"))
-                now = datetime.utcnow()
-                analytics["lead_age_days"] = (now - created_date).days
+            created_date = as_datetime(lead.get("created_at"))
+            if created_date:
+                analytics["lead_age_days"] = (datetime.utcnow() - created_date).days
             
             return analytics
             
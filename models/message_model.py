@@ -1,82 +1,115 @@
 from datetime import datetime
 from bson import ObjectId
 from config.db import db
+from utils.pagination import paginate, InvalidPageRequest
+from utils.export import stream_export
+from utils.dates import date_range_filter
+
+# Columns of the CSV export
+MESSAGE_EXPORT_COLUMNS = ["_id", "timestamp", "question", "answer", "product_ids"]
 
 class MessageModel:
     @staticmethod
-    def create_message(question: str, answer: str, product_ids: list = None):
+    def _message_document(question: str, answer: str, product_ids: list = None):
+        """
+        Build a new messages document
+        """
+        return {
+            "question": question,
+            "answer": answer,
+            "product_ids": product_ids or [],
+            "timestamp": datetime.utcnow()
+        }
+
+    @staticmethod
+    def create_message(question: str, answer: str, product_ids: list = None, message_id: str = None):
         """
-        Create a new message record in the messages collection
+        Create a new message record in the messages collection.
+        With a pre-generated message_id the write is idempotent (safe to retry).
         """
         try:
-            message_data = {
-                "question": question,
-                "answer": answer,
-                "product_ids": product_ids or [],
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
-            
+            message_data = MessageModel._message_document(question, answer, product_ids)
+
+            if message_id:
+                db.messages.update_one({"_id": ObjectId(message_id)}, {"$setOnInsert": message_data}, upsert=True)
+                return message_id
+
             result = db.messages.insert_one(message_data)
             return str(result.inserted_id)
             
         except Exception as e:
             print(f"Error creating message: {e}")
             return None
-    
+
     @staticmethod
-    def get_all_messages():
+    def set_interest_analysis(message_id: str, interest_analysis: dict):
         """
-        Get all messages from the collection
+        Store the interest analysis computed for a message
         """
         try:
-            messages = list(db.messages.find().sort("timestamp", -1))
-            # Convert ObjectId to string for JSON serialization
-            for message in messages:
-                message["_id"] = str(message["_id"])
-            return messages
+            result = db.messages.update_one(
+                {"_id": ObjectId(message_id)},
+                {"$set": {"interest_analysis": interest_analysis}}
+            )
+            return result.matched_count > 0
         except Exception as e:
-            print(f"Error getting messages: {e}")
-            return []
+            print(f"Error saving interest analysis: {e}")
+            return False
     
     @staticmethod
-    def get_messages_by_date_range(start_date: str, end_date: str):
+    def _page(query: dict, limit: int, cursor: str = None):
         """
-        Get messages within a date range
+        One page of messages matching the query, newest first (None on error)
         """
         try:
-            query = {
-                "timestamp": {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            }
-            messages = list(db.messages.find(query).sort("timestamp", -1))
-            for message in messages:
-                message["_id"] = str(message["_id"])
-            return messages
+            return paginate(db.messages, query, "timestamp", limit, cursor)
+        except InvalidPageRequest:
+            raise
         except Exception as e:
-            print(f"Error getting messages by date range: {e}")
-            return []
-    
+            print(f"Error getting messages: {e}")
+            return None
+
     @staticmethod
-    def get_messages_by_product_ids(product_ids: list):
+    def message_filter(start_date: datetime = None, end_date: datetime = None, product_ids: list = None):
         """
-        Get messages that mention specific products
+        Build the messages filter of the optional list filters
+        (inclusive UTC date range on the indexed timestamp)
         """
-        try:
-            query = {
-                "product_ids": {
-                    "$in": product_ids
-                }
-            }
-            messages = list(db.messages.find(query).sort("timestamp", -1))
-            for message in messages:
-                message["_id"] = str(message["_id"])
-            return messages
-        except Exception as e:
-            print(f"Error getting messages by product IDs: {e}")
-            return []
-    
+        query = date_range_filter("timestamp", start_date, end_date)
+        if product_ids:
+            query["product_ids"] = {"$in": product_ids}
+        return query
+
+    @staticmethod
+    def get_all_messages(limit: int, cursor: str = None, **filters):
+        """
+        Get one page of messages (optionally filtered, see message_filter)
+        """
+        return MessageModel._page(MessageModel.message_filter(**filters), limit, cursor)
+
+    @staticmethod
+    def get_messages_by_date_range(start_date: datetime, end_date: datetime, limit: int, cursor: str = None):
+        """
+        Get one page of messages within a date range
+        """
+        return MessageModel._page(MessageModel.message_filter(start_date, end_date), limit, cursor)
+
+    @staticmethod
+    def get_messages_by_product_ids(product_ids: list, limit: int, cursor: str = None):
+        """
+        Get one page of messages that mention specific products
+        """
+        return MessageModel._page(MessageModel.message_filter(product_ids=product_ids), limit, cursor)
+
+    @staticmethod
+    def export_messages(args, **filters):
+        """
+        Streamed NDJSON/CSV export of the messages, oldest first
+        (optionally filtered, see message_filter)
+        """
+        return stream_export(db.messages, MessageModel.message_filter(**filters), "timestamp",
+                             MESSAGE_EXPORT_COLUMNS, "messages", args)
+
     @staticmethod
     def delete_message(message_id: str):
         """
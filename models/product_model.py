@@ -5,11 +5,19 @@ from config.db import db
 class Product:
     collection = db.products
 
+    # Marker document bumped on every product write (catalog version)
+    meta_collection = db.catalog_meta
+    META_ID = "products"
+
+    # Callbacks run in this process after a product write
+    _change_listeners = []
+
     @classmethod
     def create(cls, data):
         # Insert a new product document
         data.setdefault("created_at", datetime.utcnow())
         result = cls.collection.insert_one(data)
+        cls._catalog_changed()
         return str(result.inserted_id)
 
     @classmethod
@@ -18,10 +26,10 @@ class Product:
         return cls.collection.find_one({"_id": ObjectId(_id)})
 
     @classmethod
-    def find_all(cls, filter=None):
+    def find_all(cls, filter=None, projection=None):
         # Retrieve all products matching filter or all
         filter = filter or {}
-        return list(cls.collection.find(filter))
+        return list(cls.collection.find(filter, projection))
 
     @classmethod
     def update(cls, _id, update_data):
@@ -31,10 +39,36 @@ class Product:
             {"_id": ObjectId(_id)},
             {"$set": update_data}
         )
+        if result.modified_count > 0:
+            cls._catalog_changed()
         return result.modified_count > 0
 
     @classmethod
     def delete(cls, _id):
         # Delete a product document by ObjectId
         result = cls.collection.delete_one({"_id": ObjectId(_id)})
+        if result.deleted_count > 0:
+            cls._catalog_changed()
         return result.deleted_count > 0
+
+    @classmethod
+    def get_catalog_version(cls):
+        # Current catalog version (0 if the catalog was never written through this model)
+        meta = cls.meta_collection.find_one({"_id": cls.META_ID}, {"version": 1})
+        return meta.get("version", 0) if meta else 0
+
+    @classmethod
+    def on_change(cls, callback):
+        # Register a callback run after every product write in this process
+        cls._change_listeners.append(callback)
+
+    @classmethod
+    def _catalog_changed(cls):
+        # Bump the shared version so every worker reloads its catalog snapshot
+        cls.meta_collection.update_one(
+            {"_id": cls.META_ID},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        for callback in cls._change_listeners:
+            callback()
@@ -8,3 +8,11 @@ ai_bp = Blueprint('ai', __name__)
 # Route POST /ai/ask
 ai_bp.route('/ask', methods=['POST'])(AiController.askchat)
 
+# Route POST /ai/ask/stream (Server-Sent Events)
+ai_bp.route('/ask/stream', methods=['POST'])(AiController.askchat_stream)
+
+# Route GET /ai/metrics - In-process AI pipeline metrics
+ai_bp.route('/metrics', methods=['GET'])(AiController.get_metrics)
+
+# Route GET /ai/metrics/llm - Model call latency, tokens and cost per call site
+ai_bp.route('/metrics/llm', methods=['GET'])(AiController.get_llm_metrics)
@@ -13,6 +13,9 @@ lead_bp.route('/', methods=['GET'])(LeadController.get_all_leads)
 # Route GET /leads/status - Get leads by status
 lead_bp.route('/status', methods=['GET'])(LeadController.get_leads_by_status)
 
+# Route GET /leads/export - Stream all leads as NDJSON or CSV
+lead_bp.route('/export', methods=['GET'])(LeadController.export_leads)
+
 # Route PUT /leads/<lead_id>/status - Update lead status
 lead_bp.route('/<lead_id>/status', methods=['PUT'])(LeadController.update_lead_status)
 
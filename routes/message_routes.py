@@ -16,5 +16,8 @@ message_bp.route('/date-range', methods=['GET'])(MessageController.get_messages_
 # Route GET /messages/by-products - Get messages by product IDs
 message_bp.route('/by-products', methods=['GET'])(MessageController.get_messages_by_products)
 
+# Route GET /messages/export - Stream all messages as NDJSON or CSV
+message_bp.route('/export', methods=['GET'])(MessageController.export_messages)
+
 # Route DELETE /messages/<message_id> - Delete a specific message
 message_bp.route('/<message_id>', methods=['DELETE'])(MessageController.delete_message) 
\ No newline at end of file
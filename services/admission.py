@@ -0,0 +1,194 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from config.settings import LLM_MAX_CONCURRENCY, LLM_QUEUE_SIZE, LLM_QUEUE_MAX_WAIT
+
+# Admission priorities (lower is served first)
+PRIORITY_CONTACT = 0  # contact-info follow-ups of an existing lead
+PRIORITY_QUESTION = 1  # fresh questions
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when an LLM call is shed because the worker is over capacity"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM admission rejected ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A queued caller; wake() is called (under the lock) when it is granted a slot"""
+
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Per-process limit on concurrent LLM calls.
+
+    Up to max_concurrency calls run at once. Further callers wait in a
+    bounded priority queue (lowest priority value first, FIFO within a
+    priority) for at most max_wait seconds; a released slot is handed
+    directly to the next waiter. Callers finding the queue full, or waiting
+    too long, get AdmissionRejected with a Retry-After estimate based on
+    the recent call duration.
+    Thread (slot) and asyncio (async_slot) callers share the same limit.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, max_queue: int = LLM_QUEUE_SIZE,
+                 max_wait: float = LLM_QUEUE_MAX_WAIT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue = []  # heap of (priority, sequence, waiter)
+        self._sequence = itertools.count()
+        self._avg_call_seconds = 2.0  # moving average of the slot hold time
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0,
+                       "max_queue_depth": 0, "total_wait_seconds": 0.0}
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_QUESTION):
+        """Hold one LLM slot for the duration of the block (blocking wait)"""
+        self.acquire(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int = PRIORITY_QUESTION):
+        """Hold one LLM slot for the duration of the block (asyncio wait)"""
+        await self.acquire_async(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def acquire(self, priority: int = PRIORITY_QUESTION):
+        """Take a slot, waiting in the queue if needed; raises AdmissionRejected"""
+        event = threading.Event()
+        waiter = self._enter(priority, event.set)
+        if waiter is None:
+            return
+        start = time.monotonic()
+        if not event.wait(self.max_wait) and self._abandon(waiter):
+            raise AdmissionRejected("queue wait exceeded", self._retry_after())
+        self._record_wait(time.monotonic() - start)
+
+    async def acquire_async(self, priority: int = PRIORITY_QUESTION):
+        """asyncio variant of acquire"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            # May run in another thread (a thread releasing its slot)
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        waiter = self._enter(priority, wake)
+        if waiter is None:
+            return
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self.max_wait)
+        except asyncio.TimeoutError:
+            if self._abandon(waiter):
+                raise AdmissionRejected("queue wait exceeded", self._retry_after())
+        except asyncio.CancelledError:
+            # The caller went away: give the slot back if it was granted meanwhile
+            if not self._abandon(waiter):
+                self.release()
+            raise
+        self._record_wait(time.monotonic() - start)
+
+    def release(self, held_seconds: float = None):
+        """Free a slot, handing it to the next waiter if there is one"""
+        with self._lock:
+            if held_seconds is not None:
+                self._avg_call_seconds = 0.8 * self._avg_call_seconds + 0.2 * held_seconds
+            if self._queue:
+                _, _, waiter = heapq.heappop(self._queue)
+                waiter.granted = True
+                waiter.wake()
+                return
+            self._active -= 1
+
+    def _enter(self, priority: int, wake):
+        # Admit immediately (returns None) or enqueue and return the waiter
+        with self._lock:
+            if self._active < self.max_concurrency and not self._queue:
+                self._active += 1
+                self._stats["admitted"] += 1
+                return None
+            if len(self._queue) >= self.max_queue:
+                self._stats["rejected_queue_full"] += 1
+                raise AdmissionRejected("queue full", self._retry_after_locked())
+            waiter = _Waiter(wake)
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            self._stats["queued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queue))
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        # Leave the queue after a timeout; False if the slot was granted in the meantime
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            self._stats["rejected_timeout"] += 1
+            return True
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["total_wait_seconds"] += seconds
+
+    def _retry_after(self) -> int:
+        with self._lock:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self) -> int:
+        # Time for the queue ahead to drain at the current call duration (1-60s)
+        rounds = (len(self._queue) + 1) / self.max_concurrency
+        return int(min(60, max(1, round(rounds * self._avg_call_seconds))))
+
+    def stats(self) -> dict:
+        """Admission counters for monitoring"""
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued_now": len(self._queue),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "avg_call_seconds": round(self._avg_call_seconds, 3),
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in self._stats.items()}
+            }
+
+
+# Admission controller shared by every request of this worker process
+_admission = AdmissionController()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_admission._reset)
+
+
+def get_admission() -> AdmissionController:
+    """Return the process-wide LLM admission controller"""
+    return _admission
@@ -1,91 +1,398 @@
-from services.chat_client import ChatClient
+from services.chat_client import TRANSIENT_ERRORS
+from services.llm_provider import create_chat_client
 from services.product_context import ProductContextProvider
+from services.response_stream import StreamingResponseParser, StreamingJsonMessageParser
+from services.response_parser import RESPONSE_SECTIONS, ResponseFormatError, answer_schema, get_response_parser
+from services.answer_cache import AnswerCache, get_answer_cache
+from services.catalog_snapshot import get_catalog
+from services.single_flight import get_single_flight, get_async_single_flight
+from services.local_recommender import LocalRecommender
+from services.resilience import CircuitOpenError
+from services.model_pool import PoolTimeoutError
+from services.admission import get_admission, PRIORITY_QUESTION
+from services.token_budget import get_token_usage
+from services.chat_sessions import get_session_store
+from services.faq_engine import get_faq_engine
+from config.settings import (
+    ANSWER_CACHE_ENABLED, SINGLE_FLIGHT_ENABLED, LOCAL_FALLBACK_ENABLED, LLM_OUTPUT_FORMAT, LLM_PARSE_RETRIES,
+    FAQ_FAST_PATH_ENABLED
+)
 import json
-import re
+import asyncio
+import logging
+
+# Extra output requested when the interest analysis is folded into the same call
+INTEREST_FORMAT_INSTRUCTIONS = """Also rate the customer's purchase interest from the user question ONLY:
+INTEREST_SCORE: [0-10, how close the customer is to buying]
+CONFIDENCE: [low/medium/high]
+KEYWORDS: [words from the question showing product interest, separated by commas, or none]
+INTENT: [phrases from the question showing purchase intent, separated by commas, or none]
+URGENCY: [words from the question showing urgency, separated by commas, or none]
+"""
+
+# Instructions sent after the question on every call (kept short: they are paid per request)
+RECOMMENDATION_INSTRUCTIONS = """Recommend ONLY the products from the list that match the question (price, features, category).
+Mention applicable promotions or seasonal deals. Favor budget-friendly, quality, time-saving or
+eco-friendly options when the question suggests it, and what is popular and well-reviewed.
+"""
+
+PROMPT_INSTRUCTIONS = RECOMMENDATION_INSTRUCTIONS + """
+Format your response EXACTLY like this:
+MESSAGE: [your response message here]
+PRODUCTS: [product names exactly as listed, separated by commas]
+"""
+
+# Same instructions for JSON output (LLM_OUTPUT_FORMAT=json); the schema itself is sent with the request
+JSON_PROMPT_INSTRUCTIONS = RECOMMENDATION_INSTRUCTIONS + """
+Answer with a JSON object: {"message": your response message, "products": [product names exactly as listed]}
+"""
+
+JSON_INTEREST_INSTRUCTIONS = """Also rate the customer's purchase interest from the user question ONLY, in the same object:
+"interest_score": 0-10 (how close the customer is to buying), "confidence": "low", "medium" or "high",
+"keywords", "intent", "urgency": words from the question showing product interest, purchase intent, urgency (may be empty)
+"""
+
+# Sent in the same chat when an answer cannot be read (LLM_PARSE_RETRIES)
+REFORMAT_PROMPTS = {
+    "json": "Your previous answer could not be read. Send it again as the JSON object only.",
+    "sections": "Your previous answer could not be read. Send it again using exactly the MESSAGE: and PRODUCTS: format."
+}
+
+# Failures meaning Gemini cannot answer right now (answered by the local recommender)
+UPSTREAM_UNAVAILABLE = (CircuitOpenError, PoolTimeoutError) + TRANSIENT_ERRORS
+
+# Everything answered by the local recommender, including answers still unreadable after the retries
+FALLBACK_ERRORS = UPSTREAM_UNAVAILABLE + (ResponseFormatError,)
 
 class AiService:
-    def __init__(self):
-        # Create a Gemini chat client instance
-        self.chat_client = ChatClient()
-    
-    def ask_question(self, user_message: str) -> dict:
-        # Fetch ALL products context with additional contexts
-        context = ProductContextProvider.fetch_product_context()
-        
-        # Start a new chat session with full context
-        self.chat_client.start_chat(context)
-        
-        # Create a comprehensive prompt that uses all contexts
-        enhanced_prompt = f"""
-        User question: {user_message}
-        
-        IMPORTANT: Use all available context to provide the best recommendations:
-        
-        1. PRODUCT FILTERING:
-        - Filter products based on the user's specific question (price, features, category)
-        - Only recommend products that match the user's requirements
-        
-        2. PROMOTIONAL OPPORTUNITIES:
-        - Mention relevant promotions when applicable
-        - Suggest deals that could benefit the user
-        
-        3. SEASONAL RECOMMENDATIONS:
-        - Consider current season for recommendations
-        - Suggest seasonal products when relevant
-        
-        4. CUSTOMER PREFERENCES:
-        - Consider budget-friendly options if user seems price-conscious
-        - Suggest quality products for users who prioritize quality
-        - Recommend convenient and time-saving products
-        - Consider eco-friendly options when appropriate
-        
-        5. CATEGORY INSIGHTS:
-        - Use category-specific knowledge for better recommendations
-        - Consider what's popular and well-reviewed in each category
-        
-        Answer the question helpfully, then recommend ONLY the most relevant products.
-        Mention any applicable promotions or seasonal considerations.
-        
-        Format your response EXACTLY like this:
-        MESSAGE: [your response message here]
-        PRODUCTS: [list of product names separated by commas]
-        
-        Example:
-        MESSAGE: Here are some great kitchen products for you. Don't forget we have 20% off on kitchen appliances this holiday season!
-        PRODUCTS: Chef Knife, Cutting Board, Non-stick Pan
+    def __init__(self, call_site: str = "ask_question"):
+        # Create a chat client for the configured LLM provider (Gemini by default)
+        self.chat_client = create_chat_client()
+        # Code path the model calls are recorded under (LLM telemetry)
+        self.chat_client.call_site = call_site
+
+    def ask_question(self, user_message: str, with_interest: bool = False, use_cache: bool = True,
+                     priority: int = PRIORITY_QUESTION, session=None, local_answers: bool = True) -> dict:
         """
-        
-        # Send the enhanced prompt to Gemini
-        response_text = self.chat_client.send_message(enhanced_prompt)
-        
-        # Parse the response to extract message and products
-        return self._parse_ai_response(response_text)
-    
-    def _parse_ai_response(self, response_text: str) -> dict:
-        """Parse the AI response to extract message and product recommendations"""
+        Ask Gemini a question about the catalog.
+        With with_interest=True the same call also returns the interest
+        signals (score, confidence, keywords, urgency) under 'interest_signals',
+        so no second LLM round-trip is needed for interest analysis.
+        Repeated questions are answered from the answer cache ('cached': True)
+        unless use_cache is False. Identical questions asked while a call is
+        already in flight wait for that call ('coalesced': True).
+        While Gemini is unavailable the local recommender answers instead
+        ('degraded': True); such answers are not cached.
+        Model calls go through the worker's admission controller with the
+        given priority and raise AdmissionRejected when it is saturated.
+        With a chat session the previous turns are sent as history and the
+        answer is recorded in the session; follow-up questions bypass the
+        cache and coalescing since their answer depends on the conversation.
+        Shipping, returns, warranty, payment and stock questions are
+        answered locally by the FAQ engine unless local_answers is False.
+        """
+        ai_response = self._local_answer(user_message, session) if local_answers else None
+        if ai_response is None:
+            ai_response = self._ask(user_message, with_interest, use_cache, priority, session)
+        if session is not None:
+            get_session_store().record_turn(session, user_message, ai_response)
+        return ai_response
+
+    def _ask(self, user_message: str, with_interest: bool, use_cache: bool, priority: int, session) -> dict:
+        """ask_question without the session bookkeeping"""
+        shared = session is None or not session.is_follow_up
+        key = self._cache_key(user_message, with_interest)
+        use_cache = use_cache and ANSWER_CACHE_ENABLED and shared
+        if use_cache:
+            cached = get_answer_cache().get(key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
         try:
-            # Extract message part
-            message_match = re.search(r'MESSAGE:\s*(.*?)(?=PRODUCTS:|$)', response_text, re.DOTALL)
-            message = message_match.group(1).strip() if message_match else response_text
-            
-            # Extract products part
-            products_match = re.search(r'PRODUCTS:\s*(.*)', response_text, re.DOTALL)
-            products_text = products_match.group(1).strip() if products_match else ""
-            
-            # Convert products text to array and get full product details
-            recommended_products = []
-            if products_text:
-                product_names = [name.strip() for name in products_text.split(',')]
-                recommended_products = ProductContextProvider.get_products_by_names(product_names)
-            
-            return {
-                'message': message,
-                'products': recommended_products
-            }
-            
-        except Exception as e:
-            # If parsing fails, return the original response with empty products
-            return {
-                'message': response_text,
-                'products': []
-            }
\ No newline at end of file
+            if SINGLE_FLIGHT_ENABLED and shared:
+                ai_response, coalesced = get_single_flight().do(
+                    key, lambda: self._ask_model(user_message, with_interest, priority, session)
+                )
+                if coalesced:
+                    ai_response['coalesced'] = True
+            else:
+                ai_response = self._ask_model(user_message, with_interest, priority, session)
+        except FALLBACK_ERRORS as e:
+            if not LOCAL_FALLBACK_ENABLED:
+                raise
+            logging.warning(f"No usable Gemini answer, answering from the local recommender: {e}")
+            return LocalRecommender.recommend(user_message)
+
+        if use_cache and not ai_response.get('coalesced'):
+            get_answer_cache().set(key, ai_response)
+        return ai_response
+
+    def _ask_model(self, user_message: str, with_interest: bool, priority: int = PRIORITY_QUESTION,
+                   session=None) -> dict:
+        """Send the question to Gemini and parse its answer"""
+        prompt = self._start_chat(user_message, with_interest, session)
+
+        # Send the prompt to Gemini once admitted
+        with get_admission().slot(priority):
+            response_text = self.chat_client.send_message(prompt)
+
+            # Parse the response to extract message and products
+            return self._parse_with_retries(response_text)
+
+    async def ask_question_async(self, user_message: str, with_interest: bool = False, use_cache: bool = True,
+                                 priority: int = PRIORITY_QUESTION, session=None, local_answers: bool = True) -> dict:
+        """
+        asyncio variant of ask_question (ASGI deployment), with the same
+        cache, coalescing, admission control, sessions, local FAQ answers and
+        local fallback. No thread is held while the model answers or while
+        waiting for admission.
+        """
+        # The snapshot check may query MongoDB: keep it off the event loop
+        await asyncio.to_thread(get_catalog)
+
+        # Product name matching for local answers is CPU work: off the event loop too
+        ai_response = None
+        if local_answers:
+            ai_response = await asyncio.to_thread(self._local_answer, user_message, session)
+        if ai_response is None:
+            ai_response = await self._ask_async(user_message, with_interest, use_cache, priority, session)
+        if session is not None:
+            await asyncio.to_thread(get_session_store().record_turn, session, user_message, ai_response)
+        return ai_response
+
+    async def _ask_async(self, user_message: str, with_interest: bool, use_cache: bool, priority: int,
+                         session) -> dict:
+        """ask_question_async without the session bookkeeping"""
+        shared = session is None or not session.is_follow_up
+        key = self._cache_key(user_message, with_interest)
+        use_cache = use_cache and ANSWER_CACHE_ENABLED and shared
+        if use_cache:
+            cached = get_answer_cache().get(key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
+        try:
+            if SINGLE_FLIGHT_ENABLED and shared:
+                ai_response, coalesced = await get_async_single_flight().do(
+                    key, lambda: self._ask_model_async(user_message, with_interest, priority, session)
+                )
+                if coalesced:
+                    ai_response['coalesced'] = True
+            else:
+                ai_response = await self._ask_model_async(user_message, with_interest, priority, session)
+        except FALLBACK_ERRORS as e:
+            if not LOCAL_FALLBACK_ENABLED:
+                raise
+            logging.warning(f"No usable Gemini answer, answering from the local recommender: {e}")
+            return LocalRecommender.recommend(user_message)
+
+        if use_cache and not ai_response.get('coalesced'):
+            get_answer_cache().set(key, ai_response)
+        return ai_response
+
+    async def _ask_model_async(self, user_message: str, with_interest: bool,
+                               priority: int = PRIORITY_QUESTION, session=None) -> dict:
+        """Send the question to the model without blocking the event loop"""
+        # Constraint extraction and BM25 ranking of the snapshot (and building its
+        # indexes, on the first request of a catalog version) run in a thread
+        prompt = await asyncio.to_thread(self._start_chat, user_message, with_interest, session)
+        async with get_admission().async_slot(priority):
+            response_text = await self.chat_client.send_message_async(prompt)
+            return await self._parse_with_retries_async(response_text)
+
+    def ask_question_stream(self, user_message: str, with_interest: bool = False, use_cache: bool = True,
+                            priority: int = PRIORITY_QUESTION, session=None, local_answers: bool = True):
+        """
+        Streaming variant of ask_question.
+        Yields {'event': 'token', 'text': ...} for each piece of the MESSAGE
+        section as it arrives, then {'event': 'result', 'response': ...} with
+        the same dict ask_question would have returned.
+        A cached answer, or the local recommender's answer when Gemini fails
+        before sending anything, is sent as a single token event.
+        The admission slot is held until the model stream ends; a saturated
+        worker raises AdmissionRejected before the first event.
+        The chat session and local FAQ answers are handled as in
+        ask_question; a local answer is sent as a single token event.
+        """
+        local_answer = self._local_answer(user_message, session) if local_answers else None
+        if local_answer is not None:
+            events = [{'event': 'token', 'text': local_answer['message']}, {'event': 'result', 'response': local_answer}]
+        else:
+            events = self._stream_answer(user_message, with_interest, use_cache, priority, session)
+
+        for event in events:
+            if event['event'] == 'result' and session is not None:
+                get_session_store().record_turn(session, user_message, event['response'])
+            yield event
+
+    def _stream_answer(self, user_message: str, with_interest: bool, use_cache: bool, priority: int, session):
+        """ask_question_stream without the session bookkeeping"""
+        shared = session is None or not session.is_follow_up
+        use_cache = use_cache and ANSWER_CACHE_ENABLED and shared
+        cache_key = self._cache_key(user_message, with_interest) if use_cache else None
+        if cache_key:
+            cached = get_answer_cache().get(cache_key)
+            if cached is not None:
+                cached['cached'] = True
+                yield {'event': 'token', 'text': cached.get('message', '')}
+                yield {'event': 'result', 'response': cached}
+                return
+
+        prompt = self._start_chat(user_message, with_interest, session)
+
+        if LLM_OUTPUT_FORMAT == "json":
+            parser = StreamingJsonMessageParser()
+        else:
+            parser = StreamingResponseParser(RESPONSE_SECTIONS)
+        sent_text = False
+        try:
+            with get_admission().slot(priority):
+                for chunk in self.chat_client.send_message_stream(prompt):
+                    text = parser.feed(chunk)
+                    if text:
+                        sent_text = True
+                        yield {'event': 'token', 'text': text}
+
+                text = parser.finish()
+                if text:
+                    sent_text = True
+                    yield {'event': 'token', 'text': text}
+
+                # Resolve products and interest signals from the complete answer
+                ai_response = self._parse_with_retries(parser.buffer)
+        except FALLBACK_ERRORS as e:
+            # Once text went out, only an unreadable answer is replaced (by the result event)
+            if not LOCAL_FALLBACK_ENABLED or (sent_text and not isinstance(e, ResponseFormatError)):
+                raise
+            logging.warning(f"No usable Gemini answer, answering from the local recommender: {e}")
+            fallback = LocalRecommender.recommend(user_message)
+            if not sent_text:
+                yield {'event': 'token', 'text': fallback['message']}
+            yield {'event': 'result', 'response': fallback}
+            return
+
+        if cache_key:
+            get_answer_cache().set(cache_key, ai_response)
+        yield {'event': 'result', 'response': ai_response}
+
+    @staticmethod
+    def _local_answer(user_message: str, session):
+        """FAQ engine answer, or None when the question needs the model"""
+        if not FAQ_FAST_PATH_ENABLED:
+            return None
+        return get_faq_engine().answer(user_message, session.last_products() if session is not None else [])
+
+    @staticmethod
+    def _cache_key(user_message: str, with_interest: bool) -> str:
+        """Answer cache / single-flight key for a question"""
+        mode = "interest" if with_interest else "answer"
+        return AnswerCache.make_key(user_message, get_catalog().version, mode)
+
+    def _start_chat(self, user_message: str, with_interest: bool, session=None) -> str:
+        """
+        Start a new chat with the product context relevant to the question
+        (and the session's previous turns) and return the prompt to send;
+        its estimated size is recorded
+        """
+        query, history = user_message, []
+        if session is not None and session.is_follow_up:
+            # Follow-ups ("and the cheaper one?") also retrieve the products just discussed
+            query = f"{user_message} {session.retrieval_hint()}"
+            history = session.history_messages()
+
+        # Constraints come from the question itself, not from the products of the hint
+        context = ProductContextProvider.fetch_product_context(query, constraints_from=user_message)
+        if session is not None and session.summary:
+            context += f"\n\nEarlier in this conversation the customer asked about: {session.summary}"
+        response_schema = answer_schema(with_interest) if LLM_OUTPUT_FORMAT == "json" else None
+        self.chat_client.start_chat(context, history, response_schema)
+
+        prompt = self._build_prompt(user_message, with_interest)
+        get_token_usage().record_prompt(context, *(part for message in history for part in message["parts"]), prompt)
+        return prompt
+
+    def _build_prompt(self, user_message: str, with_interest: bool = False) -> str:
+        """Create the compact prompt sent with the product context"""
+        if LLM_OUTPUT_FORMAT == "json":
+            instructions, interest_instructions = JSON_PROMPT_INSTRUCTIONS, JSON_INTEREST_INSTRUCTIONS
+        else:
+            instructions, interest_instructions = PROMPT_INSTRUCTIONS, INTEREST_FORMAT_INSTRUCTIONS
+        return f"User question: {user_message}\n\n{instructions}{interest_instructions if with_interest else ''}"
+
+    def ask_json(self, prompt: str, schema: dict, priority: int = PRIORITY_QUESTION) -> dict:
+        """
+        Send a standalone prompt (no product context) and return the JSON
+        object of the answer, validated against schema (response_parser
+        format). Raises ResponseFormatError if it stays unreadable.
+        """
+        self.chat_client.start_chat(None, response_schema=schema)
+        get_token_usage().record_prompt(prompt)
+        with get_admission().slot(priority):
+            response_text = self.chat_client.send_message(prompt)
+            return self._parse_with_retries(response_text, lambda text: get_response_parser().parse(text, schema))
+
+    def _parse_with_retries(self, response_text: str, parse=None):
+        """
+        Parse an answer; when it cannot be read, ask the model again in the
+        same chat, up to LLM_PARSE_RETRIES times. Called while holding the
+        admission slot of the request.
+        """
+        parse = parse or self._parse_ai_response
+        for _ in range(LLM_PARSE_RETRIES):
+            try:
+                return parse(response_text)
+            except ResponseFormatError as e:
+                get_response_parser().record_retry()
+                logging.warning(f"{e}, asking the model again")
+                response_text = self.chat_client.send_message(self._reformat_prompt())
+        return parse(response_text)
+
+    async def _parse_with_retries_async(self, response_text: str) -> dict:
+        """asyncio variant of _parse_with_retries (product names resolved in a thread)"""
+        for _ in range(LLM_PARSE_RETRIES):
+            try:
+                return await asyncio.to_thread(self._parse_ai_response, response_text)
+            except ResponseFormatError as e:
+                get_response_parser().record_retry()
+                logging.warning(f"{e}, asking the model again")
+                response_text = await self.chat_client.send_message_async(self._reformat_prompt())
+        return await asyncio.to_thread(self._parse_ai_response, response_text)
+
+    def _reformat_prompt(self) -> str:
+        return REFORMAT_PROMPTS["json" if self.chat_client.response_schema is not None else "sections"]
+
+    @staticmethod
+    def _interest_signals(data: dict):
+        """Build the generate_ai_keywords-shaped dict from the interest fields of an answer"""
+        if "interest_score" not in data:
+            return None
+
+        confidence = data.get("confidence", "low").strip().lower()
+        return {
+            "high_interest_keywords": data.get("keywords", []),
+            "purchase_intent_keywords": data.get("intent", []),
+            "urgency_indicators": data.get("urgency", []),
+            "interest_score": max(0, min(10, data["interest_score"])),
+            "confidence_level": confidence if confidence in ("low", "medium", "high") else "low",
+            "reasoning": "Scored in the same call as the recommendation"
+        }
+
+    def _parse_ai_response(self, response_text: str) -> dict:
+        """
+        Parse the AI response (JSON object or MESSAGE:/PRODUCTS: text) to
+        extract the message, product recommendations and interest signals.
+        Raises ResponseFormatError when the answer cannot be read.
+        """
+        data = get_response_parser().parse(response_text)
+
+        # Get full product details of the recommended names
+        product_names = data["products"]
+        recommended_products = ProductContextProvider.get_products_by_names(product_names) if product_names else []
+
+        return {
+            'message': data['message'],
+            'products': recommended_products,
+            'interest_signals': self._interest_signals(data)
+        }
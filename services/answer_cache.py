@@ -0,0 +1,92 @@
+import os
+import re
+import copy
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from config.settings import ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of parsed AI answers.
+
+    Keys combine the normalized question, the answer mode and the catalog
+    version, so a catalog change never serves answers about stale products.
+    Values are deep-copied in and out: callers may mutate what they get.
+    """
+
+    def __init__(self, max_size: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.clear()
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Case, accent, spacing and trailing punctuation insensitive form of a question"""
+        text = unicodedata.normalize("NFKD", question).encode("ascii", "ignore").decode("ascii")
+        text = re.sub(r"\s+", " ", text.casefold()).strip()
+        return text.rstrip(" ?!.")
+
+    @staticmethod
+    def make_key(question: str, catalog_version: str, mode: str = "") -> str:
+        """Build the cache key of a question"""
+        return f"{catalog_version}|{mode}|{AnswerCache.normalize_question(question)}"
+
+    def get(self, key: str):
+        """Return a copy of the cached answer, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: dict):
+        """Store an answer, evicting the least recently used ones if full"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                **self._stats
+            }
+
+
+# Answer cache shared by every request of this worker process
+_answer_cache = AnswerCache()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_answer_cache.clear)
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache"""
+    return _answer_cache
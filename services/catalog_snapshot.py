@@ -0,0 +1,241 @@
+import os
+import time
+import hashlib
+import itertools
+import logging
+import threading
+from config.settings import (
+    CATALOG_POLL_INTERVAL, CATALOG_MAX_AGE, CATALOG_CHANGE_STREAM,
+    PRODUCT_CONTEXT_TOP_K, PRODUCT_CONTEXT_FULL_THRESHOLD, PRODUCT_CONTEXT_FORMAT, PRODUCT_CONSTRAINT_FILTER
+)
+from models.product_model import Product
+from services.product_formatter import format_product_line, build_context
+from services.product_retriever import ProductRetriever
+from services.product_name_index import ProductNameIndex
+from services.constraint_extractor import ConstraintExtractor
+from services.token_budget import fit_product_context
+
+# Only the fields used to build the AI context and the product payloads
+PRODUCT_PROJECTION = {
+    "name": 1, "description": 1, "price": 1, "tags": 1, "category": 1, "image_url": 1,
+    "specs": 1, "brand": 1, "warranty": 1, "rating": 1, "reviews_count": 1,
+    "available": 1, "release_date": 1, "created_at": 1
+}
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of the product catalog at one catalog version.
+    Holds the parsed products, their pre-rendered context lines and lazily
+    built retrieval, name and constraint indexes. Never mutated once built, so it can be shared by
+    every request thread of the worker.
+    """
+
+    def __init__(self, products: list, catalog_version: int):
+        self.products = products
+        self.lines = [format_product_line(p) for p in products]
+        self.full_context = build_context(self.lines)
+        self.loaded_at = time.monotonic()
+
+        # Identifies the catalog content: version marker + digest of the rendered lines
+        digest = hashlib.blake2b(digest_size=6)
+        for product, line in zip(products, self.lines):
+            digest.update(str(product.get("_id", "")).encode())
+            digest.update(line.encode())
+        self.version = f"{catalog_version}-{digest.hexdigest()}"
+
+        self._retriever = None
+        self._name_index = None
+        self._constraint_extractor = None
+        self._full_table = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def retriever(self) -> ProductRetriever:
+        # Build the BM25 index on first use only
+        if self._retriever is None:
+            with self._index_lock:
+                if self._retriever is None:
+                    self._retriever = ProductRetriever(self.products)
+        return self._retriever
+
+    @property
+    def name_index(self) -> ProductNameIndex:
+        # Build the product name index on first use only
+        if self._name_index is None:
+            with self._index_lock:
+                if self._name_index is None:
+                    self._name_index = ProductNameIndex(self.products)
+        return self._name_index
+
+    @property
+    def constraint_extractor(self) -> ConstraintExtractor:
+        # Build the category/brand vocabulary on first use only
+        if self._constraint_extractor is None:
+            with self._index_lock:
+                if self._constraint_extractor is None:
+                    self._constraint_extractor = ConstraintExtractor(self.products)
+        return self._constraint_extractor
+
+    def context_for(self, question: str = None, constraints_from: str = None) -> str:
+        """
+        Product context for a question (top-k products on large catalogs),
+        as the compact table fitted to the token budget unless
+        PRODUCT_CONTEXT_FORMAT is "prose".
+
+        With PRODUCT_CONSTRAINT_FILTER, only the products within the price
+        and stock constraints stated in constraints_from (default: the
+        question) are sent, those of the categories and brands it names
+        first; when no product matches every constraint, the usual context
+        is sent with a note asking the model to say so.
+        """
+        indices, note = None, ""
+        constraints = None
+        if PRODUCT_CONSTRAINT_FILTER and (constraints_from or question):
+            constraints = self.constraint_extractor.extract(constraints_from or question)
+        if constraints:
+            allowed = [i for i, product in enumerate(self.products) if constraints.allows(product)]
+            preferred = [i for i in allowed if constraints.prefers(self.products[i])]
+            if not preferred:
+                note = (f"\n\nNo product matches the customer's constraints ({constraints.describe()}): "
+                        "say so and suggest the closest products below.")
+            elif question and len(allowed) > PRODUCT_CONTEXT_FULL_THRESHOLD:
+                indices = self._ranked(question, allowed, preferred)
+            else:
+                named = set(preferred)
+                indices = preferred + [i for i in allowed if i not in named]
+
+        if indices is None and question and len(self.products) > PRODUCT_CONTEXT_FULL_THRESHOLD:
+            indices = self.retriever.top_k_indices(question, PRODUCT_CONTEXT_TOP_K)
+
+        if PRODUCT_CONTEXT_FORMAT == "prose":
+            context = build_context([self.lines[i] for i in indices]) if indices is not None else self.full_context
+        elif indices is not None:
+            context = fit_product_context([self.products[i] for i in indices])[0]
+        else:
+            if self._full_table is None:
+                self._full_table = fit_product_context(self.products)[0]
+            context = self._full_table
+        return context + note
+
+    def _ranked(self, question: str, allowed: list, preferred: list) -> list:
+        # Top-k of the products of the named categories/brands interleaved with the
+        # top-k of every allowed product, so "phone case" still reaches the cases
+        k = PRODUCT_CONTEXT_TOP_K
+        if len(preferred) == len(allowed):
+            return self.retriever.top_k_indices(question, k, set(allowed))
+        ranked = itertools.chain.from_iterable(itertools.zip_longest(
+            self.retriever.top_k_indices(question, k, set(preferred)),
+            self.retriever.top_k_indices(question, k, set(allowed))
+        ))
+        return list(dict.fromkeys(i for i in ranked if i is not None))[:k]
+
+
+class CatalogCache:
+    """
+    Per-worker holder of the current CatalogSnapshot.
+
+    The snapshot is reloaded when:
+    - a product is written through the Product model in this process,
+    - the shared catalog version (bumped by Product writes in any worker)
+      changes; it is polled at most every CATALOG_POLL_INTERVAL seconds,
+    - a MongoDB change stream reports a product change (optional,
+      CATALOG_CHANGE_STREAM=true, requires a replica set),
+    - the snapshot is older than CATALOG_MAX_AGE seconds, which covers
+      edits made directly in the database.
+    Between reloads the /ai/ask path does not query the products collection.
+    """
+
+    def __init__(self, poll_interval: float = CATALOG_POLL_INTERVAL, max_age: float = CATALOG_MAX_AGE,
+                 use_change_stream: bool = CATALOG_CHANGE_STREAM):
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.use_change_stream = use_change_stream
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._dirty = True
+        self._last_poll = 0.0
+        self._watcher_pid = None
+        self._stats = {"loads": 0, "polls": 0}
+
+    def invalidate(self):
+        """Force a reload on the next get()"""
+        self._dirty = True
+
+    def get(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading it if it is stale"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and not self._dirty and now - self._last_poll < self.poll_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._dirty and now - self._last_poll < self.poll_interval:
+                return snapshot
+
+            self._start_watcher()
+            self._stats["polls"] += 1
+            catalog_version = Product.get_catalog_version()
+            stale = (
+                snapshot is None
+                or self._dirty
+                or not snapshot.version.startswith(f"{catalog_version}-")
+                or now - snapshot.loaded_at > self.max_age
+            )
+            if stale:
+                # Clear the flag first so writes during the load trigger another reload
+                self._dirty = False
+                products = Product.find_all(projection=PRODUCT_PROJECTION)
+                self._snapshot = CatalogSnapshot(products, catalog_version)
+                self._stats["loads"] += 1
+            self._last_poll = now
+            return self._snapshot
+
+    def stats(self) -> dict:
+        """Snapshot counters for monitoring"""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "products": len(snapshot.products) if snapshot else 0,
+            "age_seconds": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+            **self._stats
+        }
+
+    def _start_watcher(self):
+        # Start the change stream thread once per process (if enabled)
+        if not self.use_change_stream or self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch_changes, name="catalog-watcher", daemon=True).start()
+
+    def _watch_changes(self):
+        try:
+            with Product.collection.watch() as stream:
+                for _ in stream:
+                    self.invalidate()
+        except Exception as e:
+            # Standalone servers have no change streams: polling still applies
+            logging.warning(f"Catalog change stream stopped, relying on polling: {e}")
+
+
+# Snapshot shared by every request of this worker process
+_catalog_cache = CatalogCache()
+Product.on_change(_catalog_cache.invalidate)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_catalog_cache._reset)
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Return the process-wide catalog cache"""
+    return _catalog_cache
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Return the current catalog snapshot of this worker"""
+    return _catalog_cache.get()
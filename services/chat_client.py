@@ -1,66 +1,318 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import abc
+import time
 import logging
+from google.api_core import exceptions as google_exceptions
+from config.settings import (
+    GEMINI_MODEL_NAME, GEMINI_DEADLINE, GEMINI_CALL_TIMEOUT, GEMINI_MAX_ATTEMPTS,
+    GEMINI_RETRY_BASE_DELAY, GEMINI_RETRY_MAX_DELAY
+)
+from services.model_pool import get_model_pool
+from services.resilience import get_circuit_breaker, call_with_retry, call_with_retry_async
+from services.token_budget import estimate_tokens
+from services.llm_telemetry import get_llm_telemetry
 
-# Load environment variables from the .env file
-load_dotenv()
+# Transient upstream errors: retried, and counted by the circuit breaker
+TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable, google_exceptions.DeadlineExceeded,
+    google_exceptions.ResourceExhausted, google_exceptions.InternalServerError,
+    google_exceptions.BadGateway, google_exceptions.GatewayTimeout,
+    TimeoutError, ConnectionError
+)
 
-class ChatClient:
-    def __init__(self, model_name="models/gemini-1.5-flash"):
-        """
-        Initializes the chat client by loading the API key,
-        configuring the generative AI client, and setting the model.
-        """
-        # Get the Gemini API key from environment variables change tehe api key
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        
-        # If the API key is not set, raise an error
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not set.")
-        
-        # Configure the generative AI client with the API key
-        genai.configure(api_key=self.api_key)
-        
-        # Load the specified Gemini model (default: gemini-1.5-flash)
-        self.model = genai.GenerativeModel(model_name)
-        
-        # Placeholder for the active chat session
-        self.chat = None
-    
-    def start_chat(self, initial_context: str):
+
+def is_transient_error(error: Exception) -> bool:
+    """True for errors that say the upstream is unhealthy rather than the request invalid"""
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class BaseChatClient(abc.ABC):
+    """
+    Provider-independent part of a chat client: the message history,
+    deadlines, retries and the circuit breaker.
+    Providers implement _send_once(message, timeout) -> text,
+    _send_once_async(message, timeout) -> text (coroutine) and
+    _stream(message, timeout) -> iterator of text chunks; they read
+    self.history and store the updated history when they succeed, and set
+    self.last_usage to the (prompt, completion) token counts the model
+    reports, if any. Every call is recorded in the LLM telemetry under
+    self.call_site.
+    """
+
+    # Name used in logs and metrics
+    provider = "base"
+    model_name = "unknown"
+
+    def __init__(self):
+        # Message history of the active chat session (None until started)
+        self.history = None
+        # Schema the model's answers must follow (JSON output), if any
+        self.response_schema = None
+        # Code path the calls are made for (telemetry)
+        self.call_site = "other"
+        # (prompt, completion) tokens reported for the last call, None to estimate them
+        self.last_usage = None
+
+    def start_chat(self, initial_context: str, history: list = None, response_schema: dict = None):
         """
         Starts a chat session with an initial context.
         This context guides the AI's answers throughout the conversation.
+        Previous turns of the conversation ({"role", "parts"} messages) can
+        be given as history. With a response_schema the model answers with
+        a JSON object following it. Without initial context the chat starts
+        empty (standalone requests).
         """
+        self.response_schema = response_schema
+        if initial_context is None:
+            self.history = list(history or [])
+            return
+
+        output_format = "the requested JSON object" if response_schema else "MESSAGE: and PRODUCTS: as requested"
         # Start a new chat with a predefined message history:
-        self.chat = self.model.start_chat(history=[
+        self.history = [
             # User provides the context (e.g., product list)
             {"role": "user", "parts": [initial_context]},
-            
+
             # AI acknowledges and agrees to answer based only on this context
             {"role": "model", "parts": [
-                "Okay, I will answer based on this product list and recommend relevant products. I will format my responses with MESSAGE: and PRODUCTS: as requested."
+                f"Okay, I will answer based on this product list and recommend relevant products. I will format my responses with {output_format}."
             ]}
-        ])
-    
-    def send_message(self, message: str) -> str:
+        ] + list(history or [])
+
+    def send_message(self, message: str, deadline: float = GEMINI_DEADLINE) -> str:
         """
         Sends a message to the active chat and returns the model's response.
+        Transient failures are retried with jittered backoff until the
+        deadline (seconds) is used up; every attempt goes through the LLM
+        circuit breaker, which raises CircuitOpenError while the upstream is down.
         Raises an error if the chat hasn't been started yet.
         """
         # Ensure that the chat session is initialized
-        if not self.chat:
+        if self.history is None:
             raise RuntimeError("Chat not started")
-        
+
+        started, prompt_tokens = time.monotonic(), self._estimate_prompt_tokens(message)
+        text = None
         try:
-            # Send the message to the model and receive the response
-            response = self.chat.send_message(message)
-            
-            # Return only the text portion of the model's reply
-            return response.text
-        
+            text = call_with_retry(
+                lambda remaining: self._send_once(message, remaining),
+                deadline=deadline,
+                max_attempts=GEMINI_MAX_ATTEMPTS,
+                base_delay=GEMINI_RETRY_BASE_DELAY,
+                max_delay=GEMINI_RETRY_MAX_DELAY,
+                retry_if=is_transient_error
+            )
+            return text
+
+        except Exception as e:
+            # Log any exception that occurs and re-raise it
+            logging.error(f"{self.provider} send_message error: {e}")
+            raise
+
+        finally:
+            self._record_call(started, prompt_tokens, text)
+
+    async def send_message_async(self, message: str, deadline: float = GEMINI_DEADLINE) -> str:
+        """
+        asyncio variant of send_message, with the same retries, deadline and
+        circuit breaker; the event loop is free while the model answers.
+        """
+        # Ensure that the chat session is initialized
+        if self.history is None:
+            raise RuntimeError("Chat not started")
+
+        started, prompt_tokens = time.monotonic(), self._estimate_prompt_tokens(message)
+        text = None
+        try:
+            text = await call_with_retry_async(
+                lambda remaining: self._send_once_async(message, remaining),
+                deadline=deadline,
+                max_attempts=GEMINI_MAX_ATTEMPTS,
+                base_delay=GEMINI_RETRY_BASE_DELAY,
+                max_delay=GEMINI_RETRY_MAX_DELAY,
+                retry_if=is_transient_error
+            )
+            return text
+
         except Exception as e:
             # Log any exception that occurs and re-raise it
-            logging.error(f"Gemini send_message error: {e}")
-            raise
\ No newline at end of file
+            logging.error(f"{self.provider} send_message_async error: {e}")
+            raise
+
+        finally:
+            self._record_call(started, prompt_tokens, text)
+
+    def send_message_stream(self, message: str):
+        """
+        Sends a message to the active chat and yields the response text
+        chunk by chunk as the model produces it.
+        Goes through the circuit breaker, but is not retried: chunks may
+        already have been forwarded when a failure happens.
+        """
+        # Ensure that the chat session is initialized
+        if self.history is None:
+            raise RuntimeError("Chat not started")
+
+        started, prompt_tokens = time.monotonic(), self._estimate_prompt_tokens(message)
+        chunks, failed = [], False
+        try:
+            # Fail fast while the upstream is known to be down
+            get_circuit_breaker().check()
+            for chunk in self._stream(message, GEMINI_CALL_TIMEOUT):
+                chunks.append(chunk)
+                yield chunk
+
+        except Exception as e:
+            # Log any exception that occurs and re-raise it
+            failed = True
+            logging.error(f"{self.provider} send_message_stream error: {e}")
+            raise
+
+        finally:
+            # A consumer that stops early still used the tokens sent so far
+            self._record_call(started, prompt_tokens, None if failed else "".join(chunks))
+
+    def _estimate_prompt_tokens(self, message: str) -> int:
+        # History (dict messages, or Gemini Content objects once a call went through) plus the message
+        tokens = estimate_tokens(message)
+        for content in self.history or []:
+            parts = content["parts"] if isinstance(content, dict) else content.parts
+            tokens += sum(estimate_tokens(part if isinstance(part, str) else getattr(part, "text", ""))
+                          for part in parts)
+        return tokens
+
+    def _record_call(self, started: float, prompt_tokens: int, text):
+        # Telemetry of one call; text is None when it failed
+        usage, self.last_usage = self.last_usage, None
+        if usage is None:
+            usage = (prompt_tokens, estimate_tokens(text or ""))
+        get_llm_telemetry().record(self.call_site, self.model_name, time.monotonic() - started,
+                                   usage[0], usage[1], ok=text is not None)
+
+    @abc.abstractmethod
+    def _send_once(self, message: str, remaining: float) -> str:
+        """One attempt of send_message, bounded by the remaining deadline"""
+
+    @abc.abstractmethod
+    async def _send_once_async(self, message: str, remaining: float) -> str:
+        """Coroutine variant of _send_once"""
+
+    @abc.abstractmethod
+    def _stream(self, message: str, timeout: float):
+        """Iterator of the answer's text chunks"""
+
+    def _generation_config(self):
+        # Constrain the output to the response schema (JSON mode), if any
+        if self.response_schema is None:
+            return None
+        return {"response_mime_type": "application/json", "response_schema": self.response_schema}
+
+
+class ChatClient(BaseChatClient):
+    """Gemini chat client (google.generativeai)"""
+
+    provider = "gemini"
+
+    def __init__(self, model_name=GEMINI_MODEL_NAME):
+        """
+        Initializes the chat client.
+        Model handles come from the process-wide pool, so building a client
+        is cheap and genai.configure() is not re-run for every request.
+        """
+        super().__init__()
+
+        # Name of the Gemini model to use (default: gemini-1.5-flash)
+        self.model_name = model_name
+
+        # Shared pool of warm model handles for this worker process
+        self.pool = get_model_pool()
+
+    def _send_once(self, message: str, remaining: float) -> str:
+        """One attempt of send_message, bounded by the remaining deadline"""
+        # Fail fast before waiting for a model handle
+        breaker = get_circuit_breaker()
+        breaker.check()
+
+        # Never wait for a handle longer than the call itself may take
+        pool_timeout = min(self.pool.acquire_timeout, remaining)
+        with self.pool.lease(self.model_name, timeout=pool_timeout) as model:
+            chat = model.start_chat(history=self.history)
+
+            # Send the message to the model and receive the response;
+            # retries are ours, so the client library must not add its own
+            request_options = {"timeout": min(GEMINI_CALL_TIMEOUT, remaining), "retry": None}
+            response = breaker.call(
+                lambda: chat.send_message(message, generation_config=self._generation_config(),
+                                          request_options=request_options),
+                is_failure=is_transient_error
+            )
+
+            # Keep the conversation going on the next send_message
+            self.history = list(chat.history)
+            self.last_usage = self._usage(response)
+
+            # Return only the text portion of the model's reply
+            return response.text
+
+    async def _send_once_async(self, message: str, remaining: float) -> str:
+        """One attempt of send_message_async, on Gemini's asyncio client"""
+        # Fail fast before waiting for a concurrency slot
+        breaker = get_circuit_breaker()
+        breaker.check()
+
+        slot_timeout = min(self.pool.acquire_timeout, remaining)
+        async with self.pool.async_lease(self.model_name, timeout=slot_timeout) as model:
+            chat = model.start_chat(history=self.history)
+
+            request_options = {"timeout": min(GEMINI_CALL_TIMEOUT, remaining), "retry": None}
+            response = await breaker.call_async(
+                lambda: chat.send_message_async(message, generation_config=self._generation_config(),
+                                                request_options=request_options),
+                is_failure=is_transient_error
+            )
+
+            # Keep the conversation going on the next send_message
+            self.history = list(chat.history)
+            self.last_usage = self._usage(response)
+            return response.text
+
+    def _stream(self, message: str, timeout: float):
+        """Streamed Gemini call; the model handle stays leased until it is consumed"""
+        # Never wait for a handle longer than the call itself may take
+        with self.pool.lease(self.model_name, timeout=min(self.pool.acquire_timeout, timeout)) as model:
+            chat = model.start_chat(history=self.history)
+
+            # Ask for a streamed response and forward each text chunk
+            request_options = {"timeout": timeout, "retry": None}
+            response = None
+
+            def send():
+                nonlocal response
+                response = chat.send_message(message, stream=True, generation_config=self._generation_config(),
+                                             request_options=request_options)
+                return self._chunk_texts(response)
+
+            yield from get_circuit_breaker().stream(send, is_failure=is_transient_error)
+            # The usage is known once the last chunk arrived
+            self.last_usage = self._usage(response)
+
+            # Keep the conversation going on the next send_message
+            self.history = list(chat.history)
+
+    @staticmethod
+    def _usage(response):
+        # (prompt, completion) tokens reported by Gemini, if any
+        usage = getattr(response, "usage_metadata", None)
+        if not usage or not getattr(usage, "prompt_token_count", 0):
+            return None
+        return usage.prompt_token_count, usage.candidates_token_count
+
+    @staticmethod
+    def _chunk_texts(response):
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. the final one) are skipped
+                continue
+            if text:
+                yield text
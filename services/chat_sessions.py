@@ -0,0 +1,188 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from bson import ObjectId
+from bson.errors import InvalidId
+from config.settings import CHAT_SESSION_CACHE_SIZE, CHAT_HISTORY_MAX_TOKENS, CHAT_SUMMARY_MAX_CHARS
+from services.token_budget import estimate_tokens
+from services.response_parser import render_answer
+
+
+class ChatSession:
+    """
+    State of one chat conversation: the recent turns sent to the model as
+    history and a short summary of the older ones. Never mutated once
+    stored: record_turn builds the next state.
+    """
+
+    __slots__ = ("conversation_id", "turns", "summary", "version")
+
+    def __init__(self, conversation_id: str, turns: list = None, summary: str = "", version: int = 0):
+        self.conversation_id = conversation_id
+        self.turns = turns or []  # [{"question", "answer", "products"}], oldest first
+        self.summary = summary
+        self.version = version  # number of turns recorded so far
+
+    @property
+    def is_follow_up(self) -> bool:
+        """True once the conversation has previous turns"""
+        return self.version > 0
+
+    def history_messages(self) -> list:
+        """Previous turns as chat messages (user question, model answer)"""
+        messages = []
+        for turn in self.turns:
+            messages.append({"role": "user", "parts": [f"User question: {turn['question']}"]})
+            messages.append({"role": "model", "parts": [
+                render_answer({"message": turn["answer"], "products": turn["products"]})
+            ]})
+        return messages
+
+    def last_products(self) -> list:
+        """Names of the products suggested in the last turn"""
+        return self.turns[-1]["products"] if self.turns else []
+
+    def retrieval_hint(self) -> str:
+        """Products of the last turn, so follow-ups like "the cheaper one" find them"""
+        return " ".join(self.last_products())
+
+
+class ChatSessionStore:
+    """
+    Per-worker LRU of live chat sessions, written through to the
+    conversations collection.
+
+    Every recorded turn is saved on the conversation document (history,
+    summary, turns counter), so an evicted session, or one served by
+    another worker, is reloaded from MongoDB. The save only applies if the
+    stored turns counter is the one the session was read at; otherwise the
+    session is reloaded and the turn recorded on top of the newer state.
+    Past turns are kept within max_history_tokens; older ones are folded
+    into a summary of at most summary_max_chars characters.
+    """
+
+    def __init__(self, max_sessions: int = CHAT_SESSION_CACHE_SIZE,
+                 max_history_tokens: int = CHAT_HISTORY_MAX_TOKENS,
+                 summary_max_chars: int = CHAT_SUMMARY_MAX_CHARS):
+        self.max_sessions = max(1, max_sessions)
+        self.max_history_tokens = max_history_tokens
+        self.summary_max_chars = summary_max_chars
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # conversation_id -> ChatSession
+        self._stats = {"hits": 0, "loads": 0, "created": 0, "evictions": 0, "conflicts": 0, "summarized_turns": 0}
+
+    def get(self, conversation_id: str = None) -> ChatSession:
+        """Return the session of a conversation, or a new one for an unknown/missing id"""
+        if conversation_id:
+            with self._lock:
+                session = self._sessions.get(conversation_id)
+                if session is not None:
+                    self._sessions.move_to_end(conversation_id)
+                    self._stats["hits"] += 1
+                    return session
+
+            session = self._load(conversation_id)
+            if session is not None:
+                self._remember(session)
+                return session
+
+        with self._lock:
+            self._stats["created"] += 1
+        return ChatSession(str(ObjectId()))
+
+    def record_turn(self, session: ChatSession, question: str, response: dict) -> ChatSession:
+        """
+        Append a question and its answer to the conversation and save it.
+        Returns the new session state.
+        """
+        turn = {
+            "question": question,
+            "answer": response.get("message", ""),
+            "products": [product.get("name", "") for product in response.get("products", [])]
+        }
+
+        for _ in range(2):
+            updated = self._compact(ChatSession(session.conversation_id, session.turns + [turn],
+                                                session.summary, session.version + 1))
+            if self._save(session.version, updated):
+                self._remember(updated)
+                return updated
+
+            # Another request recorded a turn first: build on the stored state
+            with self._lock:
+                self._stats["conflicts"] += 1
+            session = self._load(session.conversation_id) or ChatSession(session.conversation_id)
+
+        logging.warning(f"Could not save chat turn of conversation {session.conversation_id}")
+        return session
+
+    def _compact(self, session: ChatSession) -> ChatSession:
+        # Fold the oldest turns into the summary until the history fits the token window
+        turns = list(session.turns)
+        summary = session.summary
+        while len(turns) > 1 and self._history_tokens(turns) > self.max_history_tokens:
+            oldest = turns.pop(0)
+            entry = oldest["question"]
+            if oldest["products"]:
+                entry += f" (suggested: {', '.join(oldest['products'])})"
+            summary = f"{summary}; {entry}" if summary else entry
+            with self._lock:
+                self._stats["summarized_turns"] += 1
+        if len(summary) > self.summary_max_chars:
+            # Keep the most recent part of the summary
+            summary = "..." + summary[-(self.summary_max_chars - 3):]
+        return ChatSession(session.conversation_id, turns, summary, session.version)
+
+    @staticmethod
+    def _history_tokens(turns: list) -> int:
+        return sum(estimate_tokens(turn["question"]) + estimate_tokens(turn["answer"]) + 2 * len(turn["products"])
+                   for turn in turns)
+
+    def _load(self, conversation_id: str):
+        from models.conversation_model import Conversation
+        try:
+            document = Conversation.find_chat_state(conversation_id)
+        except InvalidId:
+            return None
+        if document is None:
+            return None
+        with self._lock:
+            self._stats["loads"] += 1
+        return ChatSession(conversation_id, document.get("history") or [], document.get("summary") or "",
+                           document.get("turns") or 0)
+
+    @staticmethod
+    def _save(expected_version: int, session: ChatSession) -> bool:
+        from models.conversation_model import Conversation
+        return Conversation.save_chat_state(session.conversation_id, expected_version, session.turns, session.summary)
+
+    def _remember(self, session: ChatSession):
+        with self._lock:
+            self._sessions[session.conversation_id] = session
+            self._sessions.move_to_end(session.conversation_id)
+            while len(self._sessions) > self.max_sessions:
+                # Already saved: evicted sessions are reloaded from MongoDB when needed
+                self._sessions.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Session counters for monitoring"""
+        with self._lock:
+            return {"live_sessions": len(self._sessions), "max_sessions": self.max_sessions, **self._stats}
+
+
+# Chat sessions shared by every request of this worker process
+_session_store = ChatSessionStore()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_session_store._reset)
+
+
+def get_session_store() -> ChatSessionStore:
+    """Return the process-wide chat session store"""
+    return _session_store
@@ -0,0 +1,172 @@
+import re
+from services.product_name_index import normalize_name
+
+# Amount with an optional currency and thousands suffix: "$1,000", "1000€", "1.5k", "800 dollars";
+# numbers followed by a unit ("16GB", "2 years", "13 inch") are not prices
+AMOUNT = (
+    r"(?:\$|€|usd\s*)?\s*(\d{1,3}(?:[ ,]\d{3})+|\d+(?:[.,]\d+)?)\s*(k\b)?"
+    r"(?!\s*(?:gb|go|tb|mb|ghz|hz|mp|mah|w\b|inch|pouces?|\"|%|years?|ans?\b|months?|mois|days?|jours?|"
+    r"hours?|heures?|h\b|cores?|coeurs?|kg|kilos?|g\b|grams?|grammes?|lbs?\b|pounds?|oz\b|"
+    r"cm|mm|m\b|meters?|metres?|mètres?|ft\b|feet|[.,]?\d))"
+    r"\s*(?:\$|€|usd\b|eur\b|euros?\b|dollars?\b|dh\b|mad\b)?"
+)
+
+MAX_PRICE_PATTERN = re.compile(
+    r"(?:\b(?:under|below|less than|cheaper than|at most|max(?:imum)?|up to|no more than|budget(?: of| is)?|"
+    r"moins de|moins que|en dessous de|sous|jusqu'?à|pas plus de|budget(?: de)?)|<=?)\s*" + AMOUNT,
+    re.IGNORECASE
+)
+MIN_PRICE_PATTERN = re.compile(
+    r"(?:\b(?:over|above|more than|at least|min(?:imum)?|starting at|"
+    r"plus de|au moins|au-dessus de|à partir de)|>=?)\s*" + AMOUNT,
+    re.IGNORECASE
+)
+RANGE_PATTERN = re.compile(r"\b(?:between|entre)\s*" + AMOUNT + r"\s*(?:and|et|-|to|à)\s*" + AMOUNT, re.IGNORECASE)
+# Only explicit phrases: "is the X available in blue?" asks about the product, not for a stock filter
+IN_STOCK_PATTERN = re.compile(r"\b(?:in stock|en stock)\b", re.IGNORECASE)
+
+# Words naming the same kind of product (singular, accent-free): a category named
+# with one of them is also found through the others
+CATEGORY_SYNONYMS = [
+    {"laptop", "notebook", "ordinateur", "computer"},
+    {"phone", "smartphone", "telephone", "mobile"},
+    {"accessory", "accessoire"},
+]
+
+
+def singular(word: str) -> str:
+    """Rough English/French singular of a normalized word"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith(("s", "x")) and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _amount(number: str, thousands: str) -> float:
+    # "1,000" / "1 000" -> 1000, "1,5" -> 1.5, "1.5" + "k" -> 1500
+    if re.fullmatch(r"\d{1,3}(?:[ ,]\d{3})+", number):
+        value = float(re.sub(r"[ ,]", "", number))
+    else:
+        value = float(number.replace(",", "."))
+    return value * 1000 if thousands else value
+
+
+class QuestionConstraints:
+    """
+    Constraints read from a question. Price bounds and "in stock" are hard
+    (allows); categories and brands only rank products first (prefers), since
+    a question naming one kind of product often asks about another ("phone
+    case").
+    """
+
+    __slots__ = ("min_price", "max_price", "categories", "brands", "in_stock")
+
+    def __init__(self, min_price: float = None, max_price: float = None, categories: set = None,
+                 brands: set = None, in_stock: bool = False):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.categories = categories or set()  # catalog category names
+        self.brands = brands or set()  # catalog brand names
+        self.in_stock = in_stock
+
+    def __bool__(self) -> bool:
+        return (self.min_price is not None or self.max_price is not None or bool(self.categories)
+                or bool(self.brands) or self.in_stock)
+
+    def allows(self, product: dict) -> bool:
+        """True if the product satisfies the price and stock constraints"""
+        price = product.get("price")
+        if self.min_price is not None or self.max_price is not None:
+            if not isinstance(price, (int, float)):
+                return False
+            if self.min_price is not None and price < self.min_price:
+                return False
+            if self.max_price is not None and price > self.max_price:
+                return False
+        if self.in_stock and not product.get("available", True):
+            return False
+        return True
+
+    def prefers(self, product: dict) -> bool:
+        """True if the product is of the categories and brands named, if any"""
+        if self.categories and product.get("category") not in self.categories:
+            return False
+        if self.brands and product.get("brand") not in self.brands:
+            return False
+        return True
+
+    def describe(self) -> str:
+        """Short description of the constraints, for the model"""
+        parts = sorted(self.brands) + sorted(self.categories)
+        if self.min_price is not None and self.max_price is not None:
+            parts.append(f"between ${self.min_price:g} and ${self.max_price:g}")
+        elif self.max_price is not None:
+            parts.append(f"up to ${self.max_price:g}")
+        elif self.min_price is not None:
+            parts.append(f"from ${self.min_price:g}")
+        if self.in_stock:
+            parts.append("in stock")
+        return ", ".join(parts)
+
+
+class ConstraintExtractor:
+    """
+    Reads price bounds ("under $1000", "entre 500 et 800 €"), catalog
+    categories and brands and "in stock" from a question, with regular
+    expressions and the catalog's own category and brand vocabulary.
+    Built once per catalog snapshot.
+    """
+
+    def __init__(self, products: list):
+        # singular word sequence -> catalog names
+        self.categories = {}
+        self.brands = {}
+        for product in products:
+            for field, vocabulary in (("category", self.categories), ("brand", self.brands)):
+                value = product.get(field)
+                if value and isinstance(value, str):
+                    words = tuple(singular(word) for word in normalize_name(value).split())
+                    if words:
+                        vocabulary.setdefault(words, set()).add(value)
+
+        for words, names in list(self.categories.items()):
+            for synonyms in CATEGORY_SYNONYMS:
+                if len(words) == 1 and words[0] in synonyms:
+                    for synonym in synonyms:
+                        self.categories.setdefault((synonym,), set()).update(names)
+
+    def extract(self, question: str) -> QuestionConstraints:
+        """Constraints of a question (empty when it states none)"""
+        if not question:
+            return QuestionConstraints()
+        constraints = QuestionConstraints(in_stock=bool(IN_STOCK_PATTERN.search(question)))
+
+        price_range = RANGE_PATTERN.search(question)
+        if price_range:
+            low, high = _amount(*price_range.group(1, 2)), _amount(*price_range.group(3, 4))
+            constraints.min_price, constraints.max_price = min(low, high), max(low, high)
+        else:
+            maximum = MAX_PRICE_PATTERN.search(question)
+            minimum = MIN_PRICE_PATTERN.search(question)
+            if maximum:
+                constraints.max_price = _amount(*maximum.group(1, 2))
+            if minimum:
+                constraints.min_price = _amount(*minimum.group(1, 2))
+
+        words = [singular(word) for word in normalize_name(question).split()]
+        constraints.categories = self._find(words, self.categories)
+        constraints.brands = self._find(words, self.brands)
+        return constraints
+
+    @staticmethod
+    def _find(words: list, vocabulary: dict) -> set:
+        # Catalog names whose words appear consecutively in the question
+        found = set()
+        for phrase, names in vocabulary.items():
+            size = len(phrase)
+            if any(tuple(words[i:i + size]) == phrase for i in range(len(words) - size + 1)):
+                found.update(names)
+        return found
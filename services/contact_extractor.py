@@ -216,19 +216,81 @@ class ContactExtractor:
         return has_email or has_phone or has_keywords
     
     @staticmethod
-    def generate_follow_up_message(extracted_data: Dict) -> str:
+    def detect_language(text: str) -> str:
+        """
+        Guess whether the user writes in French ('fr') or English ('en').
+        French is the default: replies with no clue either way (a bare
+        email or phone number) are answered in French.
+        """
+        text_lower = text.lower()
+        words = set(re.findall(r"[a-zà-ÿ']+", text_lower))
+        french_words = {
+            "je", "j'ai", "m'appelle", "mon", "ma", "mes", "nom", "prénom", "appelle", "téléphone", "tél",
+            "bonjour", "merci", "voici", "et", "est", "suis", "numéro", "courriel", "c'est",
+            "de", "des", "du", "la", "le", "les", "un", "une", "pour", "vous", "votre", "vos", "nous",
+            "comment", "combien", "quel", "quels", "quelle", "quelles", "que", "qui", "quoi", "avec",
+            "dans", "sur", "au", "aux", "ce", "ces", "il", "elle", "pas", "ne", "oui", "non", "mais",
+            "faire", "peux", "puis", "avez", "acceptez", "livrez"
+        }
+        english_words = {
+            "i", "i'm", "my", "name", "name's", "phone", "call", "me", "hello", "hi", "thanks", "thank",
+            "here", "and", "is", "number", "am", "you", "the", "to", "do", "does", "what", "how", "can",
+            "of", "for", "with", "are", "your", "it", "there", "this", "which", "will"
+        }
+        french_score = len(words & french_words) + len(re.findall(r"[àâçéèêëîïôûùüÿœ]", text_lower))
+        english_score = len(words & english_words)
+        return "en" if english_score > french_score else "fr"
+
+    @staticmethod
+    def generate_acknowledgement(extracted_data: Dict, language: str = "fr") -> str:
+        """
+        Acknowledge the contact details the user just shared, without an AI call
+        """
+        name = extracted_data.get("name")
+        if language == "fr":
+            labels = {"email": "votre email", "phone": "votre numéro de téléphone", "name": "votre nom"}
+            received = [labels[field] for field in ("email", "phone") if extracted_data.get(field)]
+            if not received and name:
+                received = [labels["name"]]
+            greeting = f"Merci {name} !" if name else "Merci !"
+            if not received:
+                return f"{greeting} Je n'ai pas pu lire vos coordonnées, pouvez-vous les renvoyer ?"
+            return (f"{greeting} J'ai bien enregistré {' et '.join(received)}. "
+                    f"Un conseiller vous contactera très prochainement.")
+
+        labels = {"email": "your email", "phone": "your phone number", "name": "your name"}
+        received = [labels[field] for field in ("email", "phone") if extracted_data.get(field)]
+        if not received and name:
+            received = [labels["name"]]
+        greeting = f"Thank you, {name}!" if name else "Thank you!"
+        if not received:
+            return f"{greeting} I couldn't read your contact details, could you send them again?"
+        return f"{greeting} I've saved {' and '.join(received)}. One of our advisors will contact you shortly."
+
+    @staticmethod
+    def generate_follow_up_message(extracted_data: Dict, language: str = "fr") -> str:
         """
         Generate a follow-up message based on extracted contact information
         """
         missing_fields = []
         
-        if not extracted_data.get("name"):
-            missing_fields.append("nom")
-        if not extracted_data.get("email"):
-            missing_fields.append("email")
-        if not extracted_data.get("phone"):
-            missing_fields.append("téléphone")
+        if language == "fr":
+            labels = {"name": "nom", "email": "email", "phone": "téléphone"}
+        else:
+            labels = {"name": "name", "email": "email", "phone": "phone number"}
+
+        for field in ("name", "email", "phone"):
+            if not extracted_data.get(field):
+                missing_fields.append(labels[field])
         
+        if language != "fr":
+            if not missing_fields:
+                return "✅ Perfect! I've received your details. We'll get back to you very soon with personalized follow-up!"
+            if len(missing_fields) == 1:
+                return f"Thanks! I just need your {missing_fields[0]}. Could you share it?"
+            missing_text = ", ".join(missing_fields[:-1]) + f" and {missing_fields[-1]}"
+            return f"Thanks! I still need your {missing_text}. Could you share them?"
+
         if not missing_fields:
             return "✅ Parfait ! J'ai bien reçu vos informations. Je vais vous contacter très prochainement pour un suivi personnalisé !"
         
@@ -236,4 +298,4 @@ class ContactExtractor:
             return f"Merci ! Il me manque juste votre {missing_fields[0]}. Pouvez-vous me le fournir ?"
         else:
             missing_text = ", ".join(missing_fields[:-1]) + f" et {missing_fields[-1]}"
-            return f"Merci ! Il me manque encore votre {missing_text}. Pouvez-vous me les fournir ?" 
\ No newline at end of file
+            return f"Merci ! Il me manque encore votre {missing_text}. Pouvez-vous me les fournir ?"
@@ -0,0 +1,211 @@
+import os
+import json
+import logging
+import threading
+from config.settings import FAQ_PATH, FAQ_MAX_QUESTION_WORDS
+from services.catalog_snapshot import get_catalog
+from services.product_formatter import product_payload
+from services.product_name_index import normalize_name
+
+# Words of a question (accents removed) pointing at each intent
+INTENT_WORDS = {
+    "shipping": {"shipping", "ship", "ships", "shipped", "delivery", "deliver", "delivered", "tracking",
+                 "livraison", "livrer", "livre", "livrez", "expedition", "expedier", "expediez", "colis", "suivi"},
+    "returns": {"return", "returns", "refund", "refunds", "exchange", "retour", "retours", "retourner",
+                "rembourser", "remboursement", "rembourse", "echange", "echanger"},
+    "warranty": {"warranty", "guarantee", "guaranteed", "garantie", "garanti", "garantis"},
+    "payment": {"payment", "payments", "pay", "paypal", "paiement", "paiements", "payer", "virement"},
+    "stock": {"stock", "available", "availability", "disponible", "disponibles", "disponibilite", "rupture"},
+}
+
+# Words that may surround the intent words of a policy question without
+# changing it ("how long does delivery take?"). Any other word is a
+# qualifier ("to Canada", "free", "in installments") the FAQ text does not
+# answer, so the question goes to the model.
+QUESTION_WORDS = {
+    "what", "whats", "which", "how", "long", "many", "much", "when", "does", "do", "did", "is", "are", "can",
+    "could", "will", "i", "me", "my", "you", "your", "we", "it", "there", "the", "a", "an", "of", "for", "on",
+    "in", "with", "about", "to", "this", "that", "please", "have", "take", "takes", "work", "works", "time",
+    "days", "policy", "policies", "terms", "conditions", "method", "methods", "options", "accept", "make",
+    "get", "send", "back", "start", "order", "orders", "item", "items", "product", "products", "s",
+    "quel", "quels", "quelle", "quelles", "est", "ce", "que", "qu", "quoi", "comment", "combien", "de", "des",
+    "du", "d", "la", "le", "les", "l", "un", "une", "pour", "sur", "en", "vous", "votre", "vos", "je", "j",
+    "mon", "ma", "mes", "on", "il", "y", "a", "sont", "puis", "peux", "peut", "faire", "faut", "prend",
+    "temps", "delai", "delais", "jours", "moyen", "moyens", "acceptez", "accepter", "politique",
+    "commande", "commandes", "produit", "produits", "article", "articles", "avez", "se", "passe"
+}
+
+# Intents answered from the fields of the product the question is about
+PRODUCT_INTENTS = ("stock", "warranty")
+
+# Words of open-ended questions, always left to the model ("which laptop has the best warranty?")
+OPEN_ENDED_WORDS = {
+    "recommend", "recommendation", "suggest", "best", "better", "compare", "comparison", "versus",
+    "vs", "cheaper", "cheapest", "alternative", "looking", "advise", "advice", "should",
+    "recommander", "recommandez", "conseil", "conseiller", "conseillez", "suggerer", "meilleur", "meilleure",
+    "comparer", "plutot", "cherche", "moins"
+}
+
+# Replies built from product fields, per language
+PRODUCT_TEMPLATES = {
+    "en": {
+        "in_stock": "Yes, {name} is in stock ({price}).",
+        "out_of_stock": "{name} is currently out of stock.",
+        "warranty": "{name} comes with a {warranty} warranty."
+    },
+    "fr": {
+        "in_stock": "Oui, {name} est en stock ({price}).",
+        "out_of_stock": "{name} est actuellement en rupture de stock.",
+        "warranty": "{name} : garantie {warranty}."
+    }
+}
+
+# Share of a product name's words the question must contain to be about that product
+NAME_COVERAGE = 0.6
+
+
+def load_faq(path: str = FAQ_PATH) -> dict:
+    """Policy answers per intent and language ({intent: {"en": ..., "fr": ...}})"""
+    try:
+        with open(path, encoding="utf-8") as faq_file:
+            return json.load(faq_file)
+    except FileNotFoundError:
+        logging.info(f"No FAQ store at {path}, only product answers are local")
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"FAQ store {path} not loaded, only product answers are local: {e}")
+        return {}
+
+
+class FaqEngine:
+    """
+    Answers shipping, returns, warranty, payment and "is X in stock"
+    questions without calling the model.
+
+    The intent is read from the words of the question; stock and warranty
+    questions about one product are answered from its catalog fields, the
+    others (and warranty questions about no product) from the FAQ store.
+    Only questions made of the intent words and plain question words are
+    answered: a qualifier the FAQ text does not cover ("do you ship to
+    Canada?", "is there free shipping?"), open-ended questions ("which
+    laptop has the best warranty?"), long questions and questions mixing
+    several intents are left to the model.
+    """
+
+    def __init__(self, faq: dict = None, max_words: int = FAQ_MAX_QUESTION_WORDS):
+        self.faq = load_faq() if faq is None else faq
+        self.max_words = max_words
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._stats = {"answered": 0, "passed": 0, "intents": {}}
+
+    def classify(self, question: str):
+        """Intent of a question, or None when it should go to the model"""
+        words = set(normalize_name(question).split())
+        if not words or len(words) > self.max_words or words & OPEN_ENDED_WORDS:
+            return None
+        intents = [intent for intent, intent_words in INTENT_WORDS.items() if words & intent_words]
+        if len(intents) != 1:
+            return None
+        # Product intents may name a product, checked once it is found
+        if intents[0] not in PRODUCT_INTENTS and self._qualifiers(words, intents[0]):
+            return None
+        return intents[0]
+
+    @staticmethod
+    def _qualifiers(words: set, intent: str) -> set:
+        # Words of the question that are neither intent nor plain question words
+        return words - INTENT_WORDS[intent] - QUESTION_WORDS
+
+    def answer(self, question: str, recent_products: list = ()) -> dict:
+        """
+        Local ask_question-shaped answer flagged with 'local_answer': intent,
+        or None to let the model answer. recent_products are the names
+        suggested in the previous turn, used when the question names none
+        ("is it in stock?").
+        """
+        intent = self.classify(question)
+        reply = self._reply(intent, question, recent_products) if intent else None
+
+        with self._lock:
+            if reply is None:
+                self._stats["passed"] += 1
+                return None
+            self._stats["answered"] += 1
+            self._stats["intents"][intent] = self._stats["intents"].get(intent, 0) + 1
+
+        message, products = reply
+        return {
+            'message': message,
+            'products': [product_payload(p) for p in products],
+            'interest_signals': None,
+            'local_answer': intent
+        }
+
+    def _reply(self, intent: str, question: str, recent_products: list):
+        # (message, products) or None
+        from services.contact_extractor import ContactExtractor  # imports AiService, which uses this module
+        language = ContactExtractor.detect_language(question)
+        policy = self.faq.get(intent, {}).get(language)
+
+        if intent not in PRODUCT_INTENTS:
+            return (policy, []) if policy else None
+
+        products = self._mentioned_products(question, recent_products)
+        qualifiers = self._qualifiers(set(normalize_name(question).split()), intent)
+        if len(products) != 1:
+            # A plain warranty question about no product gets the general policy
+            general = policy and intent == "warranty" and not products and not qualifiers
+            return (policy, []) if general else None
+
+        product = products[0]
+        if qualifiers - set(normalize_name(product.get("name", "")).split()):
+            return None
+        templates = PRODUCT_TEMPLATES[language]
+        if intent == "warranty":
+            if not product.get("warranty"):
+                return (policy, [product]) if policy else None
+            return templates["warranty"].format(name=product["name"], warranty=product["warranty"]), [product]
+
+        key = "in_stock" if product.get("available", True) else "out_of_stock"
+        return templates[key].format(name=product["name"], price=f"${product.get('price', 'N/A')}"), [product]
+
+    @staticmethod
+    def _mentioned_products(question: str, recent_products: list) -> list:
+        # Products whose name the question (mostly) contains, best coverage first
+        snapshot = get_catalog()
+        words = set(normalize_name(question).split())
+        best, best_coverage = [], 0.0
+        for _, index in snapshot.retriever.search(question, 5):
+            product = snapshot.products[index]
+            name_words = set(normalize_name(product.get("name", "")).split())
+            if not name_words:
+                continue
+            coverage = len(name_words & words) / len(name_words)
+            if coverage >= NAME_COVERAGE and coverage >= best_coverage:
+                best = best + [product] if coverage == best_coverage else [product]
+                best_coverage = coverage
+        if best or len(recent_products) != 1:
+            return best
+        return snapshot.name_index.find(list(recent_products))
+
+    def stats(self) -> dict:
+        """Local answer counters for monitoring"""
+        with self._lock:
+            return {"faq_intents": sorted(self.faq), "answered": self._stats["answered"],
+                    "passed": self._stats["passed"], "intents": dict(self._stats["intents"])}
+
+
+# FAQ engine shared by every request of this worker process
+_faq_engine = FaqEngine()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_faq_engine._reset)
+
+
+def get_faq_engine() -> FaqEngine:
+    """Return the process-wide FAQ engine"""
+    return _faq_engine
@@ -2,6 +2,21 @@ import re
 from typing import Dict, List, Tuple, Optional
 import json
 from services.ai_services import AiService
+from services.response_parser import STRING_LIST
+
+# Answer expected from generate_ai_keywords (response_parser schema format)
+AI_KEYWORDS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "high_interest_keywords": STRING_LIST,
+        "purchase_intent_keywords": STRING_LIST,
+        "urgency_indicators": STRING_LIST,
+        "interest_score": {"type": "INTEGER"},
+        "confidence_level": {"type": "STRING"},
+        "reasoning": {"type": "STRING"}
+    },
+    "required": ["high_interest_keywords", "purchase_intent_keywords", "urgency_indicators", "interest_score"]
+}
 
 class InterestAnalyzer:
     def __init__(self):
@@ -95,60 +110,38 @@ class InterestAnalyzer:
         """
         
         try:
-            ai_service = AiService()
-            response = ai_service.ask_question(prompt)
-            
-            # The response is a dict with 'message' and 'products' keys
-            if isinstance(response, dict) and 'message' in response:
-                response_text = response['message']
-                
-                # Try to parse JSON from response text
-                if response_text and "{" in response_text and "}" in response_text:
-                    json_start = response_text.find("{")
-                    json_end = response_text.rfind("}") + 1
-                    json_str = response_text[json_start:json_end]
-                    
-                    keywords_data = json.loads(json_str)
-                    return keywords_data
-                else:
-                    # Fallback to base keywords
-                    return {
-                        "high_interest_keywords": InterestAnalyzer.BASE_HIGH_INTEREST_KEYWORDS,
-                        "purchase_intent_keywords": InterestAnalyzer.BASE_PURCHASE_INTENT_KEYWORDS,
-                        "urgency_indicators": ["urgent", "rapidement", "quickly", "maintenant", "now"],
-                        "interest_score": 0,
-                        "confidence_level": "low",
-                        "reasoning": "Using fallback keywords"
-                    }
-            else:
-                return {
-                    "high_interest_keywords": InterestAnalyzer.BASE_HIGH_INTEREST_KEYWORDS,
-                    "purchase_intent_keywords": InterestAnalyzer.BASE_PURCHASE_INTENT_KEYWORDS,
-                    "urgency_indicators": ["urgent", "rapidement", "quickly", "maintenant", "now"],
-                    "interest_score": 0,
-                    "confidence_level": "low",
-                    "reasoning": "Using fallback keywords"
-                }
+            # Standalone JSON call: no product context, answer validated against the schema
+            keywords_data = AiService(call_site="generate_ai_keywords").ask_json(prompt, AI_KEYWORDS_SCHEMA)
+            keywords_data["interest_score"] = max(0, min(10, keywords_data["interest_score"]))
+            return keywords_data
         except Exception as e:
             print(f"Error generating AI keywords: {e}")
-            return {
-                "high_interest_keywords": InterestAnalyzer.BASE_HIGH_INTEREST_KEYWORDS,
-                "purchase_intent_keywords": InterestAnalyzer.BASE_PURCHASE_INTENT_KEYWORDS,
-                "urgency_indicators": ["urgent", "rapidement", "quickly", "maintenant", "now"],
-                "interest_score": 0,
-                "confidence_level": "low",
-                "reasoning": f"Error: {str(e)}"
-            }
+            return InterestAnalyzer._fallback_keywords(f"Error: {str(e)}")
+
+    @staticmethod
+    def _fallback_keywords(reasoning: str) -> Dict:
+        """Base keywords used when the AI keywords are unavailable"""
+        return {
+            "high_interest_keywords": InterestAnalyzer.BASE_HIGH_INTEREST_KEYWORDS,
+            "purchase_intent_keywords": InterestAnalyzer.BASE_PURCHASE_INTENT_KEYWORDS,
+            "urgency_indicators": ["urgent", "rapidement", "quickly", "maintenant", "now"],
+            "interest_score": 0,
+            "confidence_level": "low",
+            "reasoning": reasoning
+        }
     
     @staticmethod
-    def analyze_interest_with_ai(question: str, answer: str, products: List[Dict]) -> Dict:
+    def analyze_interest_with_ai(question: str, answer: str, products: List[Dict], ai_keywords: Optional[Dict] = None) -> Dict:
         """
-        Analyze interest using AI-generated keywords and patterns
+        Analyze interest using AI-generated keywords and patterns.
+        Pass ai_keywords to reuse signals already returned by the chat call
+        instead of asking the AI again.
         """
         question_lower = question.lower()
         answer_lower = answer.lower()
         
-        ai_keywords = InterestAnalyzer.generate_ai_keywords(question, f"AI Answer: {answer}")
+        if ai_keywords is None:
+            ai_keywords = InterestAnalyzer.generate_ai_keywords(question, f"AI Answer: {answer}")
         interest_score = 0
         interest_reasons = []
         
@@ -217,6 +210,16 @@ class InterestAnalyzer:
             print(f"AI analysis failed, using fallback: {e}")
             return InterestAnalyzer._analyze_interest_fallback(question, answer, products)
     
+    @staticmethod
+    def analyze_interest_from_signals(question: str, answer: str, products: List[Dict], interest_signals: Optional[Dict]) -> Dict:
+        """
+        Combined mode - scores interest from the signals returned with the answer,
+        without a second AI call. Uses the keyword fallback if the AI omitted them.
+        """
+        if not interest_signals:
+            return InterestAnalyzer._analyze_interest_fallback(question, answer, products)
+        return InterestAnalyzer.analyze_interest_with_ai(question, answer, products, ai_keywords=interest_signals)
+    
     @staticmethod
     def _analyze_interest_fallback(question: str, answer: str, products: List[Dict]) -> Dict:
         """
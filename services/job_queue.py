@@ -0,0 +1,244 @@
+import os
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config.settings import (
+    JOBS_ENABLED, JOB_OUTBOX_COLLECTION, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_DELAY,
+    JOB_RETRY_MAX_DELAY, JOB_LEASE_SECONDS, JOB_POLL_INTERVAL
+)
+
+
+class JobQueue:
+    """
+    In-process background jobs backed by a durable MongoDB outbox.
+
+    enqueue() first writes the job to the outbox collection, then hands it
+    to this worker's thread pool. A job is claimed atomically (status
+    'running' with a lease), so it runs in one place at a time even with
+    many worker processes. On success the job is deleted; on failure it is
+    rescheduled with exponential backoff (full jitter) until max_attempts,
+    then kept with status 'failed'. A sweeper thread picks up jobs that are
+    due for a retry or whose lease expired (crashed worker, restart).
+    Handlers may run more than once and must be idempotent.
+    """
+
+    def __init__(self, collection_name: str = JOB_OUTBOX_COLLECTION, workers: int = JOB_WORKERS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, base_delay: float = JOB_RETRY_BASE_DELAY,
+                 max_delay: float = JOB_RETRY_MAX_DELAY, lease_seconds: float = JOB_LEASE_SECONDS,
+                 poll_interval: float = JOB_POLL_INTERVAL, enabled: bool = JOBS_ENABLED):
+        self.collection_name = collection_name
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+        self._handlers = {}
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._executor = None
+        self._sweeper_pid = None
+        self._local_depth = 0  # jobs submitted to this worker's pool and not finished
+        self._stats = {"enqueued": 0, "succeeded": 0, "retried": 0, "failed": 0, "recovered": 0}
+
+    @property
+    def collection(self):
+        from config.db import db
+        return db[self.collection_name]
+
+    def register(self, name: str, handler):
+        """Register the handler(payload) run for jobs of this name"""
+        self._handlers[name] = handler
+
+    def enqueue(self, name: str, payload: dict, job_id: str = None) -> str:
+        """
+        Store a job in the outbox and schedule it. Enqueuing the same job_id
+        twice keeps the first job. With background jobs disabled the handler
+        runs inline.
+        """
+        if not self.enabled:
+            self._handlers[name](payload)
+            return job_id
+
+        document = self._job_document(name, payload, job_id)
+        try:
+            self.collection.insert_one(document)
+        except DuplicateKeyError:
+            return document["_id"]
+        self._submit(document["_id"])
+        return document["_id"]
+
+    async def enqueue_async(self, name: str, payload: dict, job_id: str = None) -> str:
+        """asyncio variant of enqueue: the outbox write does not block the event loop"""
+        if not self.enabled:
+            import asyncio
+            await asyncio.to_thread(self._handlers[name], payload)
+            return job_id
+
+        from config.async_db import get_async_db
+        document = self._job_document(name, payload, job_id)
+        try:
+            await get_async_db()[self.collection_name].insert_one(document)
+        except DuplicateKeyError:
+            return document["_id"]
+        self._submit(document["_id"])
+        return document["_id"]
+
+    def start(self):
+        """Start the sweeper thread once per process"""
+        with self._lock:
+            if not self.enabled or self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+        threading.Thread(target=self._sweep_forever, name="job-sweeper", daemon=True).start()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until this worker has no job in progress (tests, shutdown)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._local_depth == 0, timeout)
+
+    def _job_document(self, name: str, payload: dict, job_id: str = None) -> dict:
+        now = datetime.utcnow()
+        document = {
+            "name": name,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "available_at": now,
+            "locked_until": None,
+            "created_at": now,
+            "last_error": None
+        }
+        if job_id:
+            document["_id"] = job_id
+        else:
+            from bson import ObjectId
+            document["_id"] = str(ObjectId())
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return document
+
+    def _submit(self, job_id: str, job: dict = None):
+        # Run a job on this worker's pool (job is given when already claimed)
+        self.start()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            self._local_depth += 1
+        self._executor.submit(self._run, job_id, job)
+
+    def _run(self, job_id: str, job: dict = None):
+        try:
+            if job is None:
+                job = self._claim({"_id": job_id})
+            if job is not None:
+                self._execute(job)
+        except Exception as e:
+            logging.error(f"Background job {job_id} could not be processed: {e}")
+        finally:
+            with self._idle:
+                self._local_depth -= 1
+                self._idle.notify_all()
+
+    def _claim(self, query: dict):
+        # Atomically take a job that is due, or whose lease expired
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {
+                **query,
+                "$or": [
+                    {"status": "pending", "available_at": {"$lte": now}},
+                    {"status": "running", "locked_until": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {"status": "running", "locked_until": now + timedelta(seconds=self.lease_seconds)},
+                "$inc": {"attempts": 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _execute(self, job: dict):
+        handler = self._handlers.get(job["name"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job '{job['name']}'")
+            handler(job["payload"])
+        except Exception as e:
+            self._reschedule(job, e)
+            return
+
+        self.collection.delete_one({"_id": job["_id"]})
+        with self._lock:
+            self._stats["succeeded"] += 1
+
+    def _reschedule(self, job: dict, error: Exception):
+        # Retry later with exponential backoff, or give up after max_attempts
+        attempts = job["attempts"]
+        if attempts >= self.max_attempts:
+            update = {"status": "failed", "locked_until": None, "last_error": str(error)}
+            key = "failed"
+            logging.error(f"Background job {job['_id']} ({job['name']}) failed after {attempts} attempts: {error}")
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+            update = {"status": "pending", "locked_until": None, "last_error": str(error),
+                      "available_at": datetime.utcnow() + timedelta(seconds=delay)}
+            key = "retried"
+            logging.warning(f"Background job {job['_id']} ({job['name']}) failed, retrying in {delay:.1f}s: {error}")
+        self.collection.update_one({"_id": job["_id"]}, {"$set": update})
+        with self._lock:
+            self._stats[key] += 1
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self._sweep()
+            except Exception as e:
+                logging.warning(f"Job outbox sweep failed: {e}")
+
+    def _sweep(self):
+        # Run every job that is due, one claim at a time (bounded by the pool size)
+        while True:
+            with self._lock:
+                if self._local_depth >= self.workers:
+                    return
+            job = self._claim({})
+            if job is None:
+                return
+            with self._lock:
+                self._stats["recovered"] += 1
+            self._submit(job["_id"], job)
+
+    def stats(self) -> dict:
+        """Queue counters of this worker plus the outbox depth shared by all workers"""
+        with self._lock:
+            stats = {"enabled": self.enabled, "workers": self.workers, "in_progress": self._local_depth, **self._stats}
+        try:
+            for status in ("pending", "running", "failed"):
+                stats[f"outbox_{status}"] = self.collection.count_documents({"status": status})
+        except Exception as e:
+            stats["outbox_error"] = str(e)
+        return stats
+
+
+# Job queue shared by every request of this worker process
+_job_queue = JobQueue()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_job_queue._reset)
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide background job queue"""
+    return _job_queue
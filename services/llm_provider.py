@@ -0,0 +1,22 @@
+from config.settings import LLM_PROVIDER
+from services.chat_client import ChatClient
+from services.local_llm import LocalChatClient
+
+# Chat client class of each LLM provider (LLM_PROVIDER setting)
+PROVIDERS = {
+    "gemini": ChatClient,
+    "local": LocalChatClient,
+}
+
+
+def register_provider(name: str, client_class):
+    """Make a BaseChatClient subclass available as LLM_PROVIDER=name"""
+    PROVIDERS[name.lower()] = client_class
+
+
+def create_chat_client(provider: str = None):
+    """Build a chat client for the configured (or given) provider"""
+    name = (provider or LLM_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider {name!r}, expected one of: {', '.join(sorted(PROVIDERS))}")
+    return PROVIDERS[name]()
@@ -0,0 +1,155 @@
+import os
+import time
+import bisect
+import threading
+from collections import OrderedDict
+from config.settings import (
+    LLM_TELEMETRY_MINUTES, LLM_PRICE_INPUT_PER_MILLION, LLM_PRICE_OUTPUT_PER_MILLION, GEMINI_MODEL_NAME
+)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0]
+
+# USD per million (input, output) tokens of each model
+MODEL_PRICES = {
+    "models/gemini-1.5-flash": (0.075, 0.30),
+    "models/gemini-1.5-flash-8b": (0.0375, 0.15),
+    "models/gemini-1.5-pro": (1.25, 5.00),
+    "models/gemini-2.0-flash": (0.10, 0.40),
+}
+
+# The configured model's prices can be overridden (LLM_PRICE_INPUT/OUTPUT_PER_MILLION)
+if LLM_PRICE_INPUT_PER_MILLION >= 0 and LLM_PRICE_OUTPUT_PER_MILLION >= 0:
+    MODEL_PRICES[GEMINI_MODEL_NAME] = (LLM_PRICE_INPUT_PER_MILLION, LLM_PRICE_OUTPUT_PER_MILLION)
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of one call (0 for models without a known price, e.g. the local stub)"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class _CallStats:
+    # Aggregated calls of one call site (over all time or over one minute)
+
+    __slots__ = ("calls", "errors", "prompt_tokens", "completion_tokens", "cost", "latency_sum",
+                 "latency_max", "buckets", "models")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.models = {}
+
+    def add(self, model: str, seconds: float, prompt_tokens: int, completion_tokens: int, cost: float, ok: bool):
+        self.calls += 1
+        self.errors += int(not ok)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.models[model] = self.models.get(model, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        # Upper bound of the bucket holding the given fraction of the calls
+        rank, seen = fraction * self.calls, 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else round(self.latency_max, 3)
+        return 0.0
+
+    def to_dict(self, histogram: bool = True) -> dict:
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost, 6),
+            "avg_latency": round(self.latency_sum / self.calls, 3) if self.calls else 0.0,
+            "max_latency": round(self.latency_max, 3),
+            "p50_latency": self.percentile(0.5),
+            "p95_latency": self.percentile(0.95),
+            "models": dict(self.models)
+        }
+        if histogram:
+            labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["le_inf"]
+            result["latency_histogram"] = dict(zip(labels, self.buckets))
+        return result
+
+
+class LlmTelemetry:
+    """
+    Per-process record of every model call: wall time, prompt and
+    completion tokens, model and call site (ask_question,
+    generate_ai_keywords, contact_ack, ...), with the estimated cost.
+
+    Calls are aggregated per call site since the process started and per
+    minute over the last `minutes` minutes, so the metrics show which path
+    uses the budget and how it evolves.
+    """
+
+    def __init__(self, minutes: int = LLM_TELEMETRY_MINUTES):
+        self.minutes = max(1, minutes)
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._totals = {}  # call site -> _CallStats
+        self._per_minute = OrderedDict()  # minute start (epoch seconds) -> {call site -> _CallStats}
+
+    def record(self, call_site: str, model: str, seconds: float, prompt_tokens: int,
+               completion_tokens: int, ok: bool = True) -> float:
+        """Record one model call and return its estimated cost"""
+        cost = call_cost(model, prompt_tokens, completion_tokens)
+        minute = int(time.time() // 60) * 60
+        with self._lock:
+            self._totals.setdefault(call_site, _CallStats()).add(
+                model, seconds, prompt_tokens, completion_tokens, cost, ok)
+            sites = self._per_minute.get(minute)
+            if sites is None:
+                sites = self._per_minute[minute] = {}
+                while len(self._per_minute) > self.minutes:
+                    self._per_minute.popitem(last=False)
+            sites.setdefault(call_site, _CallStats()).add(
+                model, seconds, prompt_tokens, completion_tokens, cost, ok)
+        return cost
+
+    def summary(self) -> dict:
+        """Totals per call site, without the per-minute series"""
+        with self._lock:
+            return {site: stats.to_dict(histogram=False) for site, stats in self._totals.items()}
+
+    def stats(self, minutes: int = None) -> dict:
+        """Totals per call site and the per-minute series of the last minutes"""
+        with self._lock:
+            series = list(self._per_minute.items())[-(minutes or self.minutes):]
+            return {
+                "window_minutes": self.minutes,
+                "call_sites": {site: stats.to_dict() for site, stats in self._totals.items()},
+                "per_minute": [
+                    {"minute": time.strftime("%Y-%m-%dT%H:%M:00Z", time.gmtime(minute)),
+                     "call_sites": {site: stats.to_dict(histogram=False) for site, stats in sites.items()}}
+                    for minute, sites in series
+                ]
+            }
+
+
+# Model call telemetry of this worker process
+_llm_telemetry = LlmTelemetry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_llm_telemetry._reset)
+
+
+def get_llm_telemetry() -> LlmTelemetry:
+    """Return the process-wide model call telemetry"""
+    return _llm_telemetry
@@ -0,0 +1,201 @@
+import re
+import math
+import time
+import random
+import asyncio
+import threading
+from config.settings import LOCAL_LLM_LATENCY, LOCAL_LLM_ERROR_RATE, LOCAL_LLM_SEED
+from services.chat_client import BaseChatClient, is_transient_error
+from services.product_retriever import tokenize
+from services.resilience import get_circuit_breaker
+from services.response_parser import render_answer
+
+# Words of the question that make the stub report purchase intent / urgency
+INTENT_WORDS = {"buy", "order", "purchase", "price", "cost", "acheter", "commander", "prix"}
+URGENCY_WORDS = {"now", "today", "urgent", "asap", "quickly", "vite", "maintenant", "aujourd"}
+
+QUESTION_PATTERN = re.compile(r"User question:\s*(.+)")
+
+
+def parse_latency(spec: str):
+    """
+    Turn a latency spec ("fixed:0.8", "uniform:0.3,1.5", "normal:0.8,0.2",
+    "lognormal:0.8,0.5", "exponential:0.8") into a function rng -> seconds
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value.strip()]
+    kind = kind.strip().lower()
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        # Parameterized by its median, which is easier to reason about than mu
+        return lambda rng: rng.lognormvariate(math.log(max(values[0], 1e-6)), values[1])
+    if kind == "exponential":
+        return lambda rng: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class LocalChatClient(BaseChatClient):
+    """
+    Deterministic offline stand-in for Gemini.
+
+    Answers in the MESSAGE:/PRODUCTS: format, or with a JSON object when
+    the chat has a response schema (plus the interest signals when they
+    are asked for), recommending the context products that
+    share the most words with the question. The same prompt always gives
+    the same answer; only the simulated latency and the injected transient
+    errors (LOCAL_LLM_LATENCY, LOCAL_LLM_ERROR_RATE) are random, drawn from
+    a seeded generator so runs are reproducible.
+    """
+
+    provider = "local"
+    model_name = "local"
+
+    # Random source shared by the clients of this process
+    _rng = random.Random(LOCAL_LLM_SEED)
+    _rng_lock = threading.Lock()
+    _latency = staticmethod(parse_latency(LOCAL_LLM_LATENCY))
+
+    def __init__(self, latency: str = None, error_rate: float = LOCAL_LLM_ERROR_RATE):
+        super().__init__()
+        if latency is not None:
+            self._latency = parse_latency(latency)
+        self.error_rate = error_rate
+
+    def _send_once(self, message: str, remaining: float) -> str:
+        """One simulated call, bounded by the remaining deadline"""
+        text = get_circuit_breaker().call(
+            lambda: self._generate(message, remaining),
+            is_failure=is_transient_error
+        )
+        self._remember(message, text)
+        return text
+
+    async def _send_once_async(self, message: str, remaining: float) -> str:
+        """One simulated call that waits with asyncio.sleep"""
+        text = await get_circuit_breaker().call_async(
+            lambda: self._generate_async(message, remaining),
+            is_failure=is_transient_error
+        )
+        self._remember(message, text)
+        return text
+
+    def _stream(self, message: str, timeout: float):
+        """Simulated streamed call: a first-token delay, then evenly spaced chunks"""
+        yield from get_circuit_breaker().stream(
+            lambda: self._generate_chunks(message, timeout),
+            is_failure=is_transient_error
+        )
+
+    def _generate(self, message: str, timeout: float) -> str:
+        self._wait(self._draw_latency(), timeout)
+        return self.answer(message)
+
+    async def _generate_async(self, message: str, timeout: float) -> str:
+        latency = self._draw_latency()
+        if latency > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Simulated LLM call exceeded {timeout:.1f}s")
+        await asyncio.sleep(latency)
+        return self.answer(message)
+
+    def _generate_chunks(self, message: str, timeout: float):
+        latency = self._draw_latency()
+        text = self.answer(message)
+        chunks = [text[i:i + 24] for i in range(0, len(text), 24)]
+
+        # Roughly a third of the time is spent before the first token
+        self._wait(latency * 0.3, timeout)
+        step = latency * 0.7 / max(1, len(chunks))
+        for chunk in chunks:
+            time.sleep(step)
+            yield chunk
+        self._remember(message, text)
+
+    def _draw_latency(self) -> float:
+        # Draw the latency and the injected failure of one call
+        with self._rng_lock:
+            latency = self._latency(self._rng)
+            failing = self._rng.random() < self.error_rate
+        if failing:
+            raise ConnectionError("Simulated transient LLM failure")
+        return latency
+
+    @staticmethod
+    def _wait(latency: float, timeout: float):
+        # Behave like a request timeout when the simulated call is too slow
+        if latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Simulated LLM call exceeded {timeout:.1f}s")
+        time.sleep(latency)
+
+    def _remember(self, message: str, text: str):
+        # Same history shape as a Gemini chat
+        self.history = self.history + [
+            {"role": "user", "parts": [message]},
+            {"role": "model", "parts": [text]}
+        ]
+
+    def answer(self, message: str) -> str:
+        """Deterministic answer to a prompt, given the chat context and response schema"""
+        schema = self.response_schema
+        properties = schema.get("properties", {}) if schema else {}
+        if schema and "message" not in properties:
+            # Not a product answer: fill the requested object with empty values
+            return render_answer({name: self._empty_value(field) for name, field in properties.items()}, "json")
+
+        match = QUESTION_PATTERN.search(message)
+        question = match.group(1).strip() if match else message.strip()
+        question_terms = set(tokenize(question))
+
+        names = self._recommend(question_terms)
+        if names:
+            data = {"message": f"Based on your question, I recommend {', '.join(names)}.", "products": names}
+        else:
+            data = {"message": "I could not find a product matching your question.", "products": []}
+
+        if "interest_score" in properties or (not schema and "INTEREST_SCORE" in message):
+            intent = sorted(question_terms & INTENT_WORDS)
+            urgency = sorted(question_terms & URGENCY_WORDS)
+            keywords = sorted(question_terms - INTENT_WORDS - URGENCY_WORDS)[:5]
+            data.update({
+                "interest_score": min(10, 2 + 3 * len(intent) + 2 * len(urgency) + min(len(keywords), 3)),
+                "confidence": "high" if intent else "medium" if keywords else "low",
+                "keywords": keywords,
+                "intent": intent,
+                "urgency": urgency
+            })
+        return render_answer(data, "json" if schema else "sections")
+
+    @staticmethod
+    def _empty_value(field: dict):
+        return {"STRING": "", "ARRAY": [], "OBJECT": {}}.get(field.get("type"), 0)
+
+    def _recommend(self, question_terms: set, k: int = 3) -> list:
+        # Context products sharing the most words with the question (context order breaks ties)
+        scored = []
+        for position, (name, line) in enumerate(self._context_products()):
+            overlap = len(question_terms & set(tokenize(line)))
+            if overlap:
+                scored.append((-overlap, position, name))
+        return [name for _, _, name in sorted(scored)[:k]]
+
+    def _context_products(self) -> list:
+        # (name, line) of every product of the chat context: "- Name: ..."
+        # prose lines, or the rows following the "name|..." table header
+        context = self.history[0]["parts"][0] if self.history else ""
+        products, in_table = [], False
+        for line in context.splitlines():
+            if line.startswith("- "):
+                products.append((line[2:].split(":", 1)[0].strip(), line))
+            elif line.startswith("name|") or line == "name":
+                in_table = True
+            elif in_table and line.strip():
+                products.append((line.split("|", 1)[0].strip(), line))
+            else:
+                in_table = False
+        return products
@@ -0,0 +1,40 @@
+from services.catalog_snapshot import get_catalog
+from services.product_formatter import product_payload
+from config.settings import LOCAL_FALLBACK_TOP_K
+
+
+class LocalRecommender:
+    """
+    Answers a question without the LLM, from the worker's catalog snapshot.
+    Used while Gemini is unavailable (circuit open, deadline exceeded): the
+    BM25 retriever picks the best matching products, in-stock ones first.
+    """
+
+    @staticmethod
+    def recommend(question: str, k: int = LOCAL_FALLBACK_TOP_K) -> dict:
+        """Return an ask_question-shaped answer flagged with 'degraded': True"""
+        snapshot = get_catalog()
+        matches = [snapshot.products[i] for _, i in snapshot.retriever.search(question, k * 2)]
+
+        # Prefer products that can be bought right now
+        matches.sort(key=lambda p: not p.get("available", True))
+        products = [product_payload(p) for p in matches[:k]]
+
+        if products:
+            names = ", ".join(p["name"] for p in products)
+            message = (
+                "Our assistant is temporarily unavailable, but here are the products "
+                f"that best match your request: {names}."
+            )
+        else:
+            message = (
+                "Our assistant is temporarily unavailable. Please try again in a moment "
+                "or browse our catalog in the meantime."
+            )
+
+        return {
+            'message': message,
+            'products': products,
+            'interest_signals': None,
+            'degraded': True
+        }
@@ -0,0 +1,211 @@
+import os
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+import google.generativeai as genai
+from dotenv import load_dotenv
+from config.settings import GEMINI_POOL_SIZE, GEMINI_POOL_TIMEOUT, GEMINI_ASYNC_CONCURRENCY
+
+# Load environment variables from the .env file
+load_dotenv()
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no model handle became available before the timeout"""
+
+
+class ModelPool:
+    """
+    Per-process pool of warm Gemini model handles.
+
+    genai.configure() runs once per process and GenerativeModel instances are
+    reused across requests instead of being rebuilt for every AiService.
+    The pool is bounded: when every handle is leased, callers wait for one
+    to be released (up to acquire_timeout seconds).
+    State is discarded in a forked child (e.g. gunicorn workers) so that no
+    gRPC channel is shared between processes.
+
+    The asyncio path (async_lease) shares one handle per model: its gRPC
+    channel multiplexes concurrent calls, which are bounded by a semaphore
+    of async_max_concurrency slots instead.
+    """
+
+    def __init__(self, max_size: int = GEMINI_POOL_SIZE, acquire_timeout: float = GEMINI_POOL_TIMEOUT,
+                 async_max_concurrency: int = GEMINI_ASYNC_CONCURRENCY):
+        self.max_size = max(1, max_size)
+        self.acquire_timeout = acquire_timeout
+        self.async_max_concurrency = max(1, async_max_concurrency)
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize all process-local state
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = {}  # model_name -> list of idle handles
+        self._size = 0  # handles currently owned by the pool (idle + leased)
+        self._configured = False
+        self._pid = os.getpid()
+        self._generation = getattr(self, "_generation", 0) + 1
+        self._stats = {"created": 0, "reused": 0, "waits": 0, "timeouts": 0, "evicted": 0}
+        self._async_models = {}  # model_name -> handle shared by coroutines
+        self._async_slots = None  # semaphore, created on first use inside the event loop
+        self._async_in_use = 0
+
+    def _after_fork(self):
+        # Called in the child after fork: forget the parent's handles
+        self._reset()
+
+    def _check_pid(self):
+        # Safety net for fork paths that bypass os.register_at_fork
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _ensure_configured(self):
+        # Configure the generative AI client once per process
+        if self._configured:
+            return
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not set.")
+        genai.configure(api_key=api_key)
+        self._configured = True
+
+    def acquire(self, model_name: str, timeout: float = None):
+        """
+        Lease a model handle, creating one if the pool is not full.
+        Returns a (generation, model) token to pass back to release().
+        """
+        self._check_pid()
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                idle = self._idle.get(model_name)
+                if idle:
+                    self._stats["reused"] += 1
+                    return self._generation, idle.pop()
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    generation = self._generation
+                    break
+
+                # Pool is full: drop an idle handle of another model if possible
+                other = next((name for name, handles in self._idle.items() if handles), None)
+                if other is not None:
+                    self._idle[other].pop()
+                    self._size -= 1
+                    self._stats["evicted"] += 1
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(f"No Gemini model handle available after {timeout}s")
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+        # Build the handle outside the lock so other callers are not blocked
+        try:
+            with self._cond:
+                self._ensure_configured()
+            model = genai.GenerativeModel(model_name)
+        except Exception:
+            with self._cond:
+                if generation == self._generation:
+                    self._size -= 1
+                    self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats["created"] += 1
+        return generation, model
+
+    def release(self, model_name: str, token):
+        """Return a leased handle to the pool"""
+        generation, model = token
+        with self._cond:
+            # Handles leased before a fork belong to the parent: drop them
+            if generation != self._generation:
+                return
+            self._idle.setdefault(model_name, []).append(model)
+            self._cond.notify()
+
+    def discard(self, model_name: str, token):
+        """Drop a leased handle that should not be reused (e.g. after a transport error)"""
+        generation, _ = token
+        with self._cond:
+            if generation != self._generation:
+                return
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, model_name: str, timeout: float = None):
+        """Context manager that leases a model handle and always returns it"""
+        token = self.acquire(model_name, timeout)
+        completed = False
+        try:
+            yield token[1]
+            completed = True
+        finally:
+            # Errors and abandoned streams drop the handle instead of reusing it
+            if completed:
+                self.release(model_name, token)
+            else:
+                self.discard(model_name, token)
+
+    @asynccontextmanager
+    async def async_lease(self, model_name: str, timeout: float = None):
+        """Async context manager yielding the shared handle once a concurrency slot is free"""
+        self._check_pid()
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.async_max_concurrency)
+        timeout = self.acquire_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            with self._cond:
+                self._stats["timeouts"] += 1
+            raise PoolTimeoutError(f"No Gemini concurrency slot available after {timeout}s")
+
+        self._async_in_use += 1
+        try:
+            model = self._async_models.get(model_name)
+            if model is None:
+                with self._cond:
+                    self._ensure_configured()
+                    self._stats["created"] += 1
+                model = self._async_models[model_name] = genai.GenerativeModel(model_name)
+            yield model
+        finally:
+            self._async_in_use -= 1
+            self._async_slots.release()
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage counters"""
+        with self._cond:
+            idle = sum(len(handles) for handles in self._idle.values())
+            return {
+                "pid": self._pid,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "async_in_use": self._async_in_use,
+                "async_max_concurrency": self.async_max_concurrency,
+                **self._stats
+            }
+
+
+# Process-wide pool shared by every ChatClient in this worker
+_model_pool = ModelPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_model_pool._after_fork)
+
+
+def get_model_pool() -> ModelPool:
+    """Return the process-wide model pool"""
+    return _model_pool
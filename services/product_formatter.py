@@ -0,0 +1,134 @@
+# Header and footer of the product context sent to the AI
+CONTEXT_HEADER = "Here is a list of available products:\n"
+CONTEXT_FOOTER = "\nWhen you recommend products, use exactly the names as they appear in this list."
+
+
+def format_product_line(p: dict) -> str:
+    """Build the detailed one-line description of a product used in the AI context"""
+    name = p.get("name", "Unknown product")
+    description = p.get("description", "No description")
+    price = p.get("price", "N/A")
+    tags = p.get("tags", [])
+    category = p.get("category", "general")
+
+    # Get specifications and other details
+    specs = p.get("specs", {})
+    brand = p.get("brand", "")
+    warranty = p.get("warranty", "")
+    rating = p.get("rating", 0)
+    reviews_count = p.get("reviews_count", 0)
+    available = p.get("available", True)
+    release_date = p.get("release_date", "")
+
+    usage_str = ", ".join(tags) if tags else "general use"
+
+    # Build detailed product string
+    product_str = f"- {name}: {description}. Price: ${price}. Category: {category}. Tags: {usage_str}"
+
+    # Add laptop/electronics specific information
+    if "laptop" in name.lower() or "computer" in name.lower() or "Laptops" in category:
+        if brand:
+            product_str += f". Brand: {brand}"
+        if specs:
+            if specs.get("processor"):
+                product_str += f". CPU: {specs['processor']}"
+            if specs.get("ram"):
+                product_str += f". RAM: {specs['ram']}"
+            if specs.get("storage"):
+                product_str += f". Storage: {specs['storage']}"
+            if specs.get("screen_size"):
+                product_str += f". Screen: {specs['screen_size']}"
+            if specs.get("battery_life"):
+                product_str += f". Battery: {specs['battery_life']}"
+            if specs.get("weight"):
+                product_str += f". Weight: {specs['weight']}"
+            if specs.get("os"):
+                product_str += f". OS: {specs['os']}"
+            if specs.get("keyboard"):
+                product_str += f". Keyboard: {specs['keyboard']}"
+        if warranty:
+            product_str += f". Warranty: {warranty}"
+        if rating:
+            product_str += f". Rating: {rating}/5 ({reviews_count} reviews)"
+        if release_date:
+            product_str += f". Released: {release_date}"
+        if not available:
+            product_str += ". Status: Out of Stock"
+
+    return product_str
+
+
+def build_context(product_lines: list) -> str:
+    """Assemble the AI context from already formatted product lines"""
+    return CONTEXT_HEADER + "".join(line + "\n" for line in product_lines) + CONTEXT_FOOTER
+
+
+# Header of the compact tabular context (column names follow on the next line)
+TABLE_HEADER = "Available products, one per row, columns separated by |:\n"
+
+# Spec fields shown in the table; labels only where the value alone is ambiguous
+SPEC_FORMATS = {
+    "processor": "{}", "ram": "{} RAM", "storage": "{}", "screen_size": "{}",
+    "battery_life": "{} battery", "weight": "{}", "os": "{}", "keyboard": "{} keyboard"
+}
+
+
+def _specs_cell(specs: dict) -> str:
+    return ", ".join(template.format(specs[key]) for key, template in SPEC_FORMATS.items() if specs.get(key))
+
+
+# Columns of the compact table, most useful first: the token budgeter
+# drops columns from the end when the context is too large
+TABLE_COLUMNS = [
+    ("name", lambda p: p.get("name", "Unknown product")),
+    ("price", lambda p: f"${p['price']}" if p.get("price") not in (None, "") else ""),
+    ("category", lambda p: p.get("category", "")),
+    ("stock", lambda p: "" if p.get("available", True) else "out"),
+    ("description", lambda p: p.get("description", "")),
+    ("specs", lambda p: _specs_cell(p.get("specs") or {})),
+    ("tags", lambda p: ", ".join(p.get("tags") or [])),
+    ("rating", lambda p: f"{p['rating']}/5" if p.get("rating") else ""),
+    ("brand", lambda p: p.get("brand", "")),
+    ("warranty", lambda p: p.get("warranty", "")),
+    ("released", lambda p: p.get("release_date", "")),
+]
+
+
+def _cell(value) -> str:
+    # Keep the row on one line and the separator unambiguous
+    return " ".join(str(value).split()).replace("|", "/")
+
+
+def build_table_context(products: list, columns: list = None) -> str:
+    """
+    Compact AI context: column names once, then one "|" separated row per
+    product. Columns empty for every product are left out.
+    """
+    columns = columns or TABLE_COLUMNS
+    cells = [[_cell(render(p)) for _, render in columns] for p in products]
+    used = [i for i, (name, _) in enumerate(columns) if name == "name" or any(row[i] for row in cells)]
+
+    rows = ["|".join(columns[i][0] for i in used)]
+    rows += ["|".join(row[i] for i in used) for row in cells]
+    return TABLE_HEADER + "".join(row + "\n" for row in rows) + CONTEXT_FOOTER
+
+
+def product_payload(product: dict) -> dict:
+    """JSON-ready product details returned to the client with an answer"""
+    return {
+        "id": str(product.get("_id", "")),
+        "name": product.get("name", ""),
+        "description": product.get("description", ""),
+        "price": product.get("price", 0),
+        "tags": product.get("tags", []),
+        "category": product.get("category", ""),
+        "image_url": product.get("image_url", ""),
+        "brand": product.get("brand", ""),
+        "warranty": product.get("warranty", ""),
+        "rating": product.get("rating", 0),
+        "reviews_count": product.get("reviews_count", 0),
+        "available": product.get("available", True),
+        "release_date": product.get("release_date", ""),
+        "specs": product.get("specs", {}),
+        "created_at": product.get("created_at", "")
+    }
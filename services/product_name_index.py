@@ -0,0 +1,117 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from config.settings import PRODUCT_NAME_MATCH_THRESHOLD
+
+# Candidates scored with the edit distance after the trigram pre-selection
+FUZZY_CANDIDATES = 10
+
+
+def normalize_name(name: str) -> str:
+    """Case, accent, punctuation and spacing insensitive form of a product name"""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").casefold()
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return text.strip()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a normalized name, padded so short names still have some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class ProductNameIndex:
+    """
+    In-memory lookup of products by the names the model writes in PRODUCTS:.
+
+    Tried in order, the first that matches wins:
+    1. exact name,
+    2. normalized name (case, accents, punctuation, spacing),
+    3. fuzzy: names sharing the most character trigrams are scored with
+       max(trigram Dice coefficient, 1 - edit distance / length) and the
+       best one is accepted if it reaches the threshold.
+    Short mentions such as "Pan" do not match longer names such as
+    "Panini Press", and nothing is interpreted as a pattern.
+    """
+
+    def __init__(self, products: list, threshold: float = PRODUCT_NAME_MATCH_THRESHOLD):
+        self.products = products
+        self.threshold = threshold
+        self.exact = defaultdict(list)
+        self.normalized = defaultdict(list)
+        self.grams = defaultdict(set)  # trigram -> normalized names
+        self.name_grams = {}  # normalized name -> its trigrams
+
+        for index, product in enumerate(products):
+            name = product.get("name")
+            if not name:
+                continue
+            key = normalize_name(name)
+            self.exact[name].append(index)
+            self.normalized[key].append(index)
+            if key not in self.name_grams:
+                self.name_grams[key] = trigrams(key)
+                for gram in self.name_grams[key]:
+                    self.grams[gram].add(key)
+
+    def lookup(self, name: str) -> list:
+        """Positions of the products named name (several if the name is shared)"""
+        if not name:
+            return []
+        if name in self.exact:
+            return self.exact[name]
+        key = normalize_name(name)
+        if key in self.normalized:
+            return self.normalized[key]
+        match = self._fuzzy(key)
+        return self.normalized[match] if match else []
+
+    def find(self, names: list) -> list:
+        """Products matching any of the names, in the order of the names, without duplicates"""
+        seen = set()
+        found = []
+        for name in names:
+            for index in self.lookup(name):
+                if index not in seen:
+                    seen.add(index)
+                    found.append(self.products[index])
+        return found
+
+    def _fuzzy(self, key: str):
+        # Best fuzzy match of a normalized name, or None
+        if not key:
+            return None
+        query_grams = trigrams(key)
+
+        # Trigrams shared by a large part of the catalog ("gen", "pro") select nothing:
+        # candidates come from the rarer ones when there are any
+        postings = [self.grams[gram] for gram in query_grams if gram in self.grams]
+        common_limit = max(FUZZY_CANDIDATES, len(self.name_grams) // 20)
+        selective = [names for names in postings if len(names) <= common_limit] or postings
+
+        shared = Counter()
+        for names in selective:
+            shared.update(names)
+
+        best, best_score = None, 0.0
+        for candidate, _ in shared.most_common(FUZZY_CANDIDATES):
+            candidate_grams = self.name_grams[candidate]
+            dice = 2 * len(query_grams & candidate_grams) / (len(query_grams) + len(candidate_grams))
+            ratio = 1 - edit_distance(key, candidate) / max(len(key), len(candidate))
+            score = max(dice, ratio)
+            if score > best_score:
+                best, best_score = candidate, score
+        return best if best_score >= self.threshold else None
@@ -0,0 +1,114 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+# Words that carry no product meaning in shopper questions (EN/FR)
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "best", "by", "can", "do", "does", "for",
+    "from", "good", "have", "how", "i", "in", "is", "it", "me", "my", "need", "of", "on", "or",
+    "please", "show", "some", "that", "the", "this", "to", "want", "what", "which", "with", "you",
+    "your", "au", "aux", "avec", "ce", "de", "des", "du", "en", "est", "et", "je", "la", "le",
+    "les", "ma", "mes", "mon", "moi", "pour", "quel", "quelle", "qui", "sur", "un", "une", "veux", "vous"
+}
+
+# How many times each field is counted, i.e. its weight in the score
+FIELD_WEIGHTS = {
+    "name": 3,
+    "brand": 2,
+    "category": 2,
+    "tags": 2,
+    "description": 1,
+    "specs": 1
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase, strip accents and split text into search terms"""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii").lower()
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def _field_text(product: dict, field: str) -> str:
+    # Flatten a product field (lists and spec dicts included) into plain text
+    value = product.get(field)
+    if not value:
+        return ""
+    if isinstance(value, dict):
+        return " ".join(" ".join(v) if isinstance(v, list) else str(v) for v in value.values())
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+class ProductRetriever:
+    """
+    In-process BM25 index over the product catalog.
+
+    Indexes name, brand, category, tags, description and specs (weighted by
+    FIELD_WEIGHTS) so that only the products relevant to a question are sent
+    to the AI instead of the whole catalog.
+    """
+
+    def __init__(self, products: list, k1: float = 1.5, b: float = 0.75):
+        self.products = products
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc index, term frequency)]
+        self.doc_lengths = []
+
+        for index, product in enumerate(products):
+            terms = []
+            for field, weight in FIELD_WEIGHTS.items():
+                terms.extend(tokenize(_field_text(product, field)) * weight)
+            self.doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((index, frequency))
+
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    def _idf(self, term: str) -> float:
+        # BM25 inverse document frequency (always positive)
+        doc_freq = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.products) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query: str, k: int, allowed: set = None) -> list:
+        """
+        Return up to k (score, product index) pairs, best match first,
+        among the allowed product positions if given
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for index, frequency in postings:
+                if allowed is not None and index not in allowed:
+                    continue
+                length_norm = 1 - self.b + self.b * self.doc_lengths[index] / (self.avg_length or 1)
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, index) for index, score in best]
+
+    def top_k_indices(self, query: str, k: int, allowed: set = None) -> list:
+        """
+        Return the positions of the k products most relevant to the query
+        (among the allowed positions if given).
+        Questions that match nothing (e.g. "hello") get the best rated products.
+        """
+        results = [index for _, index in self.search(query, k, allowed)]
+        if results:
+            return results
+        return sorted(
+            range(len(self.products)) if allowed is None else sorted(allowed),
+            key=lambda i: (self.products[i].get("rating") or 0, self.products[i].get("reviews_count") or 0),
+            reverse=True
+        )[:k]
+
+    def top_k(self, query: str, k: int) -> list:
+        """Return the k products most relevant to the query"""
+        return [self.products[index] for index in self.top_k_indices(query, k)]
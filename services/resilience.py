@@ -0,0 +1,228 @@
+import os
+import time
+import asyncio
+import random
+import threading
+from config.settings import (
+    BREAKER_FAILURE_THRESHOLD, BREAKER_SLOW_CALL_SECONDS, BREAKER_RESET_TIMEOUT
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream that is known to be failing"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the overall time budget of a call is used up"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Errors and calls slower than slow_call_seconds count as failures.
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError for reset_timeout seconds. Then a single
+    probe call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def check(self):
+        """Raise CircuitOpenError while calls are being rejected (does not take the probe)"""
+        with self._lock:
+            if self._state == "open":
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(remaining)
+            elif self._state == "half_open" and self._probe_in_flight:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.reset_timeout)
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not reach the upstream"""
+        with self._lock:
+            if self._state == "open":
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(remaining)
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._probe_in_flight:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(self.reset_timeout)
+                self._probe_in_flight = True
+            self._stats["calls"] += 1
+
+    def record_success(self, elapsed: float):
+        """Record a completed call; slow calls count as failures"""
+        if elapsed > self.slow_call_seconds:
+            with self._lock:
+                self._stats["slow_calls"] += 1
+            self.record_failure()
+            return
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit past the threshold"""
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def call(self, fn, is_failure=lambda e: True):
+        """
+        Run fn() through the breaker.
+        Exceptions for which is_failure(error) is false (e.g. an invalid
+        request, which the upstream answered) do not count as failures.
+        """
+        self.before_call()
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - start)
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    async def call_async(self, fn, is_failure=lambda e: True):
+        """asyncio variant of call(): fn() returns an awaitable"""
+        self.before_call()
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # The caller went away: no verdict on the upstream, free the probe
+            self.record_success(0.0)
+            raise
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - start)
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    def stream(self, open_stream, is_failure=lambda e: True):
+        """
+        Yield from open_stream() as one call through the breaker.
+        A consumer that stops early (GeneratorExit) does not count as a failure.
+        """
+        self.before_call()
+        start = time.monotonic()
+        failed = False
+        try:
+            yield from open_stream()
+        except Exception as e:
+            failed = is_failure(e)
+            raise
+        finally:
+            if failed:
+                self.record_failure()
+            else:
+                self.record_success(time.monotonic() - start)
+
+    def stats(self) -> dict:
+        """Breaker state and counters"""
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures, **self._stats}
+
+
+def call_with_retry(fn, deadline: float, max_attempts: int, base_delay: float, max_delay: float,
+                    retry_if=lambda e: True):
+    """
+    Call fn(remaining_seconds) until it succeeds, with bounded retries.
+
+    Every attempt receives the time left before the overall deadline so it
+    can set its own timeout. Failed attempts for which retry_if(error) is
+    true are retried after a "full jitter" exponential backoff, as long as
+    attempts and time remain. CircuitOpenError is never retried.
+    """
+    deadline_at = time.monotonic() + deadline
+    for attempt in range(1, max_attempts + 1):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {deadline}s exceeded after {attempt - 1} attempt(s)")
+        try:
+            return fn(remaining)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if attempt == max_attempts or not retry_if(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            if time.monotonic() + delay >= deadline_at:
+                raise
+            time.sleep(delay)
+
+
+async def call_with_retry_async(fn, deadline: float, max_attempts: int, base_delay: float, max_delay: float,
+                                retry_if=lambda e: True):
+    """asyncio variant of call_with_retry: fn(remaining_seconds) returns an awaitable"""
+    deadline_at = time.monotonic() + deadline
+    for attempt in range(1, max_attempts + 1):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {deadline}s exceeded after {attempt - 1} attempt(s)")
+        try:
+            return await fn(remaining)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if attempt == max_attempts or not retry_if(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            if time.monotonic() + delay >= deadline_at:
+                raise
+            await asyncio.sleep(delay)
+
+
+# Breaker guarding the LLM upstream for this worker process
+_llm_breaker = CircuitBreaker()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_llm_breaker._reset)
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide LLM circuit breaker"""
+    return _llm_breaker
@@ -0,0 +1,266 @@
+import os
+import re
+import json
+import threading
+from config.settings import LLM_OUTPUT_FORMAT
+
+# Section labels of the MESSAGE:/PRODUCTS: text format, and the JSON field of each
+RESPONSE_SECTIONS = ["MESSAGE", "PRODUCTS", "INTEREST_SCORE", "CONFIDENCE", "KEYWORDS", "INTENT", "URGENCY"]
+SECTION_PATTERN = re.compile(r'\b(' + '|'.join(RESPONSE_SECTIONS) + r'):')
+
+STRING_LIST = {"type": "ARRAY", "items": {"type": "STRING"}}
+
+# Interest signals requested when the interest analysis is folded into the answer
+INTEREST_PROPERTIES = {
+    "interest_score": {"type": "INTEGER"},
+    "confidence": {"type": "STRING"},
+    "keywords": STRING_LIST,
+    "intent": STRING_LIST,
+    "urgency": STRING_LIST,
+}
+
+# Answer to a product question (Gemini response_schema format)
+ANSWER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "message": {"type": "STRING"},
+        "products": STRING_LIST,
+        **INTEREST_PROPERTIES
+    },
+    "required": ["message", "products"]
+}
+
+# Values of a list field meaning "nothing"
+EMPTY_LIST_VALUES = ("", "none", "n/a", "[]")
+
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+CODE_FENCE_PATTERN = re.compile(r'^```[a-zA-Z]*\s*|\s*```$')
+INTEGER_PATTERN = re.compile(r'-?\d+')
+
+
+def answer_schema(with_interest: bool = False) -> dict:
+    """Schema requested from the model for an answer (with or without the interest signals)"""
+    if with_interest:
+        return ANSWER_SCHEMA
+    return {**ANSWER_SCHEMA, "properties": {"message": {"type": "STRING"}, "products": STRING_LIST}}
+
+
+def render_answer(data: dict, output_format: str = LLM_OUTPUT_FORMAT) -> str:
+    """Write an answer dict the way the model is asked to (used for chat history and the local stub)"""
+    if output_format == "json":
+        return json.dumps(data, ensure_ascii=False)
+
+    lines = []
+    for label in RESPONSE_SECTIONS:
+        key = label.lower()
+        if key not in data:
+            continue
+        value = data[key]
+        if isinstance(value, list):
+            value = ", ".join(value) or "none"
+        lines.append(f"{label}: {value}")
+    return "\n".join(lines) + "\n"
+
+
+class ResponseFormatError(ValueError):
+    """The model's answer cannot be read, even after repair"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Unusable model answer: {reason}")
+        self.reason = reason
+
+
+class ResponseParser:
+    """
+    Single parser and validator of the model's structured answers.
+
+    JSON answers are read with json.loads; near misses (code fences, text
+    around the object, trailing commas, output cut before the closing
+    brackets) are repaired first. MESSAGE:/PRODUCTS: text answers are
+    mapped to the same fields. The result is then checked against a
+    response schema: values are coerced where the intent is clear ("8/10"
+    for an integer, "a, b" for a list), optional fields that do not
+    validate are dropped and a missing or invalid required field raises
+    ResponseFormatError, so callers can ask the model again.
+    Counts of parsed, repaired and failed answers are kept for monitoring.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._stats = {"parsed": 0, "json": 0, "sections": 0, "repaired": 0, "failed": 0, "retries": 0}
+        self._failure_reasons = {}
+
+    def parse(self, text: str, schema: dict = ANSWER_SCHEMA) -> dict:
+        """Return the validated fields of an answer, or raise ResponseFormatError"""
+        try:
+            data, source, repaired = self._load(text or "", schema)
+            data, coerced = self._validate(data, schema, "")
+        except ResponseFormatError as e:
+            self._record_failure(e.reason)
+            raise
+
+        with self._lock:
+            self._stats["parsed"] += 1
+            self._stats[source] += 1
+            # Text sections are always strings: only coercions of JSON values are repairs
+            self._stats["repaired"] += int(repaired or (coerced and source == "json"))
+        return data
+
+    def record_retry(self):
+        """Count a model call made again because its answer could not be parsed"""
+        with self._lock:
+            self._stats["retries"] += 1
+
+    def _record_failure(self, reason: str):
+        with self._lock:
+            self._stats["failed"] += 1
+            self._failure_reasons[reason] = self._failure_reasons.get(reason, 0) + 1
+
+    def _load(self, text: str, schema: dict) -> tuple:
+        # (data, "json" | "sections", repaired)
+        try:
+            return json.loads(text), "json", False
+        except ValueError:
+            pass
+
+        stripped = CODE_FENCE_PATTERN.sub("", text.strip())
+        if "{" in stripped:
+            try:
+                return json.loads(self._repair(stripped)), "json", True
+            except ValueError:
+                pass
+
+        sections = self._split_sections(text)
+        if sections and all(field in sections for field in schema.get("required", [])):
+            return sections, "sections", False
+        raise ResponseFormatError("invalid_json" if "{" in stripped else "unformatted")
+
+    @staticmethod
+    def _repair(text: str) -> str:
+        # Keep the outermost object, drop trailing commas and close what truncation left open
+        text = text[text.find("{"):]
+        end = text.rfind("}")
+        if end != -1:
+            candidate = TRAILING_COMMA_PATTERN.sub(r'\1', text[:end + 1])
+            try:
+                json.loads(candidate)
+                return candidate
+            except ValueError:
+                pass
+
+        # Cut off output: close the open string and brackets
+        text = TRAILING_COMMA_PATTERN.sub(r'\1', text)
+
+        closers, in_string, escaped = [], False, False
+        for char in text:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                closers.append("}" if char == "{" else "]")
+            elif char in "}]" and closers:
+                closers.pop()
+        if in_string:
+            text += '"'
+        return TRAILING_COMMA_PATTERN.sub(r'\1', text.rstrip().rstrip(",") + "".join(reversed(closers)))
+
+    @staticmethod
+    def _split_sections(text: str) -> dict:
+        # MESSAGE:/PRODUCTS:/... text -> {"message": ..., "products": ..., ...}
+        sections = {}
+        matches = list(SECTION_PATTERN.finditer(text))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            sections.setdefault(match.group(1).lower(), text[match.end():end].strip())
+        return sections
+
+    def _validate(self, value, schema: dict, path: str) -> tuple:
+        # (coerced value, whether anything was coerced); raises ResponseFormatError
+        kind = schema.get("type")
+
+        if kind == "OBJECT":
+            if not isinstance(value, dict):
+                raise ResponseFormatError(f"type:{path or 'answer'}")
+            result, coerced = {}, False
+            required = schema.get("required", [])
+            for name, field_schema in schema.get("properties", {}).items():
+                if value.get(name) is None:
+                    if name in required:
+                        raise ResponseFormatError(f"missing:{name}")
+                    continue
+                try:
+                    result[name], field_coerced = self._validate(value[name], field_schema, name)
+                except ResponseFormatError:
+                    if name in required:
+                        raise
+                    coerced = True  # optional field dropped
+                    continue
+                coerced = coerced or field_coerced
+            return result, coerced
+
+        if kind == "ARRAY":
+            if isinstance(value, str):
+                if value.strip().lower() in EMPTY_LIST_VALUES:
+                    return [], True
+                value = [item.strip().strip('[]"\'') for item in value.split(",")]
+                value = [item for item in value if item]
+                coerced = True
+            elif isinstance(value, list):
+                coerced = False
+            else:
+                raise ResponseFormatError(f"type:{path}")
+            items, item_schema = [], schema.get("items", {"type": "STRING"})
+            for item in value:
+                item, item_coerced = self._validate(item, item_schema, path)
+                items.append(item)
+                coerced = coerced or item_coerced
+            return items, coerced
+
+        if kind == "STRING":
+            if isinstance(value, str):
+                return value, False
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value), True
+            raise ResponseFormatError(f"type:{path}")
+
+        if kind in ("INTEGER", "NUMBER"):
+            if isinstance(value, bool):
+                raise ResponseFormatError(f"type:{path}")
+            if isinstance(value, int) or (kind == "NUMBER" and isinstance(value, float)):
+                return value, False
+            if isinstance(value, float):
+                return round(value), True
+            match = INTEGER_PATTERN.search(value) if isinstance(value, str) else None
+            if not match:
+                raise ResponseFormatError(f"type:{path}")
+            return int(match.group()), True
+
+        return value, False
+
+    def stats(self) -> dict:
+        """Parse counters for monitoring"""
+        with self._lock:
+            return {"output_format": LLM_OUTPUT_FORMAT, **self._stats,
+                    "failure_reasons": dict(self._failure_reasons)}
+
+
+# Parse counters shared by every request of this worker process
+_response_parser = ResponseParser()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_response_parser._reset)
+
+
+def get_response_parser() -> ResponseParser:
+    """Return the process-wide response parser"""
+    return _response_parser
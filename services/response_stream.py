@@ -0,0 +1,161 @@
+import re
+import json
+
+class StreamingResponseParser:
+    """
+    Incremental parser for streamed MESSAGE:/PRODUCTS: answers.
+
+    feed() receives raw chunks from Gemini and returns the part of the
+    MESSAGE section that is safe to show to the user. Text that might be
+    the start of another section label (e.g. "PROD") is held back until
+    the next chunk disambiguates it, so labels never leak to the client.
+    The full raw text is kept in `buffer` for the final parse.
+    """
+
+    def __init__(self, labels: list):
+        self.labels = [f"{label}:" for label in labels if label != "MESSAGE"]
+        self.message_label = "MESSAGE:"
+        self.buffer = ""
+        self.state = "preamble"  # preamble -> message -> done
+        self.emitted = 0  # position in buffer up to which message text was emitted
+        self.started = False  # leading whitespace of the message is skipped
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the new message text to emit (may be empty)"""
+        self.buffer += chunk
+
+        if self.state == "preamble":
+            self._detect_message_start()
+        if self.state != "message":
+            return ""
+
+        # Stop at the first section that follows the message
+        end = self._find_next_label()
+        if end is not None:
+            self.state = "done"
+            return self._emit(end, final=True)
+
+        return self._emit(len(self.buffer) - self._label_prefix_length(), final=False)
+
+    def finish(self) -> str:
+        """Flush whatever message text is left once the stream has ended"""
+        if self.state == "preamble":
+            # The answer never used the expected format: it is all message
+            self.state = "message"
+            self.emitted = 0
+        if self.state != "message":
+            return ""
+        self.state = "done"
+        return self._emit(len(self.buffer), final=True)
+
+    def _detect_message_start(self):
+        # Wait until we know whether the answer starts with "MESSAGE:"
+        stripped = self.buffer.lstrip()
+        index = self.buffer.find(self.message_label)
+        if index != -1:
+            self.state = "message"
+            self.emitted = index + len(self.message_label)
+        elif not self.message_label.startswith(stripped[:len(self.message_label)]):
+            # No label at the beginning: treat the raw text as the message
+            self.state = "message"
+            self.emitted = 0
+
+    def _find_next_label(self):
+        # Position of the earliest section label after the message start
+        positions = [self.buffer.find(label, self.emitted) for label in self.labels]
+        positions = [position for position in positions if position != -1]
+        return min(positions) if positions else None
+
+    def _label_prefix_length(self) -> int:
+        # Length of the buffer suffix that could still grow into a label
+        longest = max(len(label) for label in self.labels)
+        for size in range(min(longest - 1, len(self.buffer) - self.emitted), 0, -1):
+            suffix = self.buffer[-size:]
+            if any(label.startswith(suffix) for label in self.labels):
+                return size
+        return 0
+
+    def _emit(self, end: int, final: bool) -> str:
+        # Hold back trailing whitespace: it may sit right before a label
+        if not final:
+            while end > self.emitted and self.buffer[end - 1].isspace():
+                end -= 1
+        text = self.buffer[self.emitted:max(end, self.emitted)]
+        if final:
+            text = text.rstrip()
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+        self.emitted = max(end, self.emitted)
+        return text
+
+
+class StreamingJsonMessageParser:
+    """
+    Incremental parser for streamed JSON answers ({"message": ..., "products": ...}).
+
+    feed() returns the decoded part of the "message" string value received
+    so far. Escape sequences split across chunks are held back until they
+    are complete. The full raw text is kept in `buffer` for the final
+    parse, like StreamingResponseParser.
+    """
+
+    KEY_PATTERN = re.compile(r'"message"\s*:\s*"')
+    # Run of string characters that need no decoding
+    PLAIN_PATTERN = re.compile(r'[^"\\]+')
+
+    def __init__(self):
+        self.buffer = ""
+        self.state = "preamble"  # preamble -> message -> done
+        self.position = 0  # position in buffer of the next message character to decode
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the new message text to emit (may be empty)"""
+        self.buffer += chunk
+
+        if self.state == "preamble":
+            match = self.KEY_PATTERN.search(self.buffer)
+            if match is None:
+                return ""
+            self.state = "message"
+            self.position = match.end()
+        if self.state != "message":
+            return ""
+        return self._decode()
+
+    def finish(self) -> str:
+        """Nothing is held back once the message string is closed; the rest is left to the final parse"""
+        self.state = "done"
+        return ""
+
+    def _decode(self) -> str:
+        # Decode message characters up to the closing quote or an incomplete escape
+        parts = []
+        buffer, position = self.buffer, self.position
+        while position < len(buffer):
+            plain = self.PLAIN_PATTERN.match(buffer, position)
+            if plain:
+                parts.append(plain.group())
+                position = plain.end()
+                continue
+
+            if buffer[position] == '"':
+                self.state = "done"
+                position += 1
+                break
+
+            # Backslash: \uXXXX (possibly a surrogate pair) or a one-character escape
+            size = 6 if buffer.startswith("\\u", position) else 2
+            if size == 6 and buffer.startswith("\\ud", position) and buffer[position + 3:position + 4].lower() in "89ab":
+                size = 12
+            if position + size > len(buffer):
+                break
+            try:
+                parts.append(json.loads(f'"{buffer[position:position + size]}"'))
+            except ValueError:
+                # Invalid escape: keep it as is
+                parts.append(buffer[position:position + size])
+            position += size
+
+        self.position = position
+        return "".join(parts)
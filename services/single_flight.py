@@ -0,0 +1,168 @@
+import os
+import copy
+import asyncio
+import threading
+
+
+class _Flight:
+    """One in-flight call and the callers waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for it and receive a deep copy of its
+    result (or the same exception) instead of making their own call.
+    Works across the request threads of one worker process.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "max_waiters": 0}
+
+    def do(self, key: str, fn, timeout: float = None):
+        """
+        Run fn() once for all concurrent callers with the same key.
+        Returns (result, shared) where shared is True for coalesced callers.
+        Waiters raise TimeoutError if the leader takes longer than timeout.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._stats["leaders"] += 1
+            else:
+                flight.waiters += 1
+                self._stats["coalesced"] += 1
+                self._stats["max_waiters"] = max(self._stats["max_waiters"], flight.waiters)
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            # Later callers start a new flight; current waiters are released
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> dict:
+        """Coalescing counters"""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "waiting": sum(flight.waiters for flight in self._flights.values()),
+                **self._stats
+            }
+
+
+class AsyncSingleFlight:
+    """
+    asyncio variant of SingleFlight, for the coroutines of one event loop.
+    The leader runs the coroutine; concurrent callers with the same key
+    await its result instead of starting their own call.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._flights = {}  # key -> (future, waiter count list)
+        self._stats = {"leaders": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "max_waiters": 0}
+
+    async def do(self, key: str, fn, timeout: float = None):
+        """
+        Await fn() once for all concurrent callers with the same key.
+        Returns (result, shared) where shared is True for coalesced callers.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            future, waiters = flight
+            waiters[0] += 1
+            self._stats["coalesced"] += 1
+            self._stats["max_waiters"] = max(self._stats["max_waiters"], waiters[0])
+            try:
+                # shield: a waiter timing out or going away must not cancel the leader
+                result = await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            finally:
+                waiters[0] -= 1
+            return copy.deepcopy(result), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = (future, [0])
+        self._stats["leaders"] += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            # Leader cancelled: waiters get the cancellation too
+            future.cancel()
+            raise
+        except Exception as e:
+            self._stats["errors"] += 1
+            future.set_exception(e)
+            # Nobody may be waiting: mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        """Coalescing counters"""
+        return {
+            "in_flight": len(self._flights),
+            "waiting": sum(waiters[0] for _, waiters in self._flights.values()),
+            **self._stats
+        }
+
+
+# Coalescing layers shared by every request thread / coroutine of this worker process
+_single_flight = SingleFlight()
+_async_single_flight = AsyncSingleFlight()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_single_flight._reset)
+    os.register_at_fork(after_in_child=_async_single_flight._reset)
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group"""
+    return _single_flight
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    """Return the process-wide single-flight group of the asyncio path"""
+    return _async_single_flight
@@ -0,0 +1,102 @@
+import os
+import threading
+from config.settings import PROMPT_CONTEXT_TOKEN_BUDGET
+from services.product_formatter import TABLE_COLUMNS, build_table_context
+
+# Rough Gemini estimate for catalog text: ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+# Columns kept whatever the budget
+MIN_TABLE_COLUMNS = 2  # name, price
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a prompt without calling the model"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def fit_product_context(products: list, max_tokens: int = PROMPT_CONTEXT_TOKEN_BUDGET) -> tuple:
+    """
+    Encode products as the compact table within max_tokens (estimated).
+    Over budget, columns are dropped from the end of TABLE_COLUMNS (down to
+    name and price), then products from the end of the list, so ranked
+    lists lose their least relevant products first.
+    Returns (context, info) where info holds the estimated tokens, the
+    columns and number of products kept and whether anything was dropped.
+    """
+    columns = list(TABLE_COLUMNS)
+    kept = list(products)
+    context = build_table_context(kept, columns)
+    tokens = estimate_tokens(context)
+
+    while tokens > max_tokens and len(columns) > MIN_TABLE_COLUMNS:
+        columns.pop()
+        context = build_table_context(kept, columns)
+        tokens = estimate_tokens(context)
+
+    while tokens > max_tokens and len(kept) > 1:
+        # Shrink proportionally to the overshoot, at least one product per step
+        keep = min(len(kept) - 1, max(1, len(kept) * max_tokens // tokens))
+        kept = kept[:keep]
+        context = build_table_context(kept, columns)
+        tokens = estimate_tokens(context)
+
+    trimmed = len(columns) < len(TABLE_COLUMNS) or len(kept) < len(products)
+    get_token_usage().record_context(trimmed)
+    return context, {
+        "tokens": tokens,
+        "columns": [name for name, _ in columns],
+        "products": len(kept),
+        "trimmed": trimmed
+    }
+
+
+class TokenUsage:
+    """Per-process record of the estimated prompt size of each model request"""
+
+    def __init__(self, budget: int = PROMPT_CONTEXT_TOKEN_BUDGET):
+        self.budget = budget
+        self._reset()
+
+    def _reset(self):
+        # (Re)initialize process-local state, also used after fork
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "total_tokens": 0, "max_tokens": 0, "last_tokens": 0,
+                       "contexts": 0, "contexts_trimmed": 0}
+
+    def record_context(self, trimmed: bool):
+        with self._lock:
+            self._stats["contexts"] += 1
+            self._stats["contexts_trimmed"] += int(trimmed)
+
+    def record_prompt(self, *parts: str) -> int:
+        """Record the estimated tokens of one request (context, prompt, ...)"""
+        tokens = sum(estimate_tokens(part) for part in parts if part)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_tokens"] += tokens
+            self._stats["max_tokens"] = max(self._stats["max_tokens"], tokens)
+            self._stats["last_tokens"] = tokens
+        return tokens
+
+    def stats(self) -> dict:
+        """Prompt size counters for monitoring"""
+        with self._lock:
+            requests = self._stats["requests"]
+            return {
+                "context_budget": self.budget,
+                "avg_tokens": round(self._stats["total_tokens"] / requests, 1) if requests else 0.0,
+                **self._stats
+            }
+
+
+# Prompt size counters of this worker process
+_token_usage = TokenUsage()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_token_usage._reset)
+
+
+def get_token_usage() -> TokenUsage:
+    """Return the process-wide prompt token usage counters"""
+    return _token_usage
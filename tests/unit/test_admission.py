@@ -0,0 +1,73 @@
+# tests/unit/test_admission.py
+
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.admission import AdmissionController, AdmissionRejected, PRIORITY_CONTACT, PRIORITY_QUESTION
+
+def test_rejects_when_queue_is_full():
+    admission = AdmissionController(max_concurrency=1, max_queue=0, max_wait=1)
+
+    with admission.slot():
+        with pytest.raises(AdmissionRejected) as error:
+            admission.acquire()
+
+    assert error.value.reason == "queue full"
+    assert error.value.retry_after >= 1
+    assert admission.stats()["rejected_queue_full"] == 1
+    assert admission.stats()["active"] == 0
+
+def test_rejects_after_max_wait():
+    admission = AdmissionController(max_concurrency=1, max_queue=4, max_wait=0.05)
+
+    with admission.slot():
+        with pytest.raises(AdmissionRejected):
+            admission.acquire()
+        assert admission.stats()["queued_now"] == 0
+
+    assert admission.stats()["rejected_timeout"] == 1
+
+def test_contact_priority_is_served_first():
+    admission = AdmissionController(max_concurrency=1, max_queue=4, max_wait=2)
+    order = []
+
+    def worker(name, priority):
+        with admission.slot(priority):
+            order.append(name)
+
+    admission.acquire()
+    threads = [threading.Thread(target=worker, args=("question", PRIORITY_QUESTION))]
+    threads[0].start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=worker, args=("contact", PRIORITY_CONTACT)))
+    threads[1].start()
+    time.sleep(0.05)
+    admission.release()
+
+    for thread in threads:
+        thread.join()
+    assert order == ["contact", "question"]
+    assert admission.stats()["active"] == 0
+
+def test_async_slots_share_the_limit():
+    admission = AdmissionController(max_concurrency=2, max_queue=10, max_wait=2)
+    running, peak = [0], [0]
+
+    async def call():
+        async with admission.async_slot():
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.02)
+            running[0] -= 1
+
+    async def scenario():
+        await asyncio.gather(*[call() for _ in range(8)])
+
+    asyncio.run(scenario())
+    assert peak[0] == 2
+    assert admission.stats()["admitted"] == 8
+    assert admission.stats()["active"] == 0
@@ -0,0 +1,45 @@
+# tests/unit/test_answer_cache.py
+
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.answer_cache import AnswerCache
+
+def test_key_ignores_case_spacing_and_punctuation():
+    key = AnswerCache.make_key("Laptops under $1000?", "v1")
+    assert AnswerCache.make_key("  laptops   UNDER $1000 ", "v1") == key
+    assert AnswerCache.make_key("Laptops under $1000?", "v2") != key
+
+def test_hits_return_copies():
+    cache = AnswerCache(max_size=2, ttl=60)
+    cache.set("k", {"message": "Hi", "products": []})
+
+    first = cache.get("k")
+    first["products"].append({"name": "changed"})
+
+    assert cache.get("k") == {"message": "Hi", "products": []}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction():
+    cache = AnswerCache(max_size=2, ttl=60)
+    cache.set("a", {})
+    cache.set("b", {})
+    cache.get("a")
+    cache.set("c", {})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {}
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry():
+    cache = AnswerCache(max_size=2, ttl=10)
+    with patch('services.answer_cache.time') as mock_time:
+        mock_time.monotonic.return_value = 100.0
+        cache.set("k", {"message": "Hi"})
+        mock_time.monotonic.return_value = 111.0
+
+        assert cache.get("k") is None
+        assert cache.stats()["expired"] == 1
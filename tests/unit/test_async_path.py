@@ -0,0 +1,76 @@
+# tests/unit/test_async_path.py
+
+import asyncio
+import time
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.single_flight import AsyncSingleFlight
+from services.resilience import call_with_retry_async
+from services.local_llm import LocalChatClient
+
+def test_async_single_flight_coalesces_concurrent_calls():
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"message": "shared"}
+
+    async def scenario():
+        return await asyncio.gather(*[group.do("key", slow_call) for _ in range(5)])
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(result == {"message": "shared"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert group.stats()["in_flight"] == 0
+
+def test_async_single_flight_shares_errors():
+    group = AsyncSingleFlight()
+
+    async def failing_call():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*[group.do("key", failing_call) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert group.stats()["errors"] == 1
+
+def test_async_retry():
+    attempts = []
+
+    async def flaky(remaining):
+        attempts.append(remaining)
+        if len(attempts) < 2:
+            raise ConnectionError("try again")
+        return "ok"
+
+    result = asyncio.run(call_with_retry_async(flaky, deadline=5, max_attempts=3, base_delay=0.01, max_delay=0.02))
+    assert result == "ok"
+    assert len(attempts) == 2
+
+def test_async_calls_overlap():
+    prompt = "User question: laptop"
+
+    async def ask():
+        client = LocalChatClient(latency="fixed:0.2")
+        client.start_chat("- MacBook Air M2: Light laptop\n")
+        return await client.send_message_async(prompt)
+
+    async def scenario():
+        return await asyncio.gather(*[ask() for _ in range(20)])
+
+    start = time.monotonic()
+    answers = asyncio.run(scenario())
+
+    # 20 calls of 0.2s share the event loop instead of running one after another
+    assert time.monotonic() - start < 1.0
+    assert len(set(answers)) == 1
+    assert "PRODUCTS: MacBook Air M2" in answers[0]
@@ -0,0 +1,64 @@
+# tests/unit/test_chat_sessions.py
+
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.chat_sessions import ChatSession, ChatSessionStore
+from services.response_parser import render_answer
+
+def answer(message, *products):
+    return {"message": message, "products": [{"name": name} for name in products]}
+
+def test_turns_become_history_messages():
+    store = ChatSessionStore()
+    session = ChatSession("c1")
+
+    with patch.object(ChatSessionStore, '_save', return_value=True):
+        session = store.record_turn(session, "I need a laptop", answer("Try these", "MacBook Air M2"))
+
+    assert session.is_follow_up
+    assert session.retrieval_hint() == "MacBook Air M2"
+    assert session.history_messages() == [
+        {"role": "user", "parts": ["User question: I need a laptop"]},
+        {"role": "model", "parts": [render_answer({"message": "Try these", "products": ["MacBook Air M2"]})]},
+    ]
+    assert store.get("c1") is session
+
+def test_old_turns_are_folded_into_summary():
+    store = ChatSessionStore(max_history_tokens=40, summary_max_chars=60)
+    session = ChatSession("c1")
+
+    with patch.object(ChatSessionStore, '_save', return_value=True):
+        for i in range(6):
+            session = store.record_turn(session, f"question number {i}", answer("x" * 60, f"Product {i}"))
+
+    assert session.version == 6
+    assert len(session.turns) < 6
+    assert session.turns[-1]["question"] == "question number 5"
+    assert len(session.summary) <= 60
+    assert store.stats()["summarized_turns"] == 6 - len(session.turns)
+
+def test_conflicting_save_records_on_top_of_stored_state():
+    store = ChatSessionStore()
+    stored = ChatSession("c1", [{"question": "other tab", "answer": "hi", "products": []}], "", 1)
+
+    with patch.object(ChatSessionStore, '_save', side_effect=[False, True]), \
+            patch.object(ChatSessionStore, '_load', return_value=stored):
+        session = store.record_turn(ChatSession("c1"), "my question", answer("ok"))
+
+    assert session.version == 2
+    assert [turn["question"] for turn in session.turns] == ["other tab", "my question"]
+    assert store.stats()["conflicts"] == 1
+
+def test_lru_evicts_least_recent_session():
+    store = ChatSessionStore(max_sessions=2)
+
+    with patch.object(ChatSessionStore, '_save', return_value=True):
+        for conversation_id in ("a", "b", "c"):
+            store.record_turn(ChatSession(conversation_id), "hello", answer("hi"))
+
+    with patch.object(ChatSessionStore, '_load', return_value=None):
+        assert not store.get("a").is_follow_up
+    assert store.get("c").is_follow_up
+    assert store.stats()["evictions"] == 1
@@ -0,0 +1,57 @@
+# tests/unit/test_combined_response.py
+
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.ai_services import AiService
+from services.interest_analyzer import InterestAnalyzer
+
+COMBINED_REPLY = """MESSAGE: The MacBook Air M2 fits your budget.
+PRODUCTS: MacBook Air M2
+INTEREST_SCORE: 8/10
+CONFIDENCE: high
+KEYWORDS: price, buy
+INTENT: I want to buy
+URGENCY: none
+"""
+
+def test_parse_combined_response():
+    with patch('services.ai_services.ProductContextProvider') as mock_provider:
+        mock_provider.get_products_by_names.return_value = [{"id": "1", "name": "MacBook Air M2"}]
+
+        result = AiService.__new__(AiService)._parse_ai_response(COMBINED_REPLY)
+
+        mock_provider.get_products_by_names.assert_called_once_with(["MacBook Air M2"])
+        assert result["message"] == "The MacBook Air M2 fits your budget."
+        signals = result["interest_signals"]
+        assert signals["interest_score"] == 8
+        assert signals["confidence_level"] == "high"
+        assert signals["high_interest_keywords"] == ["price", "buy"]
+        assert signals["urgency_indicators"] == []
+
+def test_plain_response_has_no_signals():
+    with patch('services.ai_services.ProductContextProvider') as mock_provider:
+        mock_provider.get_products_by_names.return_value = []
+
+        result = AiService.__new__(AiService)._parse_ai_response("MESSAGE: Hello!\nPRODUCTS: none")
+
+        mock_provider.get_products_by_names.assert_not_called()
+        assert result["message"] == "Hello!"
+        assert result["interest_signals"] is None
+
+def test_signals_skip_second_ai_call():
+    signals = {
+        "high_interest_keywords": ["buy"],
+        "purchase_intent_keywords": [],
+        "urgency_indicators": [],
+        "interest_score": 6,
+        "confidence_level": "medium",
+        "reasoning": ""
+    }
+    with patch.object(InterestAnalyzer, 'generate_ai_keywords') as mock_generate:
+        analysis = InterestAnalyzer.analyze_interest_from_signals("I want to buy a laptop", "Sure", [], signals)
+
+        mock_generate.assert_not_called()
+        assert analysis["interest_score"] == 8
+        assert analysis["should_capture_lead"] is True
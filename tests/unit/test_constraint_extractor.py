@@ -0,0 +1,75 @@
+# tests/unit/test_constraint_extractor.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.catalog_snapshot import CatalogSnapshot
+from unittest.mock import patch
+from services.constraint_extractor import ConstraintExtractor
+
+PRODUCTS = [
+    {"_id": "1", "name": "MacBook Air M2", "price": 999, "category": "Laptops", "brand": "Apple"},
+    {"_id": "2", "name": "Dell XPS 13", "price": 1199, "category": "Laptops", "brand": "Dell"},
+    {"_id": "3", "name": "Gaming Mouse", "price": 49, "category": "Accessories", "brand": "Logitech",
+     "available": False},
+    {"_id": "4", "name": "Galaxy S24", "price": 799, "category": "Smartphones", "brand": "Samsung"},
+]
+
+def test_price_category_brand_and_stock_are_extracted():
+    extractor = ConstraintExtractor(PRODUCTS)
+
+    constraints = extractor.extract("Show me laptops under $1000")
+    assert (constraints.min_price, constraints.max_price) == (None, 1000)
+    assert constraints.categories == {"Laptops"}
+
+    constraints = extractor.extract("Un ordinateur Dell entre 1 000 et 1500 € en stock ?")
+    assert (constraints.min_price, constraints.max_price) == (1000, 1500)
+    assert constraints.categories == {"Laptops"} and constraints.brands == {"Dell"}
+    assert constraints.in_stock
+
+    assert extractor.extract("phones over 1.5k").min_price == 1500
+    assert extractor.extract("phones over 1.5k").categories == {"Smartphones"}
+
+def test_numbers_that_are_not_prices_are_ignored():
+    extractor = ConstraintExtractor(PRODUCTS)
+    assert not extractor.extract("A laptop with at least 16GB of RAM").min_price
+    assert not extractor.extract("Anything with up to 2 years of warranty?")
+    assert not extractor.extract("hello")
+
+def test_weights_and_lengths_are_not_prices():
+    extractor = ConstraintExtractor(PRODUCTS)
+    for question in ("laptop under 2 kg", "a laptop less than 1.5kg", "phone under 200 grams",
+                     "moins de 300 grammes", "under 3 lbs", "a bag under 55 cm", "screen up to 15\"",
+                     "cable of at least 2 m"):
+        constraints = extractor.extract(question)
+        assert (constraints.min_price, constraints.max_price) == (None, None), question
+    assert extractor.extract("laptop under 2 kg and under $1000").max_price == 1000
+
+def test_context_only_contains_matching_products():
+    snapshot = CatalogSnapshot(PRODUCTS, 1)
+
+    # Price is a hard filter, the category ranks its products first
+    context = snapshot.context_for("Show me laptops under $1000")
+    assert "Dell XPS 13" not in context
+    assert context.index("MacBook Air M2") < context.index("Galaxy S24")
+
+    # Constraints read from the question, not from the products of a follow-up hint
+    context = snapshot.context_for("accessories in stock? Dell XPS 13", constraints_from="accessories in stock?")
+    assert "No product matches the customer's constraints (Accessories, in stock)" in context
+    assert "Gaming Mouse" in context
+
+def test_category_words_and_availability_questions_do_not_exclude_products():
+    products = PRODUCTS + [{"_id": "5", "name": "Galaxy S24 Case", "price": 29, "category": "Accessories"}]
+    extractor = ConstraintExtractor(products)
+    assert not extractor.extract("Is the Gaming Mouse available in blue?").in_stock
+    assert extractor.extract("Is the Gaming Mouse in stock?").in_stock
+
+    snapshot = CatalogSnapshot(products, 1)
+    assert "Galaxy S24 Case" in snapshot.context_for("a phone case under $50")
+    assert "Gaming Mouse" in snapshot.context_for("Is the Gaming Mouse available in blue?")
+
+    # Large catalogs: top-k of the named category interleaved with the overall top-k
+    with patch('services.catalog_snapshot.PRODUCT_CONTEXT_FULL_THRESHOLD', 1), \
+         patch('services.catalog_snapshot.PRODUCT_CONTEXT_TOP_K', 2):
+        context = snapshot.context_for("a phone case")
+    assert "Galaxy S24|" in context and "Galaxy S24 Case|" in context
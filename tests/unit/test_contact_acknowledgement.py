@@ -0,0 +1,46 @@
+# tests/unit/test_contact_acknowledgement.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.contact_extractor import ContactExtractor
+
+def test_detects_language():
+    assert ContactExtractor.detect_language("Je m'appelle Marie, mon tél est 06 12 34 56 78") == "fr"
+    assert ContactExtractor.detect_language("My name is John and my phone is 555-123-4567") == "en"
+
+def test_bare_contact_replies_are_french():
+    assert ContactExtractor.detect_language("marie.dupont@gmail.com 06 12 34 56 78") == "fr"
+    assert ContactExtractor.detect_language("Marie Dupont, marie@exemple.fr") == "fr"
+    assert ContactExtractor.detect_language("0612345678") == "fr"
+
+def test_detects_language_of_questions():
+    assert ContactExtractor.detect_language("Combien de temps pour la livraison ?") == "fr"
+    assert ContactExtractor.detect_language("Quels moyens de paiement acceptez-vous ?") == "fr"
+    assert ContactExtractor.detect_language("Comment faire un retour ?") == "fr"
+    assert ContactExtractor.detect_language("How long does shipping take?") == "en"
+
+def test_french_acknowledgement_lists_received_fields():
+    contact_data = {"name": "Marie Dupont", "email": "marie@example.fr", "confidence": "medium"}
+
+    message = ContactExtractor.generate_acknowledgement(contact_data, "fr")
+
+    assert message.startswith("Merci Marie Dupont !")
+    assert "votre email" in message
+    assert "téléphone" not in message
+    assert ContactExtractor.generate_follow_up_message(contact_data, "fr") == \
+        "Merci ! Il me manque juste votre téléphone. Pouvez-vous me le fournir ?"
+
+def test_english_acknowledgement_and_follow_up():
+    contact_data = {"email": "john@example.com", "phone": "555-123-4567", "confidence": "medium"}
+
+    message = ContactExtractor.generate_acknowledgement(contact_data, "en")
+
+    assert message.startswith("Thank you!")
+    assert "your email and your phone number" in message
+    assert ContactExtractor.generate_follow_up_message(contact_data, "en") == \
+        "Thanks! I just need your name. Could you share it?"
+
+def test_acknowledgement_without_details_asks_again():
+    assert "renvoyer" in ContactExtractor.generate_acknowledgement({"confidence": "low"}, "fr")
+    assert "send them again" in ContactExtractor.generate_acknowledgement({"confidence": "low"}, "en")
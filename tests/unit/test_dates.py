@@ -0,0 +1,58 @@
+# tests/unit/test_dates.py
+
+from datetime import datetime
+from bson import ObjectId
+from flask import Flask
+import mongomock
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.dates import parse_datetime, as_datetime, date_range_filter
+from utils.json_provider import AppJSONProvider
+from migrations.migrate_dates import migrate_collection, unmigrated_fields
+
+def test_client_dates_are_parsed_to_utc():
+    assert parse_datetime("2024-01-31") == datetime(2024, 1, 31)
+    assert parse_datetime("2024-01-31", end_of_day=True) == datetime(2024, 1, 31, 23, 59, 59, 999000)
+    assert parse_datetime("2024-01-31T10:00:00+02:00") == datetime(2024, 1, 31, 8)
+    assert parse_datetime("2024-01-31T08:00:00Z") == datetime(2024, 1, 31, 8)
+    with pytest.raises(ValueError):
+        parse_datetime("31/01/2024")
+    assert as_datetime("2024-01-31T08:00:00.123456Z") == datetime(2024, 1, 31, 8, 0, 0, 123456)
+    assert as_datetime("soon") is None
+
+def test_responses_use_iso_dates():
+    app = Flask(__name__)
+    app.json = AppJSONProvider(app)
+    body = app.json.dumps({"timestamp": datetime(2024, 1, 31, 8, 0, 0, 123456), "_id": ObjectId("0123456789ab0123456789ab")})
+    assert body == '{"_id": "0123456789ab0123456789ab", "timestamp": "2024-01-31T08:00:00.123Z"}'
+
+def test_migration_finds_the_string_dates_in_batches():
+    collection = mongomock.MongoClient().db.leads
+    collection.insert_many([
+        {"created_at": f"2024-01-0{i + 1}T00:00:00Z", "last_contact": datetime(2024, 2, 1)} for i in range(5)
+    ] + [{"created_at": "not a date"}, {"created_at": datetime(2024, 1, 1)}])
+
+    report = migrate_collection(collection, ["created_at", "last_contact"], batch_size=2, dry_run=True)
+    assert (report["scanned"], report["converted"]) == (6, 5)
+    assert [invalid["value"] for invalid in report["invalid"]] == ["not a date"]
+    assert collection.count_documents({"created_at": {"$type": "string"}}) == 6  # dry run
+
+    # Resuming after the 4th document only scans the rest
+    fourth = list(collection.find().sort("_id", 1))[3]["_id"]
+    assert migrate_collection(collection, ["created_at"], dry_run=True, after=fourth)["scanned"] == 2
+
+def test_date_range_also_matches_legacy_string_dates():
+    database = mongomock.MongoClient().db
+    database.messages.insert_many([
+        {"question": "old in", "timestamp": "2024-01-31T09:30:00.123456Z"},
+        {"question": "old out", "timestamp": "2024-02-01T00:00:00.000001Z"},
+        {"question": "new in", "timestamp": datetime(2024, 1, 31)},
+        {"question": "new out", "timestamp": datetime(2024, 1, 30, 23, 59)},
+    ])
+    query = date_range_filter("timestamp", parse_datetime("2024-01-31"), parse_datetime("2024-01-31", end_of_day=True))
+    assert sorted(m["question"] for m in database.messages.find(query)) == ["new in", "old in"]
+    assert date_range_filter("timestamp") == {}
+
+    assert unmigrated_fields(database) == ["messages.timestamp"]
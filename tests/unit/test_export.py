@@ -0,0 +1,91 @@
+# tests/unit/test_export.py
+
+import json
+import mongomock
+import pytest
+import sys
+import os
+from flask import Flask, request
+from pymongo.errors import CursorNotFound
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.export import stream_export, export_documents, _ndjson_chunks, InvalidExportRequest
+
+COLUMNS = ["_id", "timestamp", "question", "product_ids"]
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.messages
+    collection.insert_many([
+        {"question": f"q{i}", "timestamp": f"2024-01-{i // 2 + 1:02d}T00:00:00Z", "product_ids": ["p1", "p2"]}
+        for i in range(7)
+    ])
+    return collection
+
+class DroppedCursor:
+    """Server cursor that expires after a few documents"""
+
+    def __init__(self, cursor, drop_after):
+        self.cursor, self.drop_after = cursor, drop_after
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        self.cursor.close()
+
+    def __iter__(self):
+        for position, document in enumerate(self.cursor):
+            if position == self.drop_after:
+                raise CursorNotFound("cursor id not found")
+            yield document
+
+class ExpiringCollection:
+    """Collection whose first cursor is lost after drop_after documents"""
+
+    def __init__(self, collection, drop_after):
+        self.collection, self.drop_after, self.name = collection, drop_after, collection.name
+
+    def find(self, *args):
+        cursor, self.drop_after = DroppedCursor(self.collection.find(*args), self.drop_after), None
+        return cursor
+
+def export(collection, query_string):
+    app = Flask(__name__)
+    with app.test_request_context(f"/export?{query_string}"):
+        response = stream_export(collection, {}, "timestamp", COLUMNS, "messages", request.args)
+        return response, "".join(response.response)
+
+def test_ndjson_export_resumes_after_the_last_document(collection):
+    response, body = export(collection, "")
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert response.mimetype == "application/x-ndjson"
+    assert [line["question"] for line in lines] == [f"q{i}" for i in range(7)]
+
+    # Connection dropped after q3: resume from its _id
+    _, rest = export(collection, f"after={lines[3]['_id']}")
+    assert [json.loads(line)["question"] for line in rest.splitlines()] == ["q4", "q5", "q6"]
+
+def test_lost_cursor_is_reopened_after_a_tie(collection):
+    # q2 and q3 share their timestamp: the reopened cursor must still start at q3
+    expiring = ExpiringCollection(collection, drop_after=3)
+    body = "".join(_ndjson_chunks(export_documents(expiring, {}, "timestamp"), 2))
+    assert [json.loads(line)["question"] for line in body.splitlines()] == [f"q{i}" for i in range(7)]
+
+def test_csv_export(collection):
+    response, body = export(collection, "format=csv")
+    rows = body.splitlines()
+    assert response.headers["Content-Disposition"] == 'attachment; filename="messages.csv"'
+    assert rows[0] == "_id,timestamp,question,product_ids"
+    assert rows[1].endswith(",2024-01-01T00:00:00Z,q0,p1;p2")
+    assert len(rows) == 8
+
+def test_batches_and_invalid_requests(collection):
+    assert len(list(export_documents(collection, {}, "timestamp", batch_size=2))) == 7
+    with pytest.raises(InvalidExportRequest):
+        export(collection, "format=xml")
+    with pytest.raises(InvalidExportRequest):
+        export(collection, "after=0123456789ab0123456789ab")
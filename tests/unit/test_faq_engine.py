@@ -0,0 +1,72 @@
+# tests/unit/test_faq_engine.py
+
+from unittest.mock import patch
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.catalog_snapshot import CatalogSnapshot
+from services.faq_engine import FaqEngine
+
+FAQ = {
+    "shipping": {"en": "Delivery takes 3 to 5 days.", "fr": "La livraison prend 3 à 5 jours."},
+    "warranty": {"en": "Manufacturer warranty on every product.", "fr": "Garantie constructeur sur tous les produits."}
+}
+
+FULL_FAQ = dict(FAQ, **{
+    "returns": {"en": "Returns within 30 days.", "fr": "Retours sous 30 jours."},
+    "payment": {"en": "We accept cards and PayPal.", "fr": "Nous acceptons les cartes et PayPal."}
+})
+
+PRODUCTS = [
+    {"_id": "1", "name": "MacBook Air M2", "price": 1199, "category": "Laptops", "warranty": "1 year"},
+    {"_id": "2", "name": "Gaming Mouse", "price": 59, "category": "Accessories", "available": False},
+]
+
+@pytest.fixture
+def engine():
+    with patch('services.faq_engine.get_catalog', return_value=CatalogSnapshot(PRODUCTS, 1)):
+        yield FaqEngine(faq=FAQ)
+
+def test_policy_questions_are_answered_in_the_user_language(engine):
+    assert engine.answer("How long does delivery take?")["message"] == "Delivery takes 3 to 5 days."
+    answer = engine.answer("Quels sont les délais de livraison ?")
+    assert answer["message"] == "La livraison prend 3 à 5 jours."
+    assert answer["local_answer"] == "shipping"
+    assert answer["products"] == []
+
+def test_product_questions_use_catalog_fields(engine):
+    answer = engine.answer("Is the Gaming Mouse in stock?")
+    assert answer["message"] == "Gaming Mouse is currently out of stock."
+    assert [p["name"] for p in answer["products"]] == ["Gaming Mouse"]
+
+    assert engine.answer("What is the warranty of the MacBook Air?")["message"] == \
+        "MacBook Air M2 comes with a 1 year warranty."
+    assert engine.answer("Is it available?", recent_products=["MacBook Air M2"])["message"] == \
+        "Yes, MacBook Air M2 is in stock ($1199)."
+
+def test_open_ended_and_unclear_questions_go_to_the_model(engine):
+    assert engine.answer("Which laptop has the best warranty?") is None
+    assert engine.answer("Do you have laptops in stock?") is None
+    assert engine.answer("What about shipping and returns?") is None
+    assert engine.answer("Can I pay with PayPal?") is None  # no payment entry in this FAQ store
+    assert engine.stats()["passed"] == 4
+
+def test_french_questions_get_french_answers():
+    with patch('services.faq_engine.get_catalog', return_value=CatalogSnapshot(PRODUCTS, 1)):
+        engine = FaqEngine(faq=FULL_FAQ)
+        assert engine.answer("Combien de temps pour la livraison ?")["message"] == "La livraison prend 3 à 5 jours."
+        assert engine.answer("Quels moyens de paiement acceptez-vous ?")["message"] == \
+            "Nous acceptons les cartes et PayPal."
+        assert engine.answer("Comment faire un retour ?")["message"] == "Retours sous 30 jours."
+
+def test_questions_with_qualifiers_go_to_the_model():
+    with patch('services.faq_engine.get_catalog', return_value=CatalogSnapshot(PRODUCTS, 1)):
+        engine = FaqEngine(faq=FULL_FAQ)
+        assert engine.answer("Do you ship to Canada?") is None
+        assert engine.answer("Is there free shipping?") is None
+        assert engine.answer("Can I pay in installments?") is None
+        assert engine.answer("Livrez-vous en Belgique ?") is None
+        assert engine.answer("What is the warranty on refurbished items?") is None
+        assert engine.answer("Is the Gaming Mouse in stock in Paris?") is None
+        assert engine.stats()["answered"] == 0
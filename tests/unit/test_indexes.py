@@ -0,0 +1,28 @@
+# tests/unit/test_indexes.py
+
+import mongomock
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.indexes import INDEXES, ensure_indexes, check_indexes
+
+def make_database():
+    database = mongomock.MongoClient().db
+    for collection_name in INDEXES:
+        database[collection_name].insert_one({"seed": True})
+    return database
+
+def test_indexes_are_created_idempotently():
+    database = make_database()
+    first = ensure_indexes(database)
+    assert ensure_indexes(database) == first
+    assert "status_created_at" in database.leads.index_information()
+    assert database.salesteam.index_information()["email_unique"]["unique"]
+    assert all(not report["missing"] for report in check_indexes(database).values())
+
+def test_check_reports_missing_and_undeclared_indexes():
+    database = make_database()
+    database.leads.create_index("phone")
+    report = check_indexes(database)["leads"]
+    assert "email" in report["missing"]
+    assert report["undeclared"] == ["phone_1"]
@@ -0,0 +1,55 @@
+# tests/unit/test_job_queue.py
+
+from unittest.mock import MagicMock, PropertyMock, patch
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.job_queue import JobQueue
+
+def make_queue(**kwargs):
+    queue = JobQueue(max_attempts=3, base_delay=0.01, max_delay=0.02, **kwargs)
+    collection = MagicMock()
+    patcher = patch.object(JobQueue, 'collection', new_callable=PropertyMock, return_value=collection)
+    return queue, collection, patcher
+
+def test_successful_job_is_removed_from_outbox():
+    queue, collection, patcher = make_queue()
+    seen = []
+    queue.register("record", seen.append)
+
+    with patcher:
+        queue._execute({"_id": "job-1", "name": "record", "payload": {"a": 1}, "attempts": 1})
+
+    assert seen == [{"a": 1}]
+    collection.delete_one.assert_called_once_with({"_id": "job-1"})
+    assert queue.stats()["succeeded"] == 1
+
+def test_failed_job_is_rescheduled_then_marked_failed():
+    queue, collection, patcher = make_queue()
+
+    def broken(payload):
+        raise ConnectionError("db down")
+    queue.register("record", broken)
+
+    with patcher:
+        queue._execute({"_id": "job-1", "name": "record", "payload": {}, "attempts": 1})
+        retry = collection.update_one.call_args[0][1]["$set"]
+        queue._execute({"_id": "job-1", "name": "record", "payload": {}, "attempts": 3})
+        final = collection.update_one.call_args[0][1]["$set"]
+
+    assert retry["status"] == "pending"
+    assert retry["last_error"] == "db down"
+    assert final["status"] == "failed"
+    collection.delete_one.assert_not_called()
+    assert queue.stats()["retried"] == 1
+    assert queue.stats()["failed"] == 1
+
+def test_disabled_queue_runs_inline():
+    queue = JobQueue(enabled=False)
+    seen = []
+    queue.register("record", seen.append)
+
+    queue.enqueue("record", {"message_id": "1"}, job_id="1")
+
+    assert seen == [{"message_id": "1"}]
@@ -0,0 +1,41 @@
+# tests/unit/test_llm_telemetry.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.llm_telemetry import LlmTelemetry, call_cost, get_llm_telemetry
+from services.local_llm import LocalChatClient
+
+def test_calls_are_aggregated_per_call_site():
+    telemetry = LlmTelemetry()
+    for seconds in (0.2, 0.4, 0.8, 4.0):
+        telemetry.record("ask_question", "models/gemini-1.5-flash", seconds, 1000, 100)
+    telemetry.record("contact_ack", "models/gemini-1.5-flash", 0.3, 200, 50, ok=False)
+
+    stats = telemetry.stats()
+    ask = stats["call_sites"]["ask_question"]
+    assert ask["calls"] == 4
+    assert ask["prompt_tokens"] == 4000
+    assert ask["p50_latency"] == 0.5
+    assert ask["p95_latency"] == 5.0
+    assert ask["latency_histogram"]["le_1.0"] == 1
+    assert ask["cost_usd"] == round(4 * call_cost("models/gemini-1.5-flash", 1000, 100), 6)
+    assert stats["call_sites"]["contact_ack"]["errors"] == 1
+    assert set(stats["per_minute"][-1]["call_sites"]) == {"ask_question", "contact_ack"}
+
+def test_unknown_model_costs_nothing():
+    assert call_cost("local", 10_000, 1_000) == 0.0
+    assert call_cost("models/gemini-1.5-flash", 1_000_000, 0) == 0.075
+
+def test_chat_client_calls_are_recorded():
+    client = LocalChatClient(latency="fixed:0")
+    client.call_site = "test_site"
+    client.start_chat("- Gaming Mouse: RGB mouse. Price: $49")
+
+    client.send_message("User question: gaming mouse")
+    "".join(client.send_message_stream("User question: gaming mouse"))
+
+    site = get_llm_telemetry().summary()["test_site"]
+    assert site["calls"] == 2
+    assert site["models"] == {"local": 2}
+    assert site["prompt_tokens"] > 0 and site["completion_tokens"] > 0
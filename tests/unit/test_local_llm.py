@@ -0,0 +1,62 @@
+# tests/unit/test_local_llm.py
+
+import random
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.local_llm import LocalChatClient, parse_latency
+from services.llm_provider import create_chat_client
+from services.resilience import get_circuit_breaker
+
+CONTEXT = """Here is a list of available products:
+- MacBook Air M2: Light laptop. Price: $999. Category: Laptops. Tags: laptop
+- Gaming Mouse: RGB mouse. Price: $49. Category: Accessories. Tags: gaming
+- Dell XPS 13: Compact business laptop. Price: $1199. Category: Laptops. Tags: laptop, business
+"""
+
+def make_client(**kwargs):
+    client = LocalChatClient(latency="fixed:0", **kwargs)
+    client.start_chat(CONTEXT)
+    return client
+
+def test_answer_is_well_formed_and_deterministic():
+    prompt = "User question: I need a business laptop\nFormat your response EXACTLY like this:"
+    first = make_client().send_message(prompt)
+    second = make_client().send_message(prompt)
+
+    assert first == second
+    assert first.startswith("MESSAGE: ")
+    assert "PRODUCTS: Dell XPS 13, MacBook Air M2" in first
+
+def test_interest_sections_when_requested():
+    client = make_client()
+    answer = client.send_message("User question: I want to buy a gaming mouse now\nINTEREST_SCORE: [0-10]")
+
+    assert "INTEREST_SCORE: " in answer
+    assert "INTENT: buy" in answer
+    assert "URGENCY: now" in answer
+    assert len(client.history) == 4
+
+def test_streamed_answer_matches_full_answer():
+    prompt = "User question: gaming mouse"
+    assert "".join(make_client().send_message_stream(prompt)) == make_client().send_message(prompt)
+
+def test_latency_distributions():
+    rng = random.Random(1)
+    assert parse_latency("fixed:0.5")(rng) == 0.5
+    assert 0.2 <= parse_latency("uniform:0.2,0.4")(rng) <= 0.4
+    assert parse_latency("lognormal:0.8,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("poisson:1")
+
+def test_injected_errors_and_provider_factory():
+    breaker = get_circuit_breaker()
+    client = make_client(error_rate=1.0)
+    with pytest.raises(ConnectionError):
+        client.send_message("User question: laptop", deadline=0.5)
+    breaker._reset()
+
+    assert isinstance(create_chat_client("local"), LocalChatClient)
+    with pytest.raises(ValueError):
+        create_chat_client("unknown")
@@ -0,0 +1,62 @@
+# tests/unit/test_model_pool.py
+
+from unittest.mock import patch
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.model_pool import ModelPool, PoolTimeoutError
+
+MODEL = "models/gemini-1.5-flash"
+
+@pytest.fixture(autouse=True)
+def gemini_env(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+def test_handles_are_reused_and_configured_once():
+    with patch('services.model_pool.genai') as mock_genai:
+        pool = ModelPool(max_size=2, acquire_timeout=0.1)
+
+        with pool.lease(MODEL) as first:
+            pass
+        with pool.lease(MODEL) as second:
+            pass
+
+        assert first is second
+        assert mock_genai.configure.call_count == 1
+        assert mock_genai.GenerativeModel.call_count == 1
+        assert pool.stats()["reused"] == 1
+
+def test_pool_is_bounded():
+    with patch('services.model_pool.genai'):
+        pool = ModelPool(max_size=1, acquire_timeout=0.05)
+        token = pool.acquire(MODEL)
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(MODEL)
+
+        pool.release(MODEL, token)
+        assert pool.acquire(MODEL)[1] is token[1]
+
+def test_fork_reset_drops_parent_handles():
+    with patch('services.model_pool.genai') as mock_genai:
+        pool = ModelPool(max_size=1, acquire_timeout=0.05)
+        token = pool.acquire(MODEL)
+
+        # Simulate the child side of a fork while the handle is leased
+        pool._after_fork()
+        pool.release(MODEL, token)
+
+        assert pool.stats()["size"] == 0
+        pool.acquire(MODEL)
+        assert mock_genai.configure.call_count == 2
+
+def test_failed_call_discards_handle():
+    with patch('services.model_pool.genai'):
+        pool = ModelPool(max_size=1, acquire_timeout=0.05)
+
+        with pytest.raises(RuntimeError):
+            with pool.lease(MODEL):
+                raise RuntimeError("transport error")
+
+        assert pool.stats()["size"] == 0
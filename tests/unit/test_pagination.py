@@ -0,0 +1,72 @@
+# tests/unit/test_pagination.py
+
+import mongomock
+from datetime import datetime
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.pagination import paginate, page_args, InvalidPageRequest
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.messages
+    # Several messages share a timestamp: the _id breaks the tie
+    collection.insert_many([
+        {"question": f"q{i}", "timestamp": f"2024-01-{i // 3 + 1:02d}T00:00:00Z", "product_ids": ["p1"] if i % 2 else []}
+        for i in range(10)
+    ])
+    return collection
+
+def test_pages_cover_every_document_once_newest_first(collection):
+    seen, cursor = [], None
+    while True:
+        page = paginate(collection, {}, "timestamp", 3, cursor)
+        seen.extend(message["question"] for message in page["items"])
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+
+    assert sorted(seen) == sorted(f"q{i}" for i in range(10))
+    assert len(set(seen)) == 10
+    assert seen[0] == "q9" and seen[-1] == "q0"
+
+def test_filters_and_total(collection):
+    page = paginate(collection, {"product_ids": {"$in": ["p1"]}}, "timestamp", 2)
+    assert [message["question"] for message in page["items"]] == ["q9", "q7"]
+    assert (page["total"], page["total_is_exact"]) == (5, True)
+    assert isinstance(page["items"][0]["_id"], str)
+
+    page = paginate(collection, {"product_ids": {"$in": ["p1"]}}, "timestamp", 2, page["next_cursor"])
+    assert [message["question"] for message in page["items"]] == ["q5", "q3"]
+
+def test_invalid_page_requests():
+    assert page_args({"limit": "100000"})[0] == 500
+    with pytest.raises(InvalidPageRequest):
+        page_args({"limit": "abc"})
+    with pytest.raises(InvalidPageRequest):
+        paginate(mongomock.MongoClient().db.messages, {}, "timestamp", 10, "not-a-cursor")
+
+def test_oldest_first_pages(collection):
+    first = paginate(collection, {}, "timestamp", 4, direction=1)
+    second = paginate(collection, {}, "timestamp", 4, first["next_cursor"], direction=1)
+    assert [message["question"] for message in first["items"] + second["items"]] == [f"q{i}" for i in range(8)]
+
+def test_pages_cross_from_dates_to_legacy_string_dates():
+    collection = mongomock.MongoClient().db.messages
+    # Half the messages not migrated yet: ISO strings sort before every date
+    collection.insert_many(
+        [{"question": f"old{i}", "timestamp": f"2024-01-0{i + 1}T00:00:00.000000Z"} for i in range(3)] +
+        [{"question": f"new{i}", "timestamp": datetime(2024, 2, i + 1)} for i in range(3)]
+    )
+
+    for direction, expected in ((-1, ["new2", "new1", "new0", "old2", "old1", "old0"]),
+                                (1, ["old0", "old1", "old2", "new0", "new1", "new2"])):
+        seen, cursor = [], None
+        while True:
+            page = paginate(collection, {}, "timestamp", 2, cursor, direction=direction)
+            seen.extend(message["question"] for message in page["items"])
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+        assert seen == expected
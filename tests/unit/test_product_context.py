@@ -6,18 +6,23 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from services.product_context import ProductContextProvider
+from services.catalog_snapshot import CatalogCache, get_catalog_cache
+
+PRODUCTS = [
+    {
+        "name": "Product A",
+        "description": "Description A",
+        "price": 100,
+        "tags": ["tech", "sale"]
+    }
+]
 
 def test_generate_context_from_products():
     # Mock DB
-    with patch('services.product_context.db') as mock_db:
-        mock_db.products.find.return_value = [
-            {
-                "name": "Product A",
-                "description": "Description A",
-                "price": 100,
-                "tags": ["tech", "sale"]
-            }
-        ]
+    with patch('services.catalog_snapshot.Product') as mock_product:
+        mock_product.find_all.return_value = PRODUCTS
+        mock_product.get_catalog_version.return_value = 1
+        get_catalog_cache().invalidate()
         
         context_provider = ProductContextProvider()
         result = context_provider.fetch_product_context()
@@ -25,3 +30,28 @@ def test_generate_context_from_products():
         assert "Product A" in result
         assert "Description A" in result
         assert "$100" in result
+
+def test_snapshot_is_reused_until_version_changes():
+    with patch('services.catalog_snapshot.Product') as mock_product:
+        mock_product.find_all.return_value = PRODUCTS
+        mock_product.get_catalog_version.return_value = 1
+        cache = CatalogCache(poll_interval=0, max_age=300, use_change_stream=False)
+
+        first = cache.get()
+        assert cache.get() is first
+        assert mock_product.find_all.call_count == 1
+
+        # Another worker wrote a product: the shared version moved on
+        mock_product.get_catalog_version.return_value = 2
+        assert cache.get() is not first
+        assert mock_product.find_all.call_count == 2
+
+def test_local_write_invalidates_snapshot():
+    with patch('services.catalog_snapshot.Product') as mock_product:
+        mock_product.find_all.return_value = PRODUCTS
+        mock_product.get_catalog_version.return_value = 1
+        cache = CatalogCache(poll_interval=60, max_age=300, use_change_stream=False)
+
+        first = cache.get()
+        cache.invalidate()
+        assert cache.get() is not first
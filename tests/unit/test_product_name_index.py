@@ -0,0 +1,48 @@
+# tests/unit/test_product_name_index.py
+
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.product_name_index import ProductNameIndex, normalize_name, edit_distance
+
+PRODUCTS = [
+    {"_id": 1, "name": "MacBook Air M2"},
+    {"_id": 2, "name": "Dell XPS 13"},
+    {"_id": 3, "name": "Panini Press"},
+    {"_id": 4, "name": "Non-stick Pan"},
+    {"_id": 5, "name": "Café Grinder"},
+    {"_id": 6, "name": "Dell XPS 13"},
+]
+
+@pytest.fixture
+def index():
+    return ProductNameIndex(PRODUCTS, threshold=0.75)
+
+def ids(products):
+    return [product["_id"] for product in products]
+
+def test_exact_and_normalized_lookup(index):
+    assert ids(index.find(["MacBook Air M2"])) == [1]
+    assert ids(index.find(["macbook air m2"])) == [1]
+    assert ids(index.find(["cafe grinder"])) == [5]
+    assert ids(index.find(["non stick pan"])) == [4]
+
+def test_shared_names_return_every_product(index):
+    assert ids(index.find(["Dell XPS 13"])) == [2, 6]
+
+def test_fuzzy_lookup(index):
+    assert ids(index.find(["Dell XSP 13"])) == [2, 6]
+    assert ids(index.find(["Apple MacBook Air M2"])) == [1]
+
+def test_no_over_matching_or_patterns(index):
+    assert index.find(["Pan"]) == []
+    assert index.find([".*"]) == []
+    assert index.find(["Toaster"]) == []
+
+def test_order_follows_names_without_duplicates(index):
+    assert ids(index.find(["Non-stick Pan", "MacBook Air M2", "macbook air m2"])) == [4, 1]
+
+def test_helpers():
+    assert normalize_name("  Café-Grinder! ") == "cafe grinder"
+    assert edit_distance("kitten", "sitting") == 3
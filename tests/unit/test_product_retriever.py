@@ -0,0 +1,30 @@
+# tests/unit/test_product_retriever.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.product_retriever import ProductRetriever, tokenize
+
+PRODUCTS = [
+    {"name": "MacBook Air M2", "description": "Lightweight laptop for coding", "tags": ["laptop", "programming"],
+     "category": "Laptops", "brand": "Apple", "specs": {"processor": "Apple M2", "ram": "8GB"}, "rating": 4.8},
+    {"name": "ASUS ROG Strix G15", "description": "Gaming laptop with RTX 3060", "tags": ["gaming"],
+     "category": "Laptops", "brand": "Asus", "specs": {"ram": "16GB"}, "rating": 4.5},
+    {"name": "Chef Knife", "description": "Stainless steel knife", "tags": ["kitchen"],
+     "category": "Kitchen", "rating": 4.9},
+]
+
+def test_tokenize_strips_accents_and_stopwords():
+    assert tokenize("Je veux un ordinateur portable légèr") == ["ordinateur", "portable", "leger"]
+
+def test_top_k_ranks_relevant_products_first():
+    retriever = ProductRetriever(PRODUCTS)
+
+    assert retriever.top_k("best gaming laptop", 1)[0]["name"] == "ASUS ROG Strix G15"
+    assert retriever.top_k("Apple laptop for programming", 1)[0]["name"] == "MacBook Air M2"
+    assert len(retriever.top_k("laptop", 5)) == 2
+
+def test_unmatched_question_returns_best_rated():
+    retriever = ProductRetriever(PRODUCTS)
+
+    assert [p["name"] for p in retriever.top_k("hello there", 2)] == ["Chef Knife", "MacBook Air M2"]
@@ -0,0 +1,93 @@
+# tests/unit/test_resilience.py
+
+import time
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, call_with_retry
+
+def fail():
+    raise ConnectionError("upstream down")
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, slow_call_seconds=10, reset_timeout=60)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "not called")
+    assert breaker.stats()["rejected"] == 1
+
+def test_breaker_probe_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_seconds=10, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    time.sleep(0.06)
+
+    # Failed probe: open again
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == "open"
+    time.sleep(0.06)
+
+    # Successful probe: closed
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+def test_slow_calls_and_ignored_errors():
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_seconds=0.01, reset_timeout=60)
+    breaker.call(lambda: time.sleep(0.02))
+    assert breaker.stats()["slow_calls"] == 1
+
+    # Errors that do not reflect upstream health reset the failure count
+    with pytest.raises(ValueError):
+        breaker.call(lambda: int("x"), is_failure=lambda e: not isinstance(e, ValueError))
+    assert breaker.stats()["consecutive_failures"] == 0
+    assert breaker.state == "closed"
+
+def test_retry_until_success_within_deadline():
+    attempts = []
+
+    def flaky(remaining):
+        attempts.append(remaining)
+        if len(attempts) < 3:
+            raise ConnectionError("try again")
+        return "ok"
+
+    assert call_with_retry(flaky, deadline=5, max_attempts=3, base_delay=0.01, max_delay=0.02) == "ok"
+    assert len(attempts) == 3
+    assert all(0 < remaining <= 5 for remaining in attempts)
+
+def test_retry_stops_on_permanent_errors_and_open_circuit():
+    attempts = []
+
+    def invalid(remaining):
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retry(invalid, deadline=5, max_attempts=3, base_delay=0.01, max_delay=0.02,
+                        retry_if=lambda e: isinstance(e, ConnectionError))
+    assert len(attempts) == 1
+
+    def rejected(remaining):
+        attempts.append(1)
+        raise CircuitOpenError(30)
+
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(rejected, deadline=5, max_attempts=3, base_delay=0.01, max_delay=0.02)
+    assert len(attempts) == 2
+
+def test_deadline_bounds_retries():
+    def slow_failure(remaining):
+        time.sleep(0.05)
+        raise ConnectionError("timeout")
+
+    start = time.monotonic()
+    with pytest.raises((ConnectionError, DeadlineExceeded)):
+        call_with_retry(slow_failure, deadline=0.12, max_attempts=10, base_delay=0.01, max_delay=0.02)
+    assert time.monotonic() - start < 0.3
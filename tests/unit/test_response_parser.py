@@ -0,0 +1,53 @@
+# tests/unit/test_response_parser.py
+
+from unittest.mock import MagicMock, patch
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.response_parser import ResponseParser, ResponseFormatError
+from services.ai_services import AiService
+
+def test_json_answer_is_parsed_and_coerced():
+    parser = ResponseParser()
+
+    data = parser.parse('{"message": "Hi", "products": ["MacBook Air M2"], "interest_score": "8/10", "urgency": "none"}')
+
+    assert data == {"message": "Hi", "products": ["MacBook Air M2"], "interest_score": 8, "urgency": []}
+    assert parser.stats()["json"] == 1
+    assert parser.stats()["repaired"] == 1
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"message": "Hi", "products": ["A", "B"]}\n```',
+    'Sure! {"message": "Hi", "products": ["A", "B"],} Hope it helps',
+    '{"message": "Hi", "products": ["A", "B',
+])
+def test_near_miss_json_is_repaired(text):
+    assert ResponseParser().parse(text) == {"message": "Hi", "products": ["A", "B"]}
+
+def test_sections_answer_uses_the_same_validation():
+    data = ResponseParser().parse("MESSAGE: Two laptops.\nPRODUCTS: MacBook Air M2, Dell XPS 13\nCONFIDENCE: high")
+
+    assert data == {"message": "Two laptops.", "products": ["MacBook Air M2", "Dell XPS 13"], "confidence": "high"}
+
+def test_unusable_answers_are_counted():
+    parser = ResponseParser()
+
+    for text in ('{"message": "Hi"}', "Sorry, I can only help with products.", '{"message": ["Hi"], "products": []}'):
+        with pytest.raises(ResponseFormatError):
+            parser.parse(text)
+
+    stats = parser.stats()
+    assert stats["failed"] == 3
+    assert stats["failure_reasons"] == {"missing:products": 1, "unformatted": 1, "type:message": 1}
+
+def test_unreadable_answer_is_asked_again():
+    service = AiService.__new__(AiService)
+    service.chat_client = MagicMock(response_schema={"type": "OBJECT"})
+    service.chat_client.send_message.return_value = '{"message": "Hi", "products": []}'
+
+    with patch('services.ai_services.ProductContextProvider'):
+        result = service._parse_with_retries("I think you should buy the MacBook")
+
+    assert result["message"] == "Hi"
+    assert "JSON object only" in service.chat_client.send_message.call_args[0][0]
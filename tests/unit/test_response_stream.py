@@ -0,0 +1,38 @@
+# tests/unit/test_response_stream.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.response_stream import StreamingResponseParser, StreamingJsonMessageParser
+
+LABELS = ["MESSAGE", "PRODUCTS", "INTEREST_SCORE"]
+
+def stream(text, size):
+    parser = StreamingResponseParser(LABELS)
+    emitted = "".join(parser.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return emitted + parser.finish(), parser
+
+def test_message_is_emitted_without_labels_for_any_chunk_size():
+    text = "MESSAGE: Here are two laptops.\nPRODUCTS: MacBook Air M2, Dell XPS 13\nINTEREST_SCORE: 6"
+    for size in range(1, len(text) + 1):
+        emitted, parser = stream(text, size)
+        assert emitted == "Here are two laptops."
+        assert parser.buffer == text
+
+def test_partial_label_is_held_back():
+    parser = StreamingResponseParser(LABELS)
+    assert parser.feed("MESSAGE: Hi there PROD") == "Hi there"
+    assert parser.feed("UCTS: Chef Knife") == ""
+    assert parser.finish() == ""
+
+def test_unformatted_answer_is_all_message():
+    emitted, _ = stream("Sorry, I can only help with products.", 4)
+    assert emitted == "Sorry, I can only help with products."
+
+def test_json_message_is_decoded_for_any_chunk_size():
+    text = '{"message": "Two \\"light\\" laptops\\nfrom $999 \\u00e0 voir", "products": ["MacBook Air M2"]}'
+    for size in range(1, len(text) + 1):
+        parser = StreamingJsonMessageParser()
+        emitted = "".join(parser.feed(text[i:i + size]) for i in range(0, len(text), size)) + parser.finish()
+        assert emitted == 'Two "light" laptops\nfrom $999 à voir'
+        assert parser.buffer == text
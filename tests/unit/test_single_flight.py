@@ -0,0 +1,47 @@
+# tests/unit/test_single_flight.py
+
+import threading
+import time
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.single_flight import SingleFlight
+
+def run_concurrently(group, fn, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("key", fn))) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_callers_share_one_call():
+    group = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"message": "shared"}
+
+    results = run_concurrently(group, slow_call, 5)
+
+    assert len(calls) == 1
+    assert all(result == {"message": "shared"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert group.stats()["coalesced"] == 4
+
+def test_errors_are_shared_and_not_cached():
+    group = SingleFlight()
+
+    def failing_call():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        group.do("key", failing_call)
+
+    # The failed flight is gone: the next caller runs again
+    assert group.do("key", lambda: "ok") == ("ok", False)
+    assert group.stats()["in_flight"] == 0
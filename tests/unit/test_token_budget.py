@@ -0,0 +1,50 @@
+# tests/unit/test_token_budget.py
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from services.product_formatter import build_table_context
+from services.token_budget import estimate_tokens, fit_product_context
+from services.local_llm import LocalChatClient
+
+PRODUCTS = [
+    {"name": "MacBook Air M2", "price": 1199, "category": "Laptops", "description": "Light | thin laptop",
+     "tags": ["portable", "student"], "specs": {"processor": "Apple M2", "ram": "8GB"}, "rating": 4.8},
+    {"name": "Gaming Mouse", "price": 59, "category": "Accessories", "description": "RGB mouse",
+     "tags": ["gaming"], "available": False},
+]
+
+def test_table_has_one_header_and_one_row_per_product():
+    context = build_table_context(PRODUCTS)
+    lines = context.splitlines()
+
+    assert lines[1] == "name|price|category|stock|description|specs|tags|rating"
+    assert lines[2] == "MacBook Air M2|$1199|Laptops||Light / thin laptop|Apple M2, 8GB RAM|portable, student|4.8/5"
+    assert lines[3] == "Gaming Mouse|$59|Accessories|out|RGB mouse||gaming|"
+    # Columns empty for every product are left out
+    assert "warranty" not in context
+
+def test_fit_drops_columns_then_products():
+    catalog = [dict(PRODUCTS[0], name=f"Laptop {i}") for i in range(50)]
+
+    context, info = fit_product_context(catalog, max_tokens=10_000)
+    assert not info["trimmed"]
+    assert info["products"] == 50
+
+    context, info = fit_product_context(catalog, max_tokens=400)
+    assert info["trimmed"]
+    assert info["columns"][:2] == ["name", "price"]
+    assert info["tokens"] == estimate_tokens(context) <= 400
+
+    context, info = fit_product_context(catalog, max_tokens=150)
+    assert info["columns"] == ["name", "price"]
+    assert 1 <= info["products"] < 50
+    assert "Laptop 0|" in context
+
+def test_local_llm_reads_table_context():
+    client = LocalChatClient(latency="fixed:0")
+    client.start_chat(build_table_context(PRODUCTS))
+
+    answer = client.send_message("User question: I need a portable laptop")
+
+    assert "PRODUCTS: MacBook Air M2" in answer
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # MongoDB stores UTC: aware datetimes are converted, naive ones are taken as UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_iso(value: datetime) -> str:
+    """
+    Format a datetime as ISO 8601 UTC with milliseconds (the precision of BSON dates).
+
+    :param value: datetime, naive values are UTC (as read from MongoDB)
+    :return: str, e.g. "2024-01-31T09:30:00.000Z"
+    """
+    return _naive_utc(value).isoformat(timespec="milliseconds") + "Z"
+
+
+def parse_datetime(value: str, end_of_day: bool = False) -> datetime:
+    """
+    Parse a date sent by a client: "2024-01-31", "2024-01-31T09:30:00",
+    with an optional "Z" or UTC offset.
+
+    :param value: str, the date or date-time
+    :param end_of_day: bool, read a date without time as its last millisecond
+        (inclusive end of a range) instead of midnight
+    :return: datetime, naive UTC
+    :raises ValueError: if the value is not an ISO 8601 date
+    """
+    text = (value or "").strip()
+    try:
+        parsed = datetime.fromisoformat(text[:-1] + "+00:00" if text[-1:] in ("Z", "z") else text)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected ISO 8601 (e.g. 2024-01-31 or 2024-01-31T09:30:00Z)")
+    if end_of_day and len(text) == 10:
+        parsed += timedelta(days=1, milliseconds=-1)
+    return _naive_utc(parsed)
+
+
+def date_range_filter(field: str, start: datetime = None, end: datetime = None) -> dict:
+    """
+    Inclusive range filter on a date field that also matches the ISO string
+    values written before the migration to BSON dates (range operators
+    only compare values of the same BSON type).
+
+    :param field: str, the date field
+    :param start: datetime or None, naive UTC lower bound
+    :param end: datetime or None, naive UTC upper bound
+    :return: dict, the filter ({} without bounds)
+    """
+    dates, strings = {}, {}
+    for operator, bound in (("$gte", start), ("$lte", end)):
+        if bound is not None:
+            dates[operator] = bound
+            # Legacy values: datetime.utcnow().isoformat() + "Z", compared as text
+            strings[operator] = _naive_utc(bound).isoformat(timespec="microseconds") + "Z"
+    if not dates:
+        return {}
+    return {"$or": [{field: dates}, {field: strings}]}
+
+
+def as_datetime(value):
+    """
+    Stored date field as a naive UTC datetime, whether it is a BSON date or
+    an ISO string written before the migration to BSON dates.
+
+    :param value: datetime, str or None
+    :return: datetime or None (missing or unreadable value)
+    """
+    if isinstance(value, datetime):
+        return _naive_utc(value)
+    if isinstance(value, str) and value:
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import Response, stream_with_context
+from pymongo.errors import CursorNotFound, ExecutionTimeout
+from config.settings import EXPORT_BATCH_SIZE, EXPORT_MAX_REOPENS
+from utils.dates import to_iso
+from utils.pagination import keyset_position
+from utils.json_provider import json_default
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+class InvalidExportRequest(ValueError):
+    """An export format or resume position that cannot be used (answered with 400)"""
+
+
+def _csv_value(value):
+    # Lists as "a;b", other non-scalar values as JSON
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=json_default, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return to_iso(value)
+    return str(value)
+
+
+def resume_filter(collection, query: dict, sort_field: str, after_id: str = None) -> dict:
+    """
+    Restrict an export to the documents after the one with _id after_id,
+    in (sort_field, _id) ascending order.
+
+    :param collection: the pymongo collection
+    :param query: dict, the export filter
+    :param sort_field: str, the field the export is sorted on
+    :param after_id: str or None, _id of the last document received
+    :return: dict, the filter of the rest of the export
+    :raises InvalidExportRequest: if after_id is not the _id of a document
+    """
+    if not after_id:
+        return query
+    try:
+        last = collection.find_one({"_id": ObjectId(after_id)}, {sort_field: 1})
+    except (InvalidId, TypeError):
+        last = None
+    if last is None:
+        raise InvalidExportRequest(f"Unknown resume position: {after_id}")
+    return _after(query, sort_field, last.get(sort_field), last["_id"])
+
+
+def _after(query: dict, sort_field: str, sort_value, last_id) -> dict:
+    position = keyset_position(sort_field, sort_value, last_id, direction=1)
+    return {"$and": [query, position]} if query else position
+
+
+def export_documents(collection, query: dict, sort_field: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Yield the documents matching the query, oldest first, read in batches
+    of batch_size. A server cursor that expires while the client reads
+    slowly is reopened after the last document yielded.
+    """
+    last, reopens = None, 0
+    while True:
+        resumed = query if last is None else _after(query, sort_field, last.get(sort_field), last["_id"])
+        cursor = collection.find(resumed).sort([(sort_field, 1), ("_id", 1)]).batch_size(batch_size)
+        try:
+            for document in cursor:
+                last = document
+                yield document
+            return
+        except (CursorNotFound, ExecutionTimeout) as e:
+            reopens += 1
+            if reopens > EXPORT_MAX_REOPENS:
+                raise
+            logging.warning(f"Export cursor on {collection.name} lost, reopening: {e}")
+        finally:
+            cursor.close()
+
+
+def _ndjson_chunks(documents, batch_size: int):
+    # One chunk per batch of documents, one JSON object per line. The documents
+    # are not modified: export_documents resumes from the last one it yielded
+    lines = []
+    for document in documents:
+        lines.append(json.dumps(document, default=json_default, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _csv_chunks(documents, columns: list, batch_size: int):
+    # Header, then one chunk per batch of rows
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    for document in documents:
+        writer.writerow([_csv_value(document.get(column)) for column in columns])
+        rows += 1
+        if rows >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def stream_export(collection, query: dict, sort_field: str, columns: list, name: str, args) -> Response:
+    """
+    Streamed export of a collection, in (sort_field, _id) ascending order.
+
+    Query arguments: format (ndjson, default, or csv) and after, the _id
+    of the last document received, to resume an interrupted download.
+    Memory stays bounded by EXPORT_BATCH_SIZE documents.
+
+    :param collection: the pymongo collection
+    :param query: dict, the export filter
+    :param sort_field: str, the field the export is sorted on (indexed)
+    :param columns: list, the CSV columns
+    :param name: str, the download file name (without extension)
+    :param args: the request query arguments
+    :return: Response, the streamed body
+    :raises InvalidExportRequest: on an unknown format or resume position
+    """
+    export_format = (args.get("format") or "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise InvalidExportRequest(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    query = resume_filter(collection, query, sort_field, args.get("after"))
+
+    documents = export_documents(collection, query, sort_field)
+    if export_format == "csv":
+        chunks = _csv_chunks(documents, columns, EXPORT_BATCH_SIZE)
+    else:
+        chunks = _ndjson_chunks(documents, EXPORT_BATCH_SIZE)
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{name}.{export_format}"',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -7,3 +7,15 @@ def allowed_file(filename, allowed_extensions):
     :return: bool, True if allowed, False otherwise
     """
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
+
+
+def format_sse(event, data):
+    """
+    Format one Server-Sent Events message.
+
+    :param event: str, the event name (e.g. 'token', 'done')
+    :param data: str, the already serialized payload
+    :return: str, the event block terminated by a blank line
+    """
+    lines = "\n".join(f"data: {line}" for line in data.split("\n"))
+    return f"event: {event}\n{lines}\n\n"
@@ -0,0 +1,24 @@
+from datetime import datetime
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from utils.dates import to_iso
+
+
+def json_default(value):
+    """
+    Serialize the values of MongoDB documents the json module does not know.
+
+    :param value: the value to serialize
+    :return: ISO 8601 UTC for datetimes, str for ObjectIds, else Flask's default
+    """
+    if isinstance(value, datetime):
+        return to_iso(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider writing BSON dates as ISO 8601 UTC ("...Z") instead of HTTP dates"""
+
+    default = staticmethod(json_default)
@@ -0,0 +1,170 @@
+import base64
+from datetime import datetime
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from config.settings import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, PAGE_COUNT_LIMIT
+
+
+class InvalidPageRequest(ValueError):
+    """A page size or cursor sent by the client that cannot be used (answered with 400)"""
+
+
+def encode_cursor(sort_value, _id) -> str:
+    """
+    Build the opaque cursor pointing after one document.
+
+    :param sort_value: the document's value of the sort field (str, datetime, ...)
+    :param _id: the document's _id (tie-breaker)
+    :return: str, URL-safe token
+    """
+    raw = json_util.dumps({"v": sort_value, "id": _id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Read a cursor built by encode_cursor.
+
+    :param cursor: str, the token sent back by the client
+    :return: tuple, (sort value, ObjectId)
+    :raises InvalidPageRequest: if the token was not produced by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position = json_util.loads(raw)
+        return position["v"], ObjectId(position["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidPageRequest(f"Invalid cursor: {cursor}") from e
+
+
+def page_args(args) -> tuple:
+    """
+    Read the page size and cursor of a list request (?limit=&cursor=).
+
+    :param args: the request query arguments
+    :return: tuple, (limit, cursor or None)
+    :raises InvalidPageRequest: if limit is not a positive integer
+    """
+    try:
+        limit = int(args.get("limit", PAGE_SIZE_DEFAULT))
+    except (TypeError, ValueError):
+        raise InvalidPageRequest("limit must be an integer")
+    if limit < 1:
+        raise InvalidPageRequest("limit must be positive")
+    return min(limit, PAGE_SIZE_MAX), args.get("cursor") or None
+
+
+def after_cursor(query: dict, sort_field: str, cursor: str, direction: int = -1) -> dict:
+    """
+    Restrict a query to the documents after the cursor, in (sort_field, _id)
+    order.
+
+    :param query: dict, the list filter
+    :param sort_field: str, the field the list is sorted on
+    :param cursor: str or None, the cursor of the previous page
+    :param direction: int, -1 (newest first) or 1 (oldest first)
+    :return: dict, the filter of the next page
+    """
+    if not cursor:
+        return query
+    sort_value, last_id = decode_cursor(cursor)
+    position = keyset_position(sort_field, sort_value, last_id, direction)
+    return {"$and": [query, position]} if query else position
+
+
+def keyset_position(sort_field: str, sort_value, last_id, direction: int = -1) -> dict:
+    """
+    Filter of the documents after (sort_value, last_id) in (sort_field, _id)
+    order.
+
+    Range operators only match values of their own BSON type, while sorts
+    order the types (strings before dates). Dates written as ISO strings by
+    earlier versions (see migrations/migrate_dates.py) would be out of reach
+    once the position is on the other side of that boundary, so the
+    position also lets through every value of the type that sorts after it.
+
+    :param sort_field: str, the field the list is sorted on
+    :param sort_value: the sort field value of the last document returned
+    :param last_id: ObjectId, the _id of the last document returned
+    :param direction: int, -1 (newest first) or 1 (oldest first)
+    :return: dict, the position filter
+    """
+    after = "$lt" if direction < 0 else "$gt"
+    clauses = [
+        {sort_field: {after: sort_value}},
+        {sort_field: sort_value, "_id": {after: last_id}}
+    ]
+    if direction < 0 and isinstance(sort_value, datetime):
+        clauses.append({sort_field: {"$type": "string"}})
+    elif direction > 0 and isinstance(sort_value, str):
+        clauses.append({sort_field: {"$type": "date"}})
+    return {"$or": clauses}
+
+
+def approximate_total(collection, query: dict) -> tuple:
+    """
+    Cheap document count of a list.
+
+    :param collection: the pymongo collection
+    :param query: dict, the list filter
+    :return: tuple, (count, exact): unfiltered lists use the collection
+        metadata count, filtered ones stop counting at PAGE_COUNT_LIMIT
+    """
+    if not query:
+        return collection.estimated_document_count(), False
+    count = collection.count_documents(query, limit=PAGE_COUNT_LIMIT)
+    return count, count < PAGE_COUNT_LIMIT
+
+
+def paginate(collection, query: dict, sort_field: str, limit: int, cursor: str = None,
+             projection: dict = None, direction: int = -1) -> dict:
+    """
+    Read one page of a list sorted newest first (or oldest first), by
+    keyset (no skip: the cost of a page does not depend on its position).
+
+    :param collection: the pymongo collection
+    :param query: dict, the list filter
+    :param sort_field: str, the field the list is sorted on (indexed)
+    :param limit: int, the page size
+    :param cursor: str or None, next_cursor of the previous page
+    :param projection: dict or None, the fields to return
+    :param direction: int, -1 (newest first) or 1 (oldest first)
+    :return: dict, {"items", "next_cursor", "has_more", "total", "total_is_exact"}
+        with the _id of the items as strings
+    """
+    documents = list(
+        collection.find(after_cursor(query, sort_field, cursor, direction), projection)
+        .sort([(sort_field, direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = encode_cursor(documents[-1].get(sort_field), documents[-1]["_id"]) if has_more else None
+
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    total, exact = approximate_total(collection, query)
+    return {
+        "items": documents,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "total": total,
+        "total_is_exact": exact
+    }
+
+
+def page_info(page: dict, limit: int) -> dict:
+    """
+    The 'pagination' block of a list response.
+
+    :param page: dict, the result of paginate
+    :param limit: int, the page size used
+    :return: dict, what the client needs to request the next page
+    """
+    return {
+        "limit": limit,
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"],
+        "total": page["total"],
+        "total_is_exact": page["total_is_exact"]
+    }